@@ -1 +1,276 @@
- 
+import re
+import json
+import zlib
+import heapq
+import threading
+from datetime import datetime
+from functools import partial
+import numpy as np
+from googleapiclient.discovery import build
+from models.llm_model import chat_completion
+from models.file_utils import write_atomic
+from agents.performance_analytics import QuotaTracker, QuotaExceeded
+from configs.settings import (YOUTUBE_API_KEY, COMMENT_CURSORS_PATH, COMMENT_MAX_CLUSTERS, COMMENT_SIMILARITY,
+                             COMMENT_REPLY_BATCH)
+
+PAGE_SIZE = 100  # commentThreads().list maximum
+COMMENT_THREADS_COST = 1  # Quota units per page
+COMMENT_FIELDS = ("nextPageToken,items(id,snippet(totalReplyCount,topLevelComment(snippet("
+                  "authorDisplayName,textDisplay,likeCount,publishedAt))))")
+
+# MinHash: NUM_PERM hash functions split into bands of BAND_ROWS for the LSH index
+NUM_PERM = 48
+BAND_ROWS = 3  # 16 bands: ~98% of pairs at Jaccard 0.6 become candidates, ~12% at 0.2
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240501)
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+
+URL_PATTERN = re.compile(r"https?://\S+")
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def _timestamp(published_at):
+    return datetime.fromisoformat(published_at.replace("Z", "+00:00")).timestamp()
+
+
+class CommentCursors:
+    """
+    Per-video sync cursors (newest comment time and the ids seen at that time), kept as JSON.
+    A cursor only moves once a sync has walked every new comment, so an interrupted sync is redone.
+    """
+
+    def __init__(self, path=COMMENT_CURSORS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.cursors = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.cursors = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def get(self, video_id):
+        return self.cursors.get(video_id)
+
+    def advance(self, video_id, cursor):
+        with self._lock:
+            self.cursors[video_id] = cursor
+            write_atomic(self.path, json.dumps(self.cursors))  # A crash never leaves a torn cursor file
+
+
+def iter_new_comments(youtube, video_id, cursors, quota=None):
+    """
+    Yields the video's top-level comments that are newer than its cursor, newest first, one
+    commentThreads().list page (100 threads) at a time; paging stops at the first already-synced comment.
+    The cursor advances when the generator is exhausted, not if the caller stops early or the quota runs out.
+    """
+    cursor = cursors.get(video_id) or {"published_at": None, "ids": []}
+    since, seen_ids = cursor["published_at"], set(cursor["ids"])
+    newest, newest_ids = since, set(seen_ids)
+    page_token = None
+    while True:
+        if quota is not None:
+            quota.spend(COMMENT_THREADS_COST)
+        response = youtube.commentThreads().list(
+            part="snippet", videoId=video_id, order="time", maxResults=PAGE_SIZE, textFormat="plainText",
+            pageToken=page_token, fields=COMMENT_FIELDS).execute()
+        reached_cursor = False
+        for item in response.get("items", []):
+            snippet = item["snippet"]["topLevelComment"]["snippet"]
+            published = _timestamp(snippet["publishedAt"])
+            if since is not None and (published < since or (published == since and item["id"] in seen_ids)):
+                if published < since:
+                    reached_cursor = True
+                    break
+                continue
+            if newest is None or published > newest:
+                newest, newest_ids = published, {item["id"]}
+            elif published == newest:
+                newest_ids.add(item["id"])
+            yield {"id": item["id"], "video_id": video_id, "author": snippet.get("authorDisplayName"),
+                   "text": snippet.get("textDisplay", ""), "likes": snippet.get("likeCount", 0),
+                   "published_at": published, "replies": item["snippet"].get("totalReplyCount", 0)}
+        page_token = response.get("nextPageToken")
+        if reached_cursor or not page_token:
+            break
+    if newest is not None and (newest != since or newest_ids != seen_ids):
+        cursors.advance(video_id, {"published_at": newest, "ids": sorted(newest_ids)})
+
+
+def normalize(text):
+    """Lowercased text without links, punctuation or repeated whitespace; what "duplicate" is judged on."""
+    return " ".join(WORD_PATTERN.findall(URL_PATTERN.sub(" ", text.lower())))
+
+
+def minhash(tokens):
+    hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint64, count=len(tokens))
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0)
+
+
+class CommentClusterer:
+    """
+    Groups a stream of comments: exact duplicates (after normalize) and comments whose word sets
+    overlap by at least `similarity` (Jaccard) share a cluster. Candidates come from a MinHash LSH
+    index, so each comment is compared with a handful of clusters, not all of them. Only clusters are
+    kept, and when there are more than max_clusters the smallest half is dropped, so memory stays flat
+    however many comments stream through.
+    """
+
+    def __init__(self, similarity=COMMENT_SIMILARITY, max_clusters=COMMENT_MAX_CLUSTERS):
+        self.similarity = similarity
+        self.max_clusters = max_clusters
+        self.clusters = {}
+        self._exact = {}  # Recently seen normalized texts -> cluster id, oldest first; bounded like the clusters
+        self._bands = {}  # (band, minhash rows) -> cluster ids
+        self._next_id = 0
+        self.seen = 0
+        self.duplicates = 0
+        self.dropped = 0
+
+    def add(self, comment):
+        self.seen += 1
+        text = normalize(comment["text"]) or comment["text"].strip()
+        if not text:
+            return None
+        cluster_id = self._exact.get(text)
+        if cluster_id in self.clusters:
+            self.duplicates += 1
+        else:
+            tokens = frozenset(text.split())
+            rows = minhash(sorted(tokens)).reshape(-1, BAND_ROWS).tolist()
+            keys = [(band, *row) for band, row in enumerate(rows)]
+            cluster_id = self._match(tokens, keys)
+            if cluster_id is None:
+                cluster_id = self._new_cluster(comment, tokens, keys)
+            self._exact[text] = cluster_id
+            if len(self._exact) > 4 * self.max_clusters:
+                del self._exact[next(iter(self._exact))]
+        cluster = self.clusters[cluster_id]
+        cluster["count"] += 1
+        cluster["likes"] += comment.get("likes", 0)
+        if comment.get("likes", 0) > cluster["top_likes"]:
+            # The most liked comment speaks for the cluster and is the one to reply to
+            cluster.update(text=comment["text"], reply_to=comment["id"], top_likes=comment["likes"])
+        if len(self.clusters) > self.max_clusters:
+            self._prune()
+        return cluster_id
+
+    def _match(self, tokens, keys):
+        candidates = set()
+        for key in keys:
+            candidates.update(self._bands.get(key, ()))
+        best, best_score = None, self.similarity
+        for cluster_id in candidates:
+            other = self.clusters[cluster_id]["tokens"]
+            score = len(tokens & other) / len(tokens | other)
+            if score >= best_score:
+                best, best_score = cluster_id, score
+        return best
+
+    def _new_cluster(self, comment, tokens, keys):
+        cluster_id, self._next_id = self._next_id, self._next_id + 1  # Never reused, so stale _exact entries miss
+        self.clusters[cluster_id] = {"id": cluster_id, "text": comment["text"], "reply_to": comment["id"],
+                                     "top_likes": comment.get("likes", 0), "count": 0, "likes": 0,
+                                     "tokens": tokens, "keys": keys}
+        for key in keys:
+            self._bands.setdefault(key, set()).add(cluster_id)
+        return cluster_id
+
+    def _prune(self):
+        victims = heapq.nsmallest(len(self.clusters) - self.max_clusters // 2, self.clusters.values(),
+                                  key=lambda cluster: (cluster["count"], cluster["likes"], -cluster["id"]))
+        for cluster in victims:
+            del self.clusters[cluster["id"]]
+            for key in cluster["keys"]:
+                bucket = self._bands[key]
+                bucket.discard(cluster["id"])
+                if not bucket:
+                    del self._bands[key]
+            self.dropped += cluster["count"]
+
+    def top(self, n):
+        """The n biggest clusters (ties broken by likes), as plain dicts."""
+        best = heapq.nlargest(n, self.clusters.values(), key=lambda cluster: (cluster["count"], cluster["likes"]))
+        return [{key: cluster[key] for key in ("id", "text", "reply_to", "count", "likes")} for cluster in best]
+
+
+def parse_replies(content, count):
+    """Parses {"replies": [{"id": n, "reply": "..."}]}; returns {n: reply} for ids 1..count, or None."""
+    try:
+        data = json.loads(content)
+        replies = {int(entry["id"]): str(entry["reply"]).strip() for entry in data["replies"]}
+    except (TypeError, ValueError, KeyError):
+        return None
+    replies = {number: reply for number, reply in replies.items() if 1 <= number <= count}
+    return replies or None
+
+
+def draft_replies(clusters, video_title=None, batch_size=COMMENT_REPLY_BATCH, use_cache=True):
+    """
+    Drafts one reply per comment cluster, `batch_size` clusters per LLM call. Returns a list of
+    {"reply_to", "comment", "similar", "reply"}; comments the model judges not worth answering are left out.
+    """
+    about = f" on the video '{video_title}'" if video_title else ""
+    drafts = []
+    for start in range(0, len(clusters), batch_size):
+        batch = clusters[start:start + batch_size]
+        listing = "\n".join(f"{number}. ({cluster['count']} similar) {cluster['text'][:500]}"
+                            for number, cluster in enumerate(batch, 1))
+        messages = [
+            {"role": "system", "content": "You are the friendly host of a YouTube channel replying to viewers. "
+                                          "Reply with a single JSON object only."},
+            {"role": "user", "content": f"""Viewers left these comments{about}. Each comment stands for the number of similar ones shown.
+Write a short, warm reply (at most 2 sentences) to each. Use an empty reply for spam or comments that need no answer.
+Return {{"replies": [{{"id": <comment number>, "reply": "<reply>"}}]}} with one entry per comment.
+
+{listing}"""},
+        ]
+        status_code, content = chat_completion(
+            messages, use_cache=use_cache, validate=partial(parse_replies, count=len(batch)),
+            max_tokens=80 * len(batch) + 100, temperature=0.7, response_format={"type": "json_object"})
+        replies = parse_replies(content, len(batch)) if status_code == 200 else None
+        if replies is None:
+            print(f"⚠️ Reply drafting failed for {len(batch)} comments ({status_code}).")
+            continue
+        for number, cluster in enumerate(batch, 1):
+            if replies.get(number):
+                drafts.append({"reply_to": cluster["reply_to"], "comment": cluster["text"],
+                               "similar": cluster["count"], "reply": replies[number]})
+    return drafts
+
+
+def engage_video(video_id, youtube=None, cursors=None, quota=None, video_title=None, max_replies=40,
+                 draft=True, use_cache=True):
+    """
+    Syncs a video's new comments, clusters them and drafts replies for the biggest `max_replies`
+    clusters. Returns {"video_id", "new_comments", "duplicates", "clusters", "dropped", "drafts"}.
+    """
+    youtube = youtube or build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+    cursors = cursors if cursors is not None else CommentCursors()
+    clusterer = CommentClusterer()
+    for comment in iter_new_comments(youtube, video_id, cursors, quota):
+        clusterer.add(comment)
+    top = clusterer.top(max_replies)
+    return {"video_id": video_id, "new_comments": clusterer.seen, "duplicates": clusterer.duplicates,
+            "clusters": len(clusterer.clusters), "dropped": clusterer.dropped,
+            "drafts": draft_replies(top, video_title, use_cache=use_cache) if draft and top else []}
+
+
+def engage_uploads(youtube=None, store=None, max_replies=40, draft=True):
+    """Runs engage_video over every upload in the job store, sharing cursors and quota; stops when the quota runs out."""
+    if store is None:
+        from backend.database import job_store as store
+    youtube = youtube or build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+    cursors, quota = CommentCursors(), QuotaTracker()
+    results = []
+    for upload in store.query("SELECT video_id, title FROM uploads ORDER BY uploaded_at DESC"):
+        try:
+            results.append(engage_video(upload["video_id"], youtube, cursors, quota, upload["title"],
+                                        max_replies, draft))
+        except QuotaExceeded as e:
+            print(f"⚠️ {e}; remaining videos sync next time.")
+            break
+        except Exception as e:
+            print(f"❌ Comment sync failed for {upload['video_id']}: {e}")
+    return results
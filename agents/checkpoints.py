@@ -0,0 +1,71 @@
+import os
+import json
+import hashlib
+import threading
+from models.file_utils import write_atomic
+
+
+def referenced_files(value):
+    """Paths of existing files mentioned anywhere in a stage output."""
+    if isinstance(value, str):
+        return [value] if len(value) < 4096 and os.path.isfile(value) else []
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        return [path for item in value for path in referenced_files(item)]
+    return []
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def output_digest(output):
+    """Digest of a stage output: its JSON form plus size/mtime of every file it points to (like make)."""
+    files = {path: file_signature(path) for path in referenced_files(output)}
+    payload = json.dumps([output, files], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fingerprint(name, params, dep_digests):
+    """Identifies a stage's inputs: its name, parameters and the digests of its dependencies' outputs."""
+    payload = json.dumps([name, params, dep_digests], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class StageStore:
+    """
+    Checkpoints of finished stages for one job, kept as JSON (normally in the job's workspace).
+    A checkpoint is reused only if the stage's fingerprint matches and every file it produced is unchanged.
+    """
+
+    def __init__(self, path, reset=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self.records = {}
+        if not reset:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.records = json.load(f)
+            except (OSError, ValueError):
+                pass
+
+    def lookup(self, name, stage_fingerprint):
+        """Returns (True, output) for a valid checkpoint, else (False, None)."""
+        record = self.records.get(name)
+        if not record or record["fingerprint"] != stage_fingerprint:
+            return False, None
+        for path, signature in record["files"].items():
+            if not os.path.isfile(path) or file_signature(path) != signature:
+                return False, None
+        return True, record["output"]
+
+    def save(self, name, stage_fingerprint, output):
+        """Records a stage's output; raises TypeError if the output isn't JSON-serializable."""
+        record = {"fingerprint": stage_fingerprint, "output": json.loads(json.dumps(output)),
+                  "files": {path: file_signature(path) for path in referenced_files(output)}}
+        with self._lock:
+            self.records[name] = record
+            # Atomic, so a crash never leaves a torn checkpoint file
+            write_atomic(self.path, json.dumps(self.records, indent=2, ensure_ascii=False))
@@ -0,0 +1,66 @@
+import hashlib
+import subprocess
+from concurrent.futures.process import BrokenProcessPool
+from moviepy.config import get_setting
+from models.media_cache import MediaCache
+from models.file_utils import atomic_output
+from models.process_pool import WorkerPool
+from agents.timeline import CLIP_SECONDS
+from configs.settings import VIDEO_RESOLUTION, NORMALIZED_CACHE_DIR, NORMALIZED_CACHE_MAX_BYTES, NORMALIZE_WORKERS
+
+FPS = 24
+# Canonical intermediate: fixed size/fps, short GOP and fastdecode so assembly decodes cheaply
+PROFILE = f"{VIDEO_RESOLUTION[0]}x{VIDEO_RESOLUTION[1]}_{FPS}fps_{CLIP_SECONDS}s_x264fastdecode"
+ENCODE_ARGS = ["-c:v", "libx264", "-preset", "veryfast", "-tune", "fastdecode", "-crf", "18",
+               "-g", str(FPS), "-pix_fmt", "yuv420p", "-an"]
+
+normalized_cache = MediaCache(NORMALIZED_CACHE_DIR, NORMALIZED_CACHE_MAX_BYTES)
+normalize_pool = WorkerPool(NORMALIZE_WORKERS)
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_clip(path):
+    """
+    Transcodes the first CLIP_SECONDS of a clip into the canonical intermediate and returns its path.
+    Intermediates are cached by source hash, so a reused clip is only ever normalized once.
+    """
+    source_hash = file_hash(path)
+    cached = normalized_cache.get(source_hash, PROFILE)
+    if cached:
+        return cached
+
+    final_path = normalized_cache.path_for(source_hash, PROFILE)
+    width, height = VIDEO_RESOLUTION
+    try:
+        with atomic_output(final_path) as temp_path:
+            subprocess.run([
+                get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+                "-i", path, "-t", str(CLIP_SECONDS),
+                "-vf", f"scale={width}:{height},setsar=1,fps={FPS}",
+                *ENCODE_ARGS, "-f", "mp4", temp_path,
+            ], check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"⚠️ Failed to normalize {path}: {e}")
+        return None
+    normalized_cache.add(final_path)
+    return final_path
+
+
+def normalize_in_pool(path):
+    """
+    Normalizes a clip in a worker process; blocks the calling (download) thread until it is ready.
+    Returns the intermediate's path, or None if normalization failed (the caller keeps the raw clip).
+    """
+    try:
+        return normalize_pool.run(normalize_clip, path)
+    except BrokenProcessPool as e:
+        print(f"⚠️ Normalization worker crashed on {path}: {e}")
+        return None
@@ -0,0 +1,107 @@
+import os
+import subprocess
+import tempfile
+from collections import Counter
+from PIL import Image
+from moviepy.config import get_setting
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from agents.timeline import CLIP_SECONDS, plan_timeline
+from agents.subtitle_generator import subtitle_font_size, subtitle_timeline
+from agents.subtitle_renderer import render_caption
+from configs.settings import VIDEO_RESOLUTION
+
+FPS = 24
+
+
+def probe_duration(path):
+    """Returns a media file's duration in seconds (None if ffmpeg can't read it)."""
+    try:
+        return ffmpeg_parse_infos(path).get("duration")
+    except Exception as e:
+        print(f"⚠️ Could not probe {path}: {e}")
+        return None
+
+
+def build_filtergraph(clip_durations, order, captions, size=VIDEO_RESOLUTION, fps=FPS, first_caption_input=0):
+    """
+    Builds an ffmpeg filter_complex string for the timeline:
+    trim + scale each clip once, split it for every repeat, concat in playback order,
+    then overlay each caption image over its time window. The result is labelled [vout].
+    """
+    width, height = size
+    uses = Counter(order)
+    filters = []
+    labels = {}
+
+    for index, count in sorted(uses.items()):
+        chain = (f"[{index}:v]trim=duration={clip_durations[index]:.3f},setpts=PTS-STARTPTS,"
+                 f"scale={width}:{height},setsar=1,fps={fps}")
+        outputs = [f"c{index}_{n}" for n in range(count)]
+        if count > 1:
+            chain += f",split={count}"
+        filters.append(chain + "".join(f"[{label}]" for label in outputs))
+        labels[index] = iter(outputs)
+
+    concat_inputs = "".join(f"[{next(labels[index])}]" for index in order)
+    filters.append(f"{concat_inputs}concat=n={len(order)}:v=1:a=0[base]")
+
+    current = "base"
+    for n, (start, end) in enumerate(captions):
+        filters.append(f"[{current}][{first_caption_input + n}:v]overlay=x=(W-w)/2:y=H-h:"
+                       f"enable='between(t,{start:.3f},{end:.3f})'[ov{n}]")
+        current = f"ov{n}"
+    filters.append(f"[{current}]null[vout]")
+    return ";".join(filters)
+
+
+def render_with_ffmpeg(clip_paths, audio_file, output_path, script_text=None, size=VIDEO_RESOLUTION, fps=FPS,
+                       timings=None):
+    """
+    Renders the same timeline as the moviepy engine (clips trimmed to CLIP_SECONDS, looped to cover the audio,
+    optional burned-in captions) as a single native ffmpeg filtergraph. Returns output_path or None.
+    """
+    clips = []
+    for path in clip_paths:
+        duration = probe_duration(path)
+        if duration:
+            clips.append((path, min(CLIP_SECONDS, duration)))
+    audio_duration = probe_duration(audio_file)
+    if not clips or not audio_duration:
+        print("❌ No valid video clips or audio for ffmpeg render.")
+        return None
+
+    clip_durations = [duration for _, duration in clips]
+    order = plan_timeline(clip_durations, audio_duration)
+    video_duration = sum(clip_durations[index] for index in order)
+
+    with tempfile.TemporaryDirectory() as caption_dir:
+        cmd = [get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error"]
+        for path, _ in clips:
+            cmd += ["-i", path]
+        cmd += ["-i", audio_file]
+
+        captions = []
+        if script_text:
+            font_size = subtitle_font_size(size[1])
+            for n, (line, start, end) in enumerate(subtitle_timeline(script_text, video_duration, timings)):
+                caption_path = os.path.join(caption_dir, f"caption_{n}.png")
+                Image.fromarray(render_caption(line, font_size, int(size[0] * 0.9))).save(caption_path)
+                cmd += ["-i", caption_path]
+                captions.append((start, end))
+
+        filtergraph = build_filtergraph(clip_durations, order, captions, size, fps, first_caption_input=len(clips) + 1)
+        cmd += [
+            "-filter_complex", filtergraph,
+            "-map", "[vout]", "-map", f"{len(clips)}:a",
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", "-r", str(fps),
+            "-c:a", "aac",
+            output_path,
+        ]
+        try:
+            subprocess.run(cmd, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"❌ ffmpeg render failed: {e}")
+            return None
+
+    print(f"✅ ffmpeg render saved as '{output_path}'")
+    return output_path
@@ -1 +1,293 @@
- 
+import os
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+import numpy as np
+from googleapiclient.discovery import build
+from models.file_utils import atomic_output, write_atomic
+from configs.settings import (YOUTUBE_API_KEY, YOUTUBE_DAILY_QUOTA, ANALYTICS_STORE_PATH, ANALYTICS_QUOTA_PATH,
+                             ANALYTICS_REFRESH_SECONDS)
+
+MAX_IDS_PER_REQUEST = 50  # videos().list accepts at most 50 ids
+VIDEOS_LIST_COST = 1  # Quota units per videos().list call, however many ids it carries
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")  # The Data API quota resets at midnight Pacific time
+
+# Partial response: only the fields we store, which keeps each 50-video response small
+VIDEO_FIELDS = "items(id,snippet(publishedAt),statistics(viewCount,likeCount,commentCount))"
+RETENTION_METRICS = "averageViewDuration,averageViewPercentage"
+
+# Column name -> (dtype, value for rows that don't have it yet). Metrics are floats so that
+# hidden or not-yet-fetched values are NaN and drop out of aggregates.
+COLUMNS = {
+    "video_id": (str, ""),
+    "topic": (str, ""),
+    "region": (str, ""),
+    "published_at": (np.float64, np.nan),
+    "upload_hour": (np.int8, -1),  # UTC hour of publishing
+    "views": (np.float64, np.nan),
+    "likes": (np.float64, np.nan),
+    "comments": (np.float64, np.nan),
+    "avg_view_duration": (np.float64, np.nan),  # Seconds, from the Analytics API
+    "avg_view_percentage": (np.float64, np.nan),
+    "available": (np.bool_, True),  # False once the API stops returning the video (deleted or private)
+    "fetched_at": (np.float64, np.nan),
+}
+
+
+class QuotaExceeded(RuntimeError):
+    pass
+
+
+class QuotaTracker:
+    """Counts Data API units spent today and refuses calls that would go over the daily budget."""
+
+    def __init__(self, daily_units=YOUTUBE_DAILY_QUOTA, path=ANALYTICS_QUOTA_PATH):
+        self.daily_units = daily_units
+        self.path = path
+        self._lock = threading.Lock()
+        self.day, self.used = self._today(), 0
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                if state.get("day") == self.day:
+                    self.used = state["used"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    @staticmethod
+    def _today():
+        return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+    def _roll_over(self):
+        if self._today() != self.day:
+            self.day, self.used = self._today(), 0
+
+    @property
+    def remaining(self):
+        with self._lock:
+            self._roll_over()
+            return self.daily_units - self.used
+
+    def spend(self, units):
+        """Reserves `units` before a call; raises QuotaExceeded if the budget doesn't cover them."""
+        with self._lock:
+            self._roll_over()
+            if self.used + units > self.daily_units:
+                raise QuotaExceeded(f"YouTube quota exhausted ({self.used}/{self.daily_units} units used today)")
+            self.used += units
+            if self.path:
+                write_atomic(self.path, json.dumps({"day": self.day, "used": self.used}))
+
+
+class PerformanceStore:
+    """
+    Per-video stats as one NumPy array per column (persisted with np.savez), so aggregates over
+    thousands of videos are a few vectorized passes. Rows are updated in place by video id.
+    """
+
+    def __init__(self, path=ANALYTICS_STORE_PATH):
+        self.path = path
+        self.columns = {name: np.array([], dtype=dtype) for name, (dtype, _) in COLUMNS.items()}
+        if path and os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                size = len(data["video_id"])
+                for name, (dtype, default) in COLUMNS.items():
+                    self.columns[name] = data[name] if name in data else np.full(size, default, dtype=dtype)
+        self._index = {video_id: row for row, video_id in enumerate(self.columns["video_id"].tolist())}
+
+    def __len__(self):
+        return len(self.columns["video_id"])
+
+    def __contains__(self, video_id):
+        return video_id in self._index
+
+    def get(self, video_id):
+        """One video's row as a dict, or None."""
+        row = self._index.get(video_id)
+        if row is None:
+            return None
+        return {name: column[row].item() for name, column in self.columns.items()}
+
+    def upsert(self, rows):
+        """
+        Inserts or updates rows (dicts keyed by column name, all with the same keys). Columns a row
+        leaves out keep their stored values, so a stats refresh doesn't wipe earlier retention numbers.
+        """
+        rows = list({row["video_id"]: row for row in rows}.values())
+        if not rows:
+            return
+        positions = np.array([self._index.get(row["video_id"], -1) for row in rows], dtype=np.int64)
+        new = positions < 0
+        if new.any():
+            start = len(self)
+            positions[new] = np.arange(start, start + int(new.sum()))
+            for name, (dtype, default) in COLUMNS.items():
+                grown = np.full(int(new.sum()), default, dtype=dtype)
+                self.columns[name] = np.concatenate([self.columns[name], grown])
+            for row, position in zip(rows, positions.tolist()):
+                self._index.setdefault(row["video_id"], position)
+        for name in COLUMNS:
+            if name not in rows[0]:
+                continue
+            values = np.array([row[name] for row in rows], dtype=COLUMNS[name][0])
+            column = self.columns[name]
+            if column.dtype.kind == "U":
+                column = column.astype(np.result_type(column, values))  # Widen for longer strings
+            column[positions] = values
+            self.columns[name] = column
+
+    def stale(self, video_ids, max_age=ANALYTICS_REFRESH_SECONDS, now=None):
+        """The ids whose stats are missing or older than max_age seconds, least recently fetched first."""
+        now = time.time() if now is None else now
+        fetched_at = self.columns["fetched_at"]
+        last = np.array([fetched_at[self._index[video_id]] if video_id in self._index else -np.inf
+                         for video_id in video_ids], dtype=np.float64)
+        last = np.where(np.isnan(last), -np.inf, last)
+        order = np.argsort(last, kind="stable")
+        return [video_ids[i] for i in order.tolist() if not now - last[i] < max_age]
+
+    def column(self, name):
+        """A stored column, or a derived one: "engagement_rate" is (likes + comments) / views."""
+        if name == "engagement_rate":
+            views = self.columns["views"]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(views > 0, (self.columns["likes"] + self.columns["comments"]) / views, np.nan)
+        return self.columns[name]
+
+    def aggregate(self, by, metric="views", how="mean"):
+        """
+        Groups available videos by a column ("topic", "region", "upload_hour", ...) and returns
+        {group: value} with how = "mean", "sum" or "count" of `metric`. Videos without the metric are left out.
+        """
+        keys, values = self.columns[by], self.column(metric)
+        mask = self.columns["available"] & ~np.isnan(values) & (keys != COLUMNS[by][1])
+        groups, inverse = np.unique(keys[mask], return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(groups))
+        if how == "count":
+            result = counts
+        elif how in ("sum", "mean"):
+            result = np.bincount(inverse, weights=values[mask], minlength=len(groups))
+            if how == "mean":
+                result = result / counts
+        else:
+            raise ValueError(f"Unknown aggregate '{how}'; use 'mean', 'sum' or 'count'")
+        return dict(zip(groups.tolist(), result.tolist()))
+
+    def save(self):
+        with atomic_output(self.path) as temp_path:  # Readers never see a half-written store
+            with open(temp_path, "wb") as f:
+                np.savez(f, **self.columns)
+
+
+def uploaded_videos(store=None):
+    """Every uploaded video with its job's topic and region, from the job history database."""
+    if store is None:
+        from backend.database import job_store as store
+    return store.query("SELECT u.video_id, j.topic, j.region FROM uploads u LEFT JOIN jobs j ON j.id = u.job_id "
+                       "ORDER BY u.uploaded_at")
+
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+
+def _count(statistics, key):
+    # Counts arrive as strings and are absent when the owner hides them
+    return float(statistics[key]) if key in statistics else np.nan
+
+
+def fetch_statistics(youtube, video_ids):
+    """One videos().list call for up to 50 ids; returns {video_id: row} for the videos the API returned."""
+    # maxResults can't be combined with id; the response simply holds every requested video that exists
+    response = youtube.videos().list(part="snippet,statistics", id=",".join(video_ids), fields=VIDEO_FIELDS).execute()
+    rows = {}
+    for item in response.get("items", []):
+        statistics = item.get("statistics", {})
+        published = _parse_time(item["snippet"]["publishedAt"])
+        rows[item["id"]] = {"published_at": published.timestamp(), "upload_hour": published.hour,
+                            "views": _count(statistics, "viewCount"), "likes": _count(statistics, "likeCount"),
+                            "comments": _count(statistics, "commentCount")}
+    return rows
+
+
+def fetch_retention(analytics, video_ids, start_date):
+    """Average view duration and percentage per video from the YouTube Analytics API (channel owner only)."""
+    response = analytics.reports().query(
+        ids="channel==MINE", startDate=start_date, endDate=datetime.now(timezone.utc).date().isoformat(),
+        metrics=RETENTION_METRICS, dimensions="video", filters="video==" + ",".join(video_ids),
+        maxResults=len(video_ids)).execute()
+    names = [header["name"] for header in response.get("columnHeaders", [])]
+    return {values[0]: dict(zip(names[1:], values[1:])) for values in response.get("rows") or []}
+
+
+def refresh_performance(youtube=None, videos=None, store=None, quota=None, analytics=None,
+                        max_age=ANALYTICS_REFRESH_SECONDS, now=None):
+    """
+    Refreshes the stats of uploaded videos whose numbers are older than max_age seconds, 50 ids per
+    videos().list call, stopping early (keeping what was fetched) when the daily quota runs out or a
+    request fails; the failure is reported in the summary's "error".
+    `videos` are dicts with video_id, topic and region (default: every upload in the job store).
+    Retention needs the owner's YouTube Analytics client (`analytics`); without it those columns stay as they are.
+    Returns a summary of the run.
+    """
+    youtube = youtube or build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+    store = store if store is not None else PerformanceStore()
+    quota = quota or QuotaTracker()
+    now = time.time() if now is None else now
+    videos = {video["video_id"]: video for video in (uploaded_videos() if videos is None else videos)}
+
+    due = store.stale(list(videos), max_age, now)
+    summary = {"due": len(due), "fresh": len(videos) - len(due), "fetched": 0, "missing": 0, "requests": 0,
+               "quota_exhausted": False, "error": None}
+    for start in range(0, len(due), MAX_IDS_PER_REQUEST):
+        batch = due[start:start + MAX_IDS_PER_REQUEST]
+        try:
+            quota.spend(VIDEOS_LIST_COST)
+        except QuotaExceeded as e:
+            print(f"⚠️ {e}; {len(due) - start} videos left for the next refresh.")
+            summary["quota_exhausted"] = True
+            break
+        summary["requests"] += 1
+        try:
+            stats = fetch_statistics(youtube, batch)
+        except Exception as e:  # HttpError, timeouts, connection resets: keep the batches fetched so far
+            print(f"⚠️ Stats fetch failed: {e}; {len(due) - start} videos left for the next refresh.")
+            summary["error"] = str(e)
+            break
+
+        if analytics is not None and stats:
+            first_day = datetime.fromtimestamp(min(row["published_at"] for row in stats.values()), timezone.utc)
+            try:
+                retention = fetch_retention(analytics, list(stats), first_day.date().isoformat())
+            except Exception as e:
+                print(f"⚠️ Retention fetch failed: {e}")
+                retention = {}
+            # Only videos in the report get retention columns; the others keep what the store already has
+            for video_id, report in retention.items():
+                if video_id in stats:
+                    stats[video_id]["avg_view_duration"] = float(report.get("averageViewDuration", np.nan))
+                    stats[video_id]["avg_view_percentage"] = float(report.get("averageViewPercentage", np.nan))
+
+        rows = []
+        for video_id in batch:
+            video = videos[video_id]
+            row = {"video_id": video_id, "topic": video.get("topic") or "", "region": video.get("region") or "",
+                   "fetched_at": now, "available": video_id in stats}
+            if video_id in stats:
+                row.update(stats[video_id])
+            rows.append(row)
+        # Missing videos and videos without a retention report carry fewer columns, so each shape goes in separately
+        shapes = {}
+        for row in rows:
+            shapes.setdefault(frozenset(row), []).append(row)
+        for group in shapes.values():
+            store.upsert(group)
+        summary["fetched"] += len(stats)
+        summary["missing"] += len(batch) - len(stats)
+
+    store.save()
+    summary["quota_remaining"] = quota.remaining
+    return summary
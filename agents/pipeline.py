@@ -0,0 +1,181 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from agents.checkpoints import fingerprint, output_digest
+from configs.settings import PIPELINE_IO_WORKERS, PIPELINE_CPU_WORKERS
+
+FINISHED = ("done", "reused", "failed", "skipped", "cancelled")
+
+
+class Stage:
+    """
+    One node of a pipeline: func(inputs) runs once every stage in `deps` has finished,
+    where inputs maps each dependency's name to its output.
+    kind is "io" (network-bound) or "cpu" (encoding); optional stages may fail without blocking dependents.
+    params are the settings that shape the output; with a StageStore, they and the dependencies' outputs
+    fingerprint the stage so an unchanged one is reused instead of run again.
+    provider names the external service the stage relies on (e.g. "groq"), for failure statistics.
+    """
+
+    def __init__(self, name, func, deps=(), kind="io", optional=False, params=None, provider=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.kind = kind
+        self.optional = optional
+        self.params = params or {}
+        self.provider = provider
+
+
+class Pipeline:
+    """Runs a DAG of stages, starting each one as soon as its dependencies are done."""
+
+    def __init__(self, stages, io_workers=PIPELINE_IO_WORKERS, cpu_workers=PIPELINE_CPU_WORKERS, store=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self.store = store  # StageStore of checkpoints, or None to always run every stage
+        self._check_graph()
+
+    def _check_graph(self):
+        """Raises ValueError on unknown dependencies or cycles."""
+        visiting, visited = set(), set()
+
+        def visit(name, path):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+                visit(dep, path + [name])
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name, [])
+
+    def _blocked(self, stage, records):
+        return any(records[dep]["status"] in ("failed", "skipped") and not self.stages[dep].optional
+                   for dep in stage.deps)
+
+    def run(self, on_event=None, cancel=None):
+        """
+        Executes the pipeline and returns (outputs, report). outputs maps stage names to results;
+        report has per-stage status and timings (seconds from the start), total elapsed time,
+        the critical path (the chain of stages that actually determined when the job finished)
+        and the stages reused from checkpoints. Like make, the run resumes from the first stale stage.
+        on_event(event) is called with {"stage", "status", ...timings} whenever a stage changes status.
+        Once the `cancel` threading.Event is set no further stages start; running ones finish.
+        """
+        started = time.perf_counter()
+        records = {name: {"status": "pending", "kind": stage.kind, "provider": stage.provider}
+                   for name, stage in self.stages.items()}
+        outputs = {}
+        digests = {}
+        fingerprints = {}
+        running = {}
+
+        def notify(name):
+            if on_event is not None:
+                try:
+                    on_event({"stage": name, **records[name]})
+                except Exception as e:
+                    print(f"⚠️ Progress callback failed: {e}")
+
+        def execute(stage, inputs):
+            records[stage.name].update(status="running", started=round(time.perf_counter() - started, 3))
+            notify(stage.name)
+            return stage.func(inputs)
+
+        with ThreadPoolExecutor(self.io_workers, thread_name_prefix="stage-io") as io_pool, \
+                ThreadPoolExecutor(self.cpu_workers, thread_name_prefix="stage-cpu") as cpu_pool:
+            while True:
+                # Skipped and reused stages finish instantly and may unblock others, so repeat until stable
+                changed = True
+                while changed:
+                    changed = False
+                    for name, stage in self.stages.items():
+                        record = records[name]
+                        if record["status"] != "pending":
+                            continue
+                        if cancel is not None and cancel.is_set():
+                            record["status"] = "cancelled"
+                            notify(name)
+                        elif self._blocked(stage, records):
+                            record["status"] = "skipped"
+                            print(f"⏭️ Stage '{name}' skipped (a dependency failed)")
+                            notify(name)
+                            changed = True
+                        elif all(records[dep]["status"] in FINISHED for dep in stage.deps):
+                            inputs = {dep: outputs.get(dep) for dep in stage.deps}
+                            if self.store is not None:
+                                fingerprints[name] = fingerprint(name, stage.params,
+                                                                 {dep: digests.get(dep) for dep in stage.deps})
+                                reusable, output = self.store.lookup(name, fingerprints[name])
+                                if reusable:
+                                    outputs[name], digests[name] = output, output_digest(output)
+                                    now = round(time.perf_counter() - started, 3)
+                                    record.update(status="reused", started=now, finished=now, seconds=0.0)
+                                    print(f"♻️ Stage '{name}' reused from checkpoint")
+                                    notify(name)
+                                    changed = True
+                                    continue
+                            pool = cpu_pool if stage.kind == "cpu" else io_pool
+                            record["status"] = "queued"  # Before submit: the worker may mark it running at once
+                            running[pool.submit(execute, stage, inputs)] = name
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    record = records[name]
+                    record["finished"] = round(time.perf_counter() - started, 3)
+                    record["seconds"] = round(record["finished"] - record.get("started", record["finished"]), 3)
+                    try:
+                        outputs[name] = future.result()
+                        record["status"] = "done"
+                    except Exception as e:
+                        record["status"] = "failed"
+                        record["error"] = str(e)
+                        print(f"❌ Stage '{name}' failed: {e}")
+                        notify(name)
+                        continue
+                    if self.store is not None:
+                        digests[name] = output_digest(outputs[name])
+                        try:
+                            self.store.save(name, fingerprints[name], outputs[name])
+                        except TypeError as e:
+                            print(f"⚠️ Stage '{name}' output can't be checkpointed: {e}")
+                    notify(name)
+
+        report = {
+            "ok": all(record["status"] in ("done", "reused") or self.stages[name].optional
+                      for name, record in records.items()),
+            "elapsed": round(time.perf_counter() - started, 3),
+            "stages": records,
+            "critical_path": self.critical_path(records),
+            "reused": [name for name, record in records.items() if record["status"] == "reused"],
+            "cancelled": any(record["status"] == "cancelled" for record in records.values()),
+        }
+        return outputs, report
+
+    def critical_path(self, records):
+        """
+        Walks back from the last stage to finish, each time to the dependency that finished last
+        (the one it was actually waiting on). Returns [{"stage", "seconds"}] in execution order.
+        """
+        finished = {name: record for name, record in records.items() if "finished" in record}
+        if not finished:
+            return []
+        name = max(finished, key=lambda n: finished[n]["finished"])
+        path = [name]
+        while True:
+            deps = [dep for dep in self.stages[name].deps if dep in finished]
+            if not deps:
+                break
+            name = max(deps, key=lambda n: finished[n]["finished"])
+            path.append(name)
+        return [{"stage": name, "seconds": finished[name]["seconds"]} for name in reversed(path)]
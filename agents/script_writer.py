@@ -1,16 +1,10 @@
 import json
-from models.llm_model import generate_titles, generate_script
+from models.llm_model import generate_titles, generate_script, generate_script_and_seo, stream_script_sentences
+from agents.seo_optimizer import optimize_seo, finalize_seo
 from configs.settings import DEFAULT_REGION, MAX_RESULTS
 
-def script_generator(region=DEFAULT_REGION, topic=None, return_json=True, selected_index=None):
-    """Generates a short, clean, and properly formatted video script."""
-
-    # Step 1: Generate 5 specific video titles for the given topic
-    generated_titles = generate_titles(topic)
-    
-    if not generated_titles or len(generated_titles) < 5:
-        return {"error": "Could not generate enough specific titles for the topic."}
-
+def select_title(generated_titles, selected_index=None):
+    """Returns the chosen title, asking the user when no index is given, or an error dict."""
     if selected_index is None:  # Only ask for user input if not provided (manual run)
         for idx, title in enumerate(generated_titles, start=1):
             print(f"{title}")
@@ -22,7 +16,20 @@ def script_generator(region=DEFAULT_REGION, topic=None, return_json=True, select
         except ValueError:
             return {"error": "Invalid input. Please enter a number."}
 
-    selected_title = generated_titles[selected_index]
+    return generated_titles[selected_index]
+
+def script_generator(region=DEFAULT_REGION, topic=None, return_json=True, selected_index=None):
+    """Generates a short, clean, and properly formatted video script."""
+
+    # Step 1: Generate 5 specific video titles for the given topic
+    generated_titles = generate_titles(topic)
+    
+    if not generated_titles or len(generated_titles) < 5:
+        return {"error": "Could not generate enough specific titles for the topic."}
+
+    selected_title = select_title(generated_titles, selected_index)
+    if isinstance(selected_title, dict):
+        return selected_title
 
     # ✅ Generate a fully dynamic script using the Groq API
     generated_script = generate_script(selected_title)
@@ -33,3 +40,44 @@ def script_generator(region=DEFAULT_REGION, topic=None, return_json=True, select
 
     return generated_script.strip()  # ✅ Directly return text, not JSON
 
+def script_and_seo_generator(region=DEFAULT_REGION, topic=None, selected_index=None):
+    """
+    Generates the script and SEO metadata for the chosen title in one structured LLM round-trip.
+    Falls back to separate generate_script / optimize_seo calls if the combined response is invalid.
+    Returns {"title", "script", "seo"} or an error dict.
+    """
+    generated_titles = generate_titles(topic)
+
+    if not generated_titles or len(generated_titles) < 5:
+        return {"error": "Could not generate enough specific titles for the topic."}
+
+    selected_title = select_title(generated_titles, selected_index)
+    if isinstance(selected_title, dict):
+        return selected_title
+
+    combined = generate_script_and_seo(selected_title)
+    if combined:
+        seo = finalize_seo({key: combined[key] for key in ("title", "description", "tags", "hashtags")})
+        return {"title": selected_title, "script": combined["script"].strip(), "seo": seo}
+
+    return {
+        "title": selected_title,
+        "script": generate_script(selected_title).strip(),
+        "seo": optimize_seo(selected_title),
+    }
+
+def stream_script_generator(region=DEFAULT_REGION, topic=None, selected_index=None):
+    """
+    Picks a title and returns a generator of cleaned script sentences streamed from the LLM,
+    ready to feed TTSModel.convert_sentences_to_speech. Returns an error dict on failure.
+    """
+    generated_titles = generate_titles(topic)
+
+    if not generated_titles or len(generated_titles) < 5:
+        return {"error": "Could not generate enough specific titles for the topic."}
+
+    selected_title = select_title(generated_titles, selected_index)
+    if isinstance(selected_title, dict):
+        return selected_title
+
+    return stream_script_sentences(selected_title)
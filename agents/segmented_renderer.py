@@ -0,0 +1,150 @@
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from moviepy.config import get_setting
+from moviepy.editor import VideoFileClip, AudioFileClip, CompositeVideoClip
+from agents.timeline import CLIP_SECONDS, plan_timeline
+from agents.ffmpeg_renderer import FPS, probe_duration
+from agents.subtitle_generator import caption_clip, subtitle_font_size, subtitle_timeline
+from models.process_pool import WORKER_CONTEXT
+from configs.settings import VIDEO_RESOLUTION, RENDER_WORKERS
+
+# Every segment must be encoded with exactly these settings so the pieces can be stream-copied together
+ENCODER_SETTINGS = {"codec": "libx264", "preset": "medium", "ffmpeg_params": ["-pix_fmt", "yuv420p"]}
+
+
+def _encode_segment(clip_path, duration, captions, size, fps, output_path, audio_file=None):
+    """Encodes one timeline segment (a single clip plus its caption overlays). Runs in a worker process."""
+    clip = VideoFileClip(clip_path, audio=False)
+    try:
+        segment = clip.subclip(0, duration)
+        if tuple(clip.size) != tuple(size):
+            segment = segment.resize(size)
+
+        if captions:
+            font_size = subtitle_font_size(size[1])
+            overlays = [
+                caption_clip(line, font_size, int(size[0] * 0.9))
+                .set_position(("center", "bottom")).set_start(start).set_duration(end - start)
+                for line, start, end in captions
+            ]
+            segment = CompositeVideoClip([segment] + overlays).set_duration(duration)
+
+        if audio_file:
+            segment = segment.set_audio(AudioFileClip(audio_file))
+        segment.write_videofile(output_path, fps=fps, audio=bool(audio_file), audio_codec="aac",
+                                temp_audiofile=os.path.splitext(output_path)[0] + "_audio.m4a",
+                                threads=1, logger=None, **ENCODER_SETTINGS)
+    finally:
+        clip.close()
+    return output_path
+
+
+def _segment_captions(captions, start, end):
+    """Returns the captions overlapping [start, end), shifted to segment-local time."""
+    local = []
+    for line, caption_start, caption_end in captions:
+        if caption_start < end and caption_end > start:
+            local.append((line, max(caption_start, start) - start, min(caption_end, end) - start))
+    return tuple(local)
+
+
+def snap_to_frames(duration, fps):
+    """Rounds a duration down to whole frames, so segment lengths add up exactly and never run past a clip."""
+    return int(duration * fps + 1e-6) / fps
+
+
+def plan_segments(clip_paths, audio_file, script_text=None, fps=FPS, timings=None):
+    """
+    Lays the clips out to cover the narration and returns the timeline's segments in order as
+    (clip path, frame-aligned duration, segment-local captions), or None without usable clips or audio.
+    """
+    clips = []
+    for path in clip_paths:
+        duration = probe_duration(path)
+        if duration:
+            duration = snap_to_frames(min(CLIP_SECONDS, duration), fps)
+            if duration > 0:
+                clips.append((path, duration))
+    audio_duration = probe_duration(audio_file)
+    if not clips or not audio_duration:
+        return None
+
+    order = plan_timeline([duration for _, duration in clips], audio_duration)
+    video_duration = sum(clips[index][1] for index in order)
+    captions = subtitle_timeline(script_text, video_duration, timings) if script_text else []
+
+    segments = []
+    start = 0
+    for index in order:
+        path, duration = clips[index]
+        segments.append((path, duration, _segment_captions(captions, start, start + duration)))
+        start += duration
+    return segments
+
+
+def render_segmented(clip_paths, audio_file, output_path, script_text=None, workers=RENDER_WORKERS,
+                     size=VIDEO_RESOLUTION, fps=FPS, timings=None):
+    """
+    Splits the timeline at clip boundaries, encodes the segments in parallel worker processes with identical
+    encoder settings and joins them with ffmpeg's concat demuxer (stream copy), muxing the narration once.
+    Identical segments (same clip, same captions) are encoded only once. Returns output_path or None.
+    """
+    segments = plan_segments(clip_paths, audio_file, script_text, fps, timings)
+    if not segments:
+        print("❌ No valid video clips or audio for segmented render.")
+        return None
+
+    if len(segments) == 1:  # Nothing to parallelise: encode straight to the output
+        path, duration, segment_captions = segments[0]
+        try:
+            _encode_segment(path, duration, segment_captions, size, fps, output_path, audio_file=audio_file)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"❌ Segment encode failed: {e}")
+            return None
+        print(f"✅ Video saved as '{output_path}'")
+        return output_path
+
+    with tempfile.TemporaryDirectory() as segment_dir:
+        unique_segments = list(dict.fromkeys(segments))
+        segment_files = {
+            segment: os.path.join(segment_dir, f"segment_{n:04d}.mp4") for n, segment in enumerate(unique_segments)
+        }
+
+        print(f"🧩 Encoding {len(unique_segments)} unique segments with {workers} workers...")
+        try:
+            with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=WORKER_CONTEXT) as pool:
+                futures = [
+                    pool.submit(_encode_segment, *segment, size, fps, segment_files[segment])
+                    for segment in unique_segments
+                ]
+                for future in futures:
+                    future.result()
+        except (OSError, subprocess.CalledProcessError, BrokenProcessPool) as e:
+            print(f"❌ Segment encode failed: {e}")
+            return None
+
+        list_path = os.path.join(segment_dir, "segments.txt")
+        with open(list_path, "w", encoding="utf-8") as list_file:
+            for segment in segments:
+                list_file.write(f"file '{segment_files[segment]}'\n")
+
+        cmd = [
+            get_setting("FFMPEG_BINARY"), "-y", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-i", audio_file,
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy", "-c:a", "aac",
+            "-shortest",  # The output ends with the narration, not with the last segment's final frame
+            output_path,
+        ]
+        try:
+            subprocess.run(cmd, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"❌ Segment concat failed: {e}")
+            return None
+
+    print(f"✅ Segmented render saved as '{output_path}'")
+    return output_path
@@ -1,13 +1,48 @@
 import requests
-import time
-from configs.settings import GROQ_API_KEY
+from models.llm_model import chat_completion
 
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+def finalize_seo(result: dict) -> dict:
+    """Appends the top hashtags to title and description and merges hashtags into the tags."""
+    hashtags_str = " ".join(result["hashtags"][:3])  # Limit to 3 for brevity
+    if result["title"]:
+        result["title"] = f"{result['title']} {hashtags_str}"
+    if result["description"]:
+        result["description"] = f"{result['description']} {hashtags_str}"
+    
+    # Combine tags and hashtags
+    result["tags"] = result["tags"] + result["hashtags"]
+    return result
+
+def parse_seo_text(content: str) -> dict:
+    """Parses the plain-text SEO reply into title, description, tags and hashtags (empty when missing)."""
+    result = {"title": "", "description": "", "tags": [], "hashtags": []}
+    current_field = None
+
+    for line in content.split("\n"):
+        line = line.strip()
+        if line.startswith("Optimized Title:"):
+            result["title"] = line.replace("Optimized Title:", "").strip().strip('"')
+        elif line.startswith("Description:"):
+            current_field = "description"
+            result["description"] = line.replace("Description:", "").strip()
+        elif line.startswith("Tags:"):
+            result["tags"] = [tag.strip() for tag in line.replace("Tags:", "").split(",") if tag.strip()]
+        elif line.startswith("Hashtags:"):
+            result["hashtags"] = [tag.strip() for tag in line.replace("Hashtags:", "").split() if tag.strip()]
+        elif current_field == "description" and line:
+            result["description"] += " " + line
+
+    result["description"] = result["description"].strip()
+    return result
 
-def optimize_seo(video_title: str, max_retries: int = 5) -> dict | None:
+def valid_seo(content: str) -> bool:
+    """Only replies that parse to a title are cached; anything else would replay "No title generated"."""
+    return bool(parse_seo_text(content)["title"])
+
+def optimize_seo(video_title: str, max_retries: int = 5, use_cache: bool = True) -> dict | None:
     """
     Generates an SEO-optimized title, description, tags, and hashtags for the given video title.
-    Includes hashtags in title and description. Retries on API overload.
+    Includes hashtags in title and description. Retries on API overload; identical requests are served from the LLM cache.
     """
     prompt = f"""
     Optimize the SEO for the following YouTube video title:
@@ -32,85 +67,32 @@ def optimize_seo(video_title: str, max_retries: int = 5) -> dict | None:
     Hashtags: [Space-separated list of hashtags]
     """
 
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "model": "mistral-saba-24b",
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.7
-    }
-
-    wait_time = 5
+    messages = [{"role": "user", "content": prompt}]
 
-    for retry in range(max_retries):
-        try:
-            response = requests.post(GROQ_API_URL, headers=headers, json=payload, timeout=15)
+    try:
+        # Shared client handles pooling, per-key rate limiting and Retry-After aware backoff on 429/503
+        status_code, content = chat_completion(messages, use_cache=use_cache, timeout=15, max_retries=max_retries,
+                                               validate=valid_seo, temperature=0.7)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ SEO Optimization Exception: {e}")
+        return None
 
-            if response.status_code == 200:
-                content = response.json().get("choices", [{}])[0].get("message", {}).get("content", "")
-                if not content:
-                    print("❌ SEO Optimization Error: Empty response content")
-                    return None
-                
-                # Parse the response
-                result = {"title": "", "description": "", "tags": [], "hashtags": []}
-                lines = content.split("\n")
-                current_field = None
-
-                for line in lines:
-                    line = line.strip()
-                    if line.startswith("Optimized Title:"):
-                        result["title"] = line.replace("Optimized Title:", "").strip().strip('"')
-                    elif line.startswith("Description:"):
-                        current_field = "description"
-                        result["description"] = line.replace("Description:", "").strip()
-                    elif line.startswith("Tags:"):
-                        result["tags"] = [tag.strip() for tag in line.replace("Tags:", "").split(",") if tag.strip()]
-                    elif line.startswith("Hashtags:"):
-                        result["hashtags"] = [tag.strip() for tag in line.replace("Hashtags:", "").split() if tag.strip()]
-                    elif current_field == "description" and line:
-                        result["description"] += " " + line
-                
-                result["description"] = result["description"].strip()
-                
-                # Append hashtags to title and description
-                hashtags_str = " ".join(result["hashtags"][:3])  # Limit to 3 for brevity
-                if result["title"]:
-                    result["title"] = f"{result['title']} {hashtags_str}"
-                if result["description"]:
-                    result["description"] = f"{result['description']} {hashtags_str}"
-                
-                # Combine tags and hashtags
-                result["tags"] = result["tags"] + result["hashtags"]
-                
-                if not result["title"]:
-                    print("❌ SEO Optimization Error: No title generated")
-                    return None
-                    
-                print(f"✅ SEO Parsed: {result}")
-                return result
-            
-            elif response.status_code in (429, 503):
-                retry_after = response.headers.get("Retry-After")
-                if retry_after:
-                    try:
-                        wait_time = int(retry_after)
-                    except ValueError:
-                        wait_time = 10
-                print(f"⚠️ API error [{response.status_code}]: Overloaded or rate-limited. Retrying in {wait_time}s (attempt {retry + 1}/{max_retries})")
-                time.sleep(wait_time)
-                wait_time = min(wait_time * 2, 60)
-            
-            else:
-                print(f"❌ SEO Optimization Error: {response.status_code}, {response.text}")
-                return None
-                
-        except requests.exceptions.RequestException as e:
-            print(f"❌ SEO Optimization Exception: {e}")
+    if status_code == 200:
+        if not content:
+            print("❌ SEO Optimization Error: Empty response content")
             return None
+        
+        result = finalize_seo(parse_seo_text(content))
+        if not result["title"]:
+            print("❌ SEO Optimization Error: No title generated")
+            return None
+            
+        print(f"✅ SEO Parsed: {result}")
+        return result
+
+    if status_code not in (429, 503):
+        print(f"❌ SEO Optimization Error: {status_code}, {content}")
+        return None
 
     print(f"❌ Max retries reached for SEO API. Using fallback metadata.")
     hashtags = [f"#{video_title.replace(' ', '')}", "#video"]
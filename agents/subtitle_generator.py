@@ -1,25 +1,21 @@
 import os
 import srt
 import datetime
-from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip
+from moviepy.editor import VideoFileClip, TextClip, ImageClip, CompositeVideoClip
 from moviepy.config import change_settings
+from agents.subtitle_renderer import render_caption
+from configs.settings import SUBTITLE_BACKEND
 
-# Ensure ImageMagick is set up correctly
-change_settings({"IMAGEMAGICK_BINARY": r"C:\Program Files\ImageMagick-7.1.1-Q16-HDRI\magick.exe"})
+# Ensure ImageMagick is set up correctly (only needed by the "imagemagick" subtitle backend)
+if os.name == "nt":
+    change_settings({"IMAGEMAGICK_BINARY": r"C:\Program Files\ImageMagick-7.1.1-Q16-HDRI\magick.exe"})
 
-def generate_srt(script_text, output_srt_path, video_duration):
-    """Generates an SRT file with correct timing and consistent display."""
-    lines = script_text.split(". ")  # Split script into sentences
-    num_lines = len(lines)
-    duration_per_line = video_duration / max(1, num_lines)  # Auto-adjust duration
-
-    subtitles = []
-    start_time = datetime.timedelta(seconds=0)
-
-    for i, line in enumerate(lines):
-        end_time = start_time + datetime.timedelta(seconds=duration_per_line)
-        subtitles.append(srt.Subtitle(index=i + 1, start=start_time, end=end_time, content=line))
-        start_time = end_time
+def generate_srt(script_text, output_srt_path, video_duration, timings=None):
+    """Generates an SRT file with correct timing and consistent display (real sentence timings when given)."""
+    subtitles = [
+        srt.Subtitle(index=i + 1, start=datetime.timedelta(seconds=start), end=datetime.timedelta(seconds=end), content=line)
+        for i, (line, start, end) in enumerate(subtitle_timeline(script_text, video_duration, timings))
+    ]
 
     with open(output_srt_path, "w", encoding="utf-8") as srt_file:
         srt_file.write(srt.compose(subtitles))
@@ -28,39 +24,78 @@ def generate_srt(script_text, output_srt_path, video_duration):
     return output_srt_path
 
 
-def add_subtitles_to_video(video_path, script_text, output_video_path):
+def write_sidecar_srt(video_path, script_text, timings=None):
+    """Writes the SRT next to a rendered video without touching its frames; returns the .srt path."""
+    with VideoFileClip(video_path, audio=False) as video:
+        video_duration = video.duration
+    return generate_srt(script_text, os.path.splitext(video_path)[0] + ".srt", video_duration, timings)
+
+
+def caption_clip(text, font_size, width):
+    """Wraps a Pillow-rendered RGBA caption in an ImageClip with its alpha channel as the mask."""
+    frame = render_caption(text, font_size, width)
+    mask = ImageClip(frame[:, :, 3] / 255.0, ismask=True)
+    return ImageClip(frame[:, :, :3]).set_mask(mask)
+
+
+def subtitle_font_size(video_h):
+    """Fixed large font size for better readability: 8% of video height."""
+    return max(36, int(video_h * 0.08))
+
+
+def subtitle_timeline(script_text, video_duration, timings=None):
+    """
+    Returns (line, start, end) captions. Uses the narration's real sentence timings when given,
+    otherwise spreads the script's sentences evenly over the video.
+    """
+    if timings:
+        return [(line, start, min(end, video_duration)) for line, start, end in timings if start < video_duration]
+
+    lines = script_text.split(". ")
+    duration_per_line = video_duration / max(1, len(lines))  # Ensure perfect timing
+    return [(line, i * duration_per_line, (i + 1) * duration_per_line) for i, line in enumerate(lines)]
+
+
+def build_subtitle_clips(script_text, video_size, video_duration, timings=None):
+    """Builds timed caption clips for a video of the given (width, height) and duration."""
+    video_w, video_h = video_size
+    font_size = subtitle_font_size(video_h)
+    subtitle_clips = []
+
+    for line, start_time, end_time in subtitle_timeline(script_text, video_duration, timings):
+        if SUBTITLE_BACKEND == "imagemagick":
+            txt_clip = TextClip(
+                line,
+                fontsize=font_size,
+                color="white",
+                bg_color="black",  # Ensures readability
+                size=(video_w * 0.9, None),  # Keep text width at 90% of the video width
+                method="caption"  # Auto-wrap text properly
+            )
+        else:
+            txt_clip = caption_clip(line, font_size, int(video_w * 0.9))
+        txt_clip = txt_clip.set_position(("center", "bottom")).set_start(start_time).set_duration(end_time - start_time)
+        subtitle_clips.append(txt_clip)
+
+    return subtitle_clips
+
+
+def add_subtitles_to_video(video_path, script_text, output_video_path, timings=None):
     """Adds subtitles with a fixed font size, perfect timing, and proper alignment."""
     video = VideoFileClip(video_path)
     video_duration = video.duration
     srt_path = os.path.splitext(video_path)[0] + ".srt"
 
     # Generate SRT with accurate timing
-    generate_srt(script_text, srt_path, video_duration)
-
-    # Set a fixed large font size for better readability
-    font_size = max(36, int(video.h * 0.08))  # 8% of video height
-    subtitle_clips = []
-    start_time = 0
-    lines = script_text.split(". ")
-    duration_per_line = video_duration / max(1, len(lines))  # Ensure perfect timing
+    generate_srt(script_text, srt_path, video_duration, timings)
 
-    for line in lines:
-        end_time = start_time + duration_per_line
-        txt_clip = TextClip(
-            line,
-            fontsize=font_size,
-            color="white",
-            bg_color="black",  # Ensures readability
-            size=(video.w * 0.9, None),  # Keep text width at 90% of the video width
-            method="caption"  # Auto-wrap text properly
-        )
-        txt_clip = txt_clip.set_position(("center", "bottom")).set_start(start_time).set_duration(duration_per_line)
-        subtitle_clips.append(txt_clip)
-        start_time = end_time
+    subtitle_clips = build_subtitle_clips(script_text, video.size, video_duration, timings)
 
     # Merge subtitles with video
     final_video = CompositeVideoClip([video] + subtitle_clips)
-    final_video.write_videofile(output_video_path, codec="libx264", fps=video.fps)
+    # Temp audio beside the output, not in the working directory shared by concurrent jobs
+    final_video.write_videofile(output_video_path, codec="libx264", fps=video.fps, audio_codec="aac",
+                                temp_audiofile=os.path.splitext(output_video_path)[0] + "_audio.m4a")
 
     print(f"✅ Final video with subtitles saved as '{output_video_path}'")
     return output_video_path
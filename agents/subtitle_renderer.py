@@ -0,0 +1,70 @@
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from configs.settings import SUBTITLE_FONT
+
+TEXT_COLOR = (255, 255, 255, 255)
+BOX_COLOR = (0, 0, 0, 255)  # Same black box as the old TextClip(bg_color="black")
+LINE_SPACING = 1.2
+PADDING_RATIO = 0.25  # Vertical padding as a fraction of the font size
+
+
+@lru_cache(maxsize=32)
+def get_font(font_size, font_path=SUBTITLE_FONT):
+    """Loads (and caches) a TrueType font; falls back to Pillow's built-in font."""
+    try:
+        return ImageFont.truetype(font_path, font_size)
+    except OSError:
+        print(f"⚠️ Subtitle font '{font_path}' not found, using Pillow's default font.")
+        return ImageFont.load_default()
+
+
+def wrap_text(text, font, max_width):
+    """Greedy word wrap so no line is wider than max_width pixels."""
+    lines = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if current and font.getlength(candidate) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines
+
+
+@lru_cache(maxsize=2048)
+def render_line(line, font_size):
+    """Rasterizes one line of white text on a transparent background."""
+    font = get_font(font_size)
+    left, top, right, bottom = font.getbbox(line)
+    image = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+    ImageDraw.Draw(image).text((-left, -top), line, font=font, fill=TEXT_COLOR)
+    return image
+
+
+@lru_cache(maxsize=512)
+def render_caption(text, font_size, width):
+    """
+    Wraps and rasterizes a caption into a width-wide black box with centred lines.
+    Returns an RGBA uint8 array (height, width, 4); results are cached by (text, font_size, width).
+    """
+    width = int(width)
+    font = get_font(font_size)
+    lines = wrap_text(text, font, width) or [""]
+    line_height = int(font_size * LINE_SPACING)
+    padding = int(font_size * PADDING_RATIO)
+    height = line_height * len(lines) + 2 * padding
+
+    caption = Image.new("RGBA", (width, height), BOX_COLOR)
+    for i, line in enumerate(lines):
+        line_image = render_line(line, font_size)
+        x = max(0, (width - line_image.width) // 2)
+        y = padding + i * line_height + (line_height - line_image.height) // 2
+        caption.alpha_composite(line_image, (x, max(0, y)))
+
+    frame = np.asarray(caption)
+    frame.setflags(write=False)  # Shared between callers through the cache
+    return frame
@@ -1,6 +1,6 @@
 from models.tts_model import TTSModel
 
 def text_to_speech(text):
-    """Convert generated script to speech using gTTS."""
+    """Convert generated script to speech using the configured TTS engine (TTS_ENGINE)."""
     tts_model = TTSModel()
     tts_model.convert_text_to_speech(text)
@@ -0,0 +1,82 @@
+import io
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+from moviepy.editor import VideoFileClip
+from agents.subtitle_renderer import get_font, wrap_text
+
+THUMBNAIL_SIZE = (1280, 720)  # YouTube's recommended thumbnail size
+MAX_THUMBNAIL_BYTES = 2 * 1024 * 1024  # YouTube rejects thumbnails over 2 MB
+SAMPLE_POINTS = (0.15, 0.3, 0.45, 0.6, 0.75, 0.9)  # Fractions of the video duration
+
+STYLES = {
+    "bold": {"text": (255, 255, 255), "stroke": (0, 0, 0), "shade": 200, "font_ratio": 0.13},
+    "yellow": {"text": (255, 221, 0), "stroke": (0, 0, 0), "shade": 200, "font_ratio": 0.13},
+    "clean": {"text": (255, 255, 255), "stroke": (40, 40, 40), "shade": 140, "font_ratio": 0.10},
+}
+
+
+def frame_score(frame):
+    """Sharpness of a frame: variance of a Laplacian over the grayscale image (blurry or flat frames score low)."""
+    gray = frame.mean(axis=2) if frame.ndim == 3 else frame.astype(float)
+    laplacian = (gray[1:-1, :-2] + gray[1:-1, 2:] + gray[:-2, 1:-1] + gray[2:, 1:-1] - 4 * gray[1:-1, 1:-1])
+    return float(laplacian.var())
+
+
+def representative_frame(video_path, points=SAMPLE_POINTS):
+    """Samples frames across the video and returns the sharpest one as a PIL image."""
+    with VideoFileClip(video_path, audio=False) as clip:
+        frames = [clip.get_frame(clip.duration * point) for point in points]
+    return Image.fromarray(max(frames, key=frame_score).astype("uint8"))
+
+
+def cover(image, size=THUMBNAIL_SIZE):
+    """Scales and centre-crops an image to fill `size` exactly."""
+    width, height = size
+    scale = max(width / image.width, height / image.height)
+    resized = image.resize((round(image.width * scale), round(image.height * scale)), Image.LANCZOS)
+    left, top = (resized.width - width) // 2, (resized.height - height) // 2
+    return resized.crop((left, top, left + width, top + height))
+
+
+def overlay_title(image, title, style="bold"):
+    """Draws the title in large stroked text over a dark gradient across the lower half."""
+    spec = STYLES.get(style, STYLES["bold"])
+    image = image.convert("RGB")
+    width, height = image.size
+
+    # Vertical gradient: transparent at the middle, `shade` alpha at the bottom edge
+    gradient = np.linspace(0, spec["shade"], height // 2, dtype=np.uint8)
+    alpha = np.zeros((height, width), dtype=np.uint8)
+    alpha[height - len(gradient):] = gradient[:, None]
+    image.paste(Image.new("RGB", image.size, (0, 0, 0)), mask=Image.fromarray(alpha))
+
+    font_size = int(height * spec["font_ratio"])
+    font = get_font(font_size)
+    margin = int(width * 0.05)
+    lines = wrap_text(title.upper(), font, width - 2 * margin)[:3]
+    line_height = int(font_size * 1.1)
+    y = height - margin - line_height * len(lines)
+    draw = ImageDraw.Draw(image)
+    for line in lines:
+        draw.text((margin, y), line, font=font, fill=spec["text"],
+                  stroke_width=max(2, font_size // 15), stroke_fill=spec["stroke"])
+        y += line_height
+    return image
+
+
+def encode_under_limit(image, max_bytes=MAX_THUMBNAIL_BYTES):
+    """JPEG-encodes the image, stepping quality (then size) down until it fits in max_bytes."""
+    image = image.convert("RGB")
+    while True:
+        for quality in (92, 85, 75, 65, 50):
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+            if buffer.tell() <= max_bytes:
+                return buffer.getvalue()
+        image = image.resize((image.width * 3 // 4, image.height * 3 // 4), Image.LANCZOS)
+
+
+def compose_thumbnail(video_path, title, style="bold"):
+    """Builds a thumbnail from the video's most representative frame with the title on top. Returns JPEG bytes."""
+    frame = cover(representative_frame(video_path)).filter(ImageFilter.UnsharpMask(radius=2, percent=60))
+    return encode_under_limit(overlay_title(frame, title, style))
@@ -1,30 +1,93 @@
 import os
-import requests
-from configs.settings import HUGGINGFACE_API_KEY
-
-def generate_thumbnail(topic: str) -> str | None:
-    """Generates a new thumbnail for the topic."""
-    output_path = "generated_thumbnail.png"
-    
-    # Delete existing thumbnail
-    if os.path.exists(output_path):
-        os.remove(output_path)
-    
-    # Call Hugging Face API (example)
-    url = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-2"
+import io
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from PIL import Image
+from models import http_client
+from models.file_utils import write_atomic
+from agents.thumbnail_composer import compose_thumbnail, encode_under_limit, MAX_THUMBNAIL_BYTES
+from configs.settings import HUGGINGFACE_API_KEY, THUMBNAIL_STYLE, THUMBNAIL_DEADLINE, THUMBNAIL_CACHE_DIR
+
+HF_THUMBNAIL_URL = "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-2"
+
+# Shared across jobs; a remote call that misses the deadline finishes in the background and is discarded
+_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="thumbnail")
+
+
+def thumbnail_cache_path(topic, title, style, cache_dir=THUMBNAIL_CACHE_DIR):
+    key = hashlib.sha256(f"{topic}\n{title}\n{style}".encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key[:2], f"{key}.jpg")
+
+
+def generate_remote_thumbnail(topic: str) -> bytes | None:
+    """Asks the Hugging Face model for a thumbnail; returns JPEG bytes under the upload limit, or None."""
     headers = {"Authorization": f"Bearer {HUGGINGFACE_API_KEY}"}
     payload = {"inputs": f"A vibrant YouTube thumbnail for {topic}"}
 
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=15)
+        response = http_client.post(HF_THUMBNAIL_URL, api_key=HUGGINGFACE_API_KEY, headers=headers, json=payload, timeout=15)
         if response.status_code == 200:
-            with open(output_path, "wb") as f:
-                f.write(response.content)
-            if os.path.exists(output_path):
-                print("✅ New thumbnail generated.")
-                return output_path
+            return encode_under_limit(Image.open(io.BytesIO(response.content)))
         print(f"❌ Thumbnail API error: {response.status_code}")
     except Exception as e:
         print(f"❌ Thumbnail error: {e}")
-    
-    return None
\ No newline at end of file
+    return None
+
+
+def generate_local_thumbnail(video_path, title, style=THUMBNAIL_STYLE) -> bytes | None:
+    try:
+        return compose_thumbnail(video_path, title, style)
+    except Exception as e:
+        print(f"❌ Local thumbnail error: {e}")
+        return None
+
+
+def acceptable(image_bytes):
+    return bool(image_bytes) and len(image_bytes) <= MAX_THUMBNAIL_BYTES
+
+
+def generate_thumbnail(topic: str, video_path=None, title=None, style=THUMBNAIL_STYLE,
+                       deadline=THUMBNAIL_DEADLINE, use_cache=True, cache_dir=THUMBNAIL_CACHE_DIR,
+                       remote=True) -> str | None:
+    """
+    Generates a thumbnail for the topic and returns its path (a JPEG under 2 MB), or None.
+    The remote model and, when a rendered video is given, the local frame composer run side by side;
+    the first acceptable result within `deadline` seconds wins. Results are cached by (topic, title, style).
+    remote may instead carry the remote model's result fetched earlier (bytes, or None if that call failed),
+    which then takes the place of a new request.
+    """
+    title = title or topic
+    cache_path = thumbnail_cache_path(topic, title, style, cache_dir)
+    if use_cache and os.path.exists(cache_path):
+        print("✅ Thumbnail reused from cache.")
+        return cache_path
+
+    pending = {}
+    if remote is True:
+        pending[_pool.submit(generate_remote_thumbnail, topic)] = "remote"
+    elif acceptable(remote):
+        pending[_pool.submit(lambda: remote)] = "remote"
+    if video_path and os.path.exists(video_path):
+        pending[_pool.submit(generate_local_thumbnail, video_path, title, style)] = "local"
+
+    winner = None
+    remaining = set(pending)
+    expires = time.monotonic() + deadline
+    while remaining and winner is None:
+        timeout = max(0, expires - time.monotonic())
+        done, remaining = wait(remaining, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            print(f"⚠️ Thumbnail generation missed the {deadline:.0f}s deadline.")
+            break
+        for future in done:
+            if acceptable(future.result()):
+                winner = future
+                break
+
+    if winner is None:
+        return None
+
+    write_atomic(cache_path, winner.result())
+    print(f"✅ New thumbnail generated ({pending[winner]}).")
+    return cache_path
@@ -0,0 +1,87 @@
+from bisect import bisect_right
+from moviepy.editor import VideoClip
+from moviepy.video.io.ffmpeg_reader import FFMPEG_VideoReader
+from configs.settings import TIMELINE_LOOKAHEAD
+
+try:
+    import resource  # Peak RSS reporting (not available on Windows)
+except ImportError:
+    resource = None
+
+CLIP_SECONDS = 3  # Each stock clip contributes at most this many seconds
+
+
+def plan_timeline(clip_durations, audio_duration):
+    """
+    Returns clip indices in playback order, looping through the clips until they cover the audio.
+    Shared by every render engine so they all produce the same cut.
+    """
+    order = []
+    if not clip_durations:
+        return order
+
+    current_duration = 0
+    clip_index = 0
+    while current_duration < audio_duration:
+        index = clip_index % len(clip_durations)  # Loop through videos if needed
+        order.append(index)
+        current_duration += clip_durations[index]
+        clip_index += 1
+    return order
+
+
+class StreamingTimeline:
+    """
+    Plays clips in timeline order while keeping only the clip currently on screen (plus `lookahead`
+    upcoming clips) open. Readers behind the playhead are closed as soon as it moves past them,
+    and frames are scaled to `size` inside ffmpeg rather than in Python.
+    """
+
+    def __init__(self, clip_paths, clip_durations, order, size, lookahead=TIMELINE_LOOKAHEAD):
+        self.size = tuple(size)
+        self.lookahead = lookahead
+        self.entries = []  # (path, duration, start) per timeline position
+        start = 0
+        for index in order:
+            self.entries.append((clip_paths[index], clip_durations[index], start))
+            start += clip_durations[index]
+        self.duration = start
+        self.starts = [entry[2] for entry in self.entries]
+        self.readers = {}  # timeline position -> FFMPEG_VideoReader
+        self.peak_open_readers = 0
+
+    def _open(self, position):
+        if position not in self.readers and position < len(self.entries):
+            path = self.entries[position][0]
+            self.readers[position] = FFMPEG_VideoReader(path, target_resolution=(self.size[1], self.size[0]))
+            self.peak_open_readers = max(self.peak_open_readers, len(self.readers))
+        return self.readers.get(position)
+
+    def _close_before(self, position):
+        for old in [p for p in self.readers if p < position]:
+            self.readers.pop(old).close()
+
+    def make_frame(self, t):
+        position = max(0, min(bisect_right(self.starts, t) - 1, len(self.entries) - 1))
+        self._close_before(position)
+        reader = self._open(position)
+        for ahead in range(1, self.lookahead + 1):  # Warm up the next readers' ffmpeg processes
+            self._open(position + ahead)
+        _, duration, start = self.entries[position]
+        return reader.get_frame(min(t - start, max(0, duration - 1 / reader.fps)))
+
+    def to_clip(self, fps=24):
+        return VideoClip(self.make_frame, duration=self.duration).set_fps(fps)
+
+    def close(self):
+        for reader in self.readers.values():
+            reader.close()
+        self.readers.clear()
+
+    def stats(self):
+        """Peak readers held open at once and peak RSS (this process and finished ffmpeg children), in MB."""
+        stats = {"peak_open_readers": self.peak_open_readers}
+        if resource:
+            stats["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            stats["peak_child_rss_mb"] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        return stats
@@ -1,87 +1,171 @@
 import os
-import requests
-import tempfile
-from moviepy.editor import VideoFileClip, AudioFileClip, concatenate_videoclips
+from moviepy.editor import AudioFileClip, CompositeVideoClip
 from models.vision_model import search_videos_on_pexels
+from models.media_downloader import download_all
+from models.media_cache import media_cache
+from agents.subtitle_generator import generate_srt, build_subtitle_clips, write_sidecar_srt
+from agents.timeline import CLIP_SECONDS, StreamingTimeline, plan_timeline
+from agents.ffmpeg_renderer import probe_duration, render_with_ffmpeg
+from agents.segmented_renderer import render_segmented
+from agents.clip_normalizer import normalize_in_pool
+from configs.settings import VIDEO_RESOLUTION, RENDER_ENGINE, NORMALIZE_CLIPS
 
 
+def temp_audio_path(output_path):
+    """moviepy's temporary audio track, kept beside the output rather than in the shared working directory."""
+    return os.path.splitext(output_path)[0] + "_audio.m4a"
+
 def stream_video(url):
     """
-    Streams a video file from a URL and returns the local temp file path.
+    Returns a local path for a video URL, served from the media cache when possible.
     """
-    try:
-        response = requests.get(url, stream=True, timeout=10)
-        response.raise_for_status()
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp_file:
-            for chunk in response.iter_content(chunk_size=1024 * 1024):  # 1MB chunks
-                temp_file.write(chunk)
-            return temp_file.name
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Failed to stream video from {url}: {e}")
-        return None
+    return media_cache.fetch_url(url)
 
-def create_video(topic, audio_file):
+def fetch_clip(url):
     """
-    Creates a final video using multiple clips streamed from Pexels.
+    Downloads (or reuses) a clip and, if enabled, swaps it for its normalized intermediate.
+    A clip that fails to normalize is used as downloaded rather than dropped.
+    """
+    video_path = stream_video(url)
+    if video_path and NORMALIZE_CLIPS:
+        return normalize_in_pool(video_path) or video_path
+    return video_path
+
+def fetch_clip_futures(topic):
+    """
+    Searches Pexels for the topic and starts fetching every clip at once.
+    Returns futures of local paths in search order (None if nothing was found).
     """
     print(f"🔍 Searching for videos related to: {topic}")
-    video_urls = search_videos_on_pexels(topic, num_results=7)
+    search_results = search_videos_on_pexels(topic, num_results=7, target=VIDEO_RESOLUTION)
+    video_urls = [result["link"] for result in search_results]
     
     if not video_urls:
         print("❌ No relevant videos found.")
         return None
+    return download_all(video_urls, fetch=fetch_clip)
+
+def fetch_clips(topic):
+    """Searches and fetches the topic's clips; returns their local paths in search order."""
+    futures = fetch_clip_futures(topic) or []
+    return [path for path in (future.result() for future in futures) if path]
+
+def build_video_timeline(topic, audio_file, clips=None):
+    """
+    Fetches clips from Pexels and lays them out as one streaming timeline with the narration audio.
+    clips are local paths already fetched for the topic (e.g. by a concurrent pipeline stage); searched when None.
+    Returns (final_video, resources); the caller must pass resources to cleanup_timeline().
+    Only the clip on screen (plus a small lookahead) holds an ffmpeg reader at any time.
+    """
+    if clips is None:
+        futures = fetch_clip_futures(topic)
+        if not futures:
+            return None, []
+        clips = (future.result() for future in futures)
     
-    video_clips = []
-    temp_files = []  # Track temp files for cleanup
+    clip_paths = []
+    clip_durations = []
     
-    for url in video_urls:
-        video_path = stream_video(url)
-        if video_path:
-            try:
-                clip = VideoFileClip(video_path)
-                subclip_duration = min(3, clip.duration)
-                resized_clip = clip.subclip(0, subclip_duration).resize((1920, 1080))
-                video_clips.append(resized_clip)
-                temp_files.append(video_path)  # Store for cleanup
-            except Exception as e:
-                print(f"⚠️ Error processing video: {e}")
+    # Each clip is probed as soon as its own download finishes
+    for video_path in clips:
+        duration = probe_duration(video_path) if video_path else None
+        if duration:
+            clip_paths.append(video_path)
+            clip_durations.append(min(CLIP_SECONDS, duration))
+        elif video_path:
+            print(f"⚠️ Error processing video: {video_path}")
     
-    if not video_clips:
+    print(f"📦 Media cache: {media_cache.stats()}")
+    if not clip_paths:
         print("❌ No valid video clips found.")
-        return None
+        return None, []
     
     # Load the audio clip
     audio_clip = AudioFileClip(audio_file)
     audio_duration = audio_clip.duration  # Get the duration of the audio
     
     # Repeat the video clips until they match the audio duration
-    final_clips = []
-    current_duration = 0
-    clip_index = 0
-    
-    while current_duration < audio_duration:
-        clip = video_clips[clip_index % len(video_clips)]  # Loop through videos if needed
-        final_clips.append(clip)
-        current_duration += clip.duration
-        clip_index += 1
-    
-    # Merge all selected clips
-    final_video = concatenate_videoclips(final_clips, method="compose").set_audio(audio_clip)
-    
-    # Save the final video
-    output_video = "final_video.mp4"
-    final_video.write_videofile(output_video, codec="libx264", fps=24, audio_codec="aac", threads=4)
-    
-    # Cleanup temporary video files
-    for clip in video_clips:
-        clip.close()
+    order = plan_timeline(clip_durations, audio_duration)
+    timeline = StreamingTimeline(clip_paths, clip_durations, order, VIDEO_RESOLUTION)
     
-    for temp_file in temp_files:
+    final_video = timeline.to_clip(fps=24).set_audio(audio_clip)
+    return final_video, [timeline, audio_clip]
+
+def cleanup_timeline(resources):
+    """Closes clip readers / audio. Safe to call on any path, including errors."""
+    for resource in resources:
+        if isinstance(resource, StreamingTimeline):
+            print(f"📊 Timeline: {resource.stats()}")
         try:
-            os.remove(temp_file)
-            
+            resource.close()
         except Exception as e:
-            print(f"⚠️ Failed to delete temp file {temp_file}: {e}")
+            print(f"⚠️ Failed to close {resource}: {e}")
+
+def render_with_engine(topic, audio_file, output_path, script_text=None, timings=None, clips=None):
+    """Renders the timeline with the ffmpeg filtergraph or segmented engine (see RENDER_ENGINE)."""
+    if clips is None:
+        futures = fetch_clip_futures(topic)
+        if not futures:
+            return None
+        clips = [future.result() for future in futures]
+    clip_paths = [path for path in clips if path]
+    if not clip_paths:
+        print("❌ No valid video clips found.")
+        return None
+    print(f"📦 Media cache: {media_cache.stats()}")
+    if RENDER_ENGINE == "segmented":
+        return render_segmented(clip_paths, audio_file, output_path, script_text=script_text, timings=timings)
+    return render_with_ffmpeg(clip_paths, audio_file, output_path, script_text=script_text, timings=timings)
+
+def create_video(topic, audio_file, clips=None, output_video="final_video.mp4"):
+    """
+    Creates a final video using multiple clips streamed from Pexels.
+    """
+    if RENDER_ENGINE in ("ffmpeg", "segmented"):
+        return render_with_engine(topic, audio_file, output_video, clips=clips)
+
+    final_video, resources = build_video_timeline(topic, audio_file, clips)
+    if final_video is None:
+        cleanup_timeline(resources)
+        return None
+    
+    # Save the final video
+    try:
+        final_video.write_videofile(output_video, codec="libx264", fps=24, audio_codec="aac", threads=4,
+                                    temp_audiofile=temp_audio_path(output_video))
+    finally:
+        cleanup_timeline(resources)
     
     return output_video
+
+def create_video_with_subtitles(topic, audio_file, script_text, output_video_path, timings=None, clips=None):
+    """
+    Builds the clip timeline, narration and subtitle overlays as one composition
+    and writes the final video in a single encode (no intermediate final_video.mp4).
+    timings are the narration's (sentence, start, end) from TTSModel, if known.
+    """
+    if RENDER_ENGINE in ("ffmpeg", "segmented"):
+        output = render_with_engine(topic, audio_file, output_video_path, script_text=script_text, timings=timings,
+                                    clips=clips)
+        if output:
+            write_sidecar_srt(output, script_text, timings)
+        return output
+
+    final_video, resources = build_video_timeline(topic, audio_file, clips)
+    if final_video is None:
+        cleanup_timeline(resources)
+        return None
+
+    try:
+        srt_path = os.path.splitext(output_video_path)[0] + ".srt"
+        generate_srt(script_text, srt_path, final_video.duration, timings)
+
+        subtitle_clips = build_subtitle_clips(script_text, final_video.size, final_video.duration, timings)
+        composed = CompositeVideoClip([final_video] + subtitle_clips).set_audio(final_video.audio)
+        composed.write_videofile(output_video_path, codec="libx264", fps=24, audio_codec="aac", threads=4,
+                                 temp_audiofile=temp_audio_path(output_video_path))
+    finally:
+        cleanup_timeline(resources)
+
+    print(f"✅ Final video with subtitles saved as '{output_video_path}'")
+    return output_video_path
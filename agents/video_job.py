@@ -0,0 +1,258 @@
+import os
+import shutil
+from functools import partial
+from agents.pipeline import Pipeline, Stage
+from agents.workspace import Workspace
+from agents.checkpoints import StageStore
+from agents.script_writer import script_generator, script_and_seo_generator, stream_script_generator
+from agents.text_to_speech import TTSModel
+from agents.video_editor import create_video, create_video_with_subtitles, fetch_clips
+from agents.subtitle_generator import add_subtitles_to_video, write_sidecar_srt
+from agents.thumbnail_generator import generate_thumbnail, generate_remote_thumbnail
+from agents.seo_optimizer import optimize_seo
+from agents.video_upload import upload_video_with_thumbnail
+from configs.settings import (DEFAULT_REGION, RENDER_MODE, CAPTIONS_MODE, COMBINED_GENERATION, STREAM_SCRIPT,
+                             RENDER_ENGINE, VIDEO_RESOLUTION, THUMBNAIL_STYLE)
+
+DEFAULT_THUMBNAIL = "default_thumbnail.png"
+
+# Artifact names inside the job's workspace
+NARRATION_NAME = "narration.mp3"
+RAW_VIDEO_NAME = "video_raw.mp4"
+VIDEO_NAME = "video.mp4"
+REMOTE_THUMBNAIL_NAME = "thumbnail_remote.jpg"
+THUMBNAIL_NAME = "thumbnail.jpg"
+CHECKPOINTS_NAME = "stages.json"
+
+DEFAULT_OPTIONS = {
+    "title_index": None,  # None asks on the console
+    "video": True,  # False stops after the narration
+    "captions_mode": CAPTIONS_MODE,
+    "render_mode": RENDER_MODE,
+    "thumbnail_fallback": "default",  # "default", "skip", or "ask" on the console
+    "upload": True,
+    "privacy_status": "public",
+}
+
+
+def complete_seo(seo, topic):
+    """Fills in missing SEO fields with topic-based defaults."""
+    seo = dict(seo or {})
+    seo["title"] = seo.get("title") or f"{topic.strip()} - Auto-Generated"
+    seo["description"] = seo.get("description") or f"Explore {topic.strip()} in this AI-generated video!"
+    seo["tags"] = seo.get("tags") or [topic.strip(), f"{topic.strip()} video", "AI", "auto-generated"]
+    return seo
+
+
+def script_stage(job, inputs):
+    """Writes the script; also returns SEO (combined generation) or narration audio (streaming) when produced."""
+    topic, region, index = job["topic"], job["region"], job["options"]["title_index"]
+    result = {"script": None, "seo": None, "audio": None, "timings": None}
+
+    if STREAM_SCRIPT:
+        # TTS starts on the first sentences while the LLM is still writing the rest
+        stream = stream_script_generator(region, topic, selected_index=index)
+        if isinstance(stream, dict):
+            raise RuntimeError(stream["error"])
+        print("\n🎙️ Streaming script into speech...")
+        sentences = []
+
+        def collect_sentences():
+            for sentence in stream:
+                sentences.append(sentence)
+                yield sentence
+
+        with job["workspace"].artifact(NARRATION_NAME) as audio_path:
+            if not job["tts"].convert_sentences_to_speech(collect_sentences(), audio_path):
+                raise RuntimeError("Audio file not created.")
+        result["audio"] = job["workspace"].path(NARRATION_NAME)
+        result["timings"] = job["tts"].timings or None
+        result["script"] = " ".join(sentences)
+    elif COMBINED_GENERATION:
+        # Script and SEO metadata from one structured LLM call
+        combined = script_and_seo_generator(region, topic, selected_index=index)
+        if "error" in combined:
+            raise RuntimeError(combined["error"])
+        result["script"], result["seo"] = combined["script"], combined["seo"]
+    else:
+        script = script_generator(region, topic, return_json=False, selected_index=index)
+        if isinstance(script, dict):
+            raise RuntimeError(script.get("error", "Script generation failed"))
+        result["script"] = script
+
+    if not result["script"] or not result["script"].strip():
+        raise RuntimeError("Invalid or empty script.")
+    print("\n📌 Generated Script:\n", result["script"])
+    return result
+
+
+def tts_stage(job, inputs):
+    script = inputs["script"]
+    if script["audio"]:
+        audio_file, timings = script["audio"], script["timings"]
+    else:
+        print("\n🎙️ Converting script to speech...")
+        with job["workspace"].artifact(NARRATION_NAME) as audio_path:
+            if not job["tts"].convert_text_to_speech(script["script"], audio_path):
+                raise RuntimeError("Audio file not created.")
+        audio_file = job["workspace"].path(NARRATION_NAME)
+        timings = job["tts"].timings or None  # Real per-sentence timings for the subtitles
+    if not (audio_file and os.path.exists(audio_file)):
+        raise RuntimeError("Audio file not created.")
+    print(f"✅ Audio generated: {audio_file}")
+    return {"audio": audio_file, "timings": timings}
+
+
+def footage_stage(job, inputs):
+    """Searches and downloads the clips; needs only the topic, so it overlaps script writing and TTS."""
+    print("\n🔍 Searching Pexels...")
+    clips = fetch_clips(job["topic"])
+    if not clips:
+        raise RuntimeError("No relevant videos found.")
+    return clips
+
+
+def seo_stage(job, inputs):
+    """Uses the SEO from combined generation when present; otherwise asks the LLM, which needs only the topic."""
+    seo = (inputs.get("script") or {}).get("seo")
+    if seo is None:
+        print("\n📈 Optimizing SEO...")
+        seo = optimize_seo(job["topic"])
+    seo = complete_seo(seo, job["topic"])
+    if not seo["title"].strip():
+        raise RuntimeError("SEO title is missing or empty.")
+    print("✅ SEO:", seo)
+    return seo
+
+
+def render_stage(job, inputs):
+    """Renders the video with narration and, depending on captions_mode, burned-in and/or sidecar subtitles."""
+    topic, options, workspace = job["topic"], job["options"], job["workspace"]
+    script, narration, clips = inputs["script"]["script"], inputs["tts"], inputs["footage"]
+    audio_file, timings = narration["audio"], narration["timings"]
+
+    with workspace.artifact(VIDEO_NAME) as output_path:
+        if options["captions_mode"] == "sidecar":
+            # No burn-in: plain render, captions go up as a separate YouTube track
+            rendered = create_video(topic, audio_file, clips=clips, output_video=output_path)
+        elif options["render_mode"] == "two_step":
+            with workspace.artifact(RAW_VIDEO_NAME) as raw_path:
+                video_path = create_video(topic, audio_file, clips=clips, output_video=raw_path)
+                if not (video_path and os.path.exists(video_path)):
+                    raise RuntimeError("Video generation failed.")
+            print(f"✅ Video created: {workspace.path(RAW_VIDEO_NAME)}")
+            print("\n📝 Adding subtitles...")
+            rendered = add_subtitles_to_video(workspace.path(RAW_VIDEO_NAME), script, output_path, timings)
+        else:
+            # Single encode: clips, narration and subtitles rendered together
+            rendered = create_video_with_subtitles(topic, audio_file, script, output_path, timings, clips=clips)
+        if not rendered or not os.path.exists(rendered):
+            raise RuntimeError("Video generation failed.")
+    final_video = workspace.path(VIDEO_NAME)
+    print(f"✅ Final video: {final_video}")
+
+    caption_file = None
+    if options["captions_mode"] in ("sidecar", "both"):
+        caption_file = write_sidecar_srt(final_video, script, timings)
+    return {"video": final_video, "captions": caption_file}
+
+
+def remote_thumbnail_stage(job, inputs):
+    """Calls the remote thumbnail model early so its latency hides behind rendering. Returns the image path or None."""
+    image = generate_remote_thumbnail(job["topic"])
+    if not image:
+        return None
+    with job["workspace"].artifact(REMOTE_THUMBNAIL_NAME) as image_path:
+        with open(image_path, "wb") as f:
+            f.write(image)
+    return job["workspace"].path(REMOTE_THUMBNAIL_NAME)
+
+
+def thumbnail_stage(job, inputs):
+    print("\n🖼️ Generating thumbnail...")
+    remote = None
+    if inputs["remote_thumbnail"]:
+        with open(inputs["remote_thumbnail"], "rb") as f:
+            remote = f.read()
+    thumb_file = generate_thumbnail(job["topic"], video_path=inputs["render"]["video"],
+                                    title=inputs["seo"]["title"], remote=remote)
+    if thumb_file:
+        # Copied out of the shared cache so the workspace holds everything the upload needs
+        with job["workspace"].artifact(THUMBNAIL_NAME) as thumb_path:
+            shutil.copyfile(thumb_file, thumb_path)
+        return job["workspace"].path(THUMBNAIL_NAME)
+
+    fallback = job["options"]["thumbnail_fallback"]
+    if fallback == "ask":
+        fallback = input("❌ Thumbnail failed. Use default or skip? (default/skip): ").strip().lower()
+    if fallback == "default" and os.path.exists(DEFAULT_THUMBNAIL):
+        print(f"✅ Default thumbnail used: {DEFAULT_THUMBNAIL}")
+        return DEFAULT_THUMBNAIL  # Used in place, so it is still there for the next run
+    return None
+
+
+def upload_stage(job, inputs):
+    print("\n📤 Uploading to YouTube...")
+    seo, render = inputs["seo"], inputs["render"]
+    video_id = upload_video_with_thumbnail(
+        file_path=render["video"],
+        title=seo["title"],
+        description=seo["description"],
+        tags=seo["tags"],
+        thumbnail_path=inputs["thumbnail"],
+        category_id="22",
+        privacy_status=job["options"]["privacy_status"],
+        caption_path=render["captions"]
+    )
+    print(f"\n✅ Uploaded! Video ID: {video_id}")
+    return video_id
+
+
+def build_video_job(topic, region=DEFAULT_REGION, options=None, tts=None, workspace=None, fresh=False):
+    """
+    Describes one video job as a stage DAG. Footage, SEO (unless it comes with the script) and the
+    remote thumbnail depend only on the topic, so they run while the script, narration and render proceed.
+    Artifacts go to `workspace` (a new Workspace for the topic by default). Finished stages are checkpointed
+    there, so re-running a job in the same workspace only redoes stages whose inputs changed (fresh=True redoes all).
+    """
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    tts = tts or TTSModel()
+    workspace = workspace or Workspace.create(topic)
+    job = {"topic": topic, "region": region, "options": options, "tts": tts, "workspace": workspace}
+    script_mode = "stream" if STREAM_SCRIPT else "combined" if COMBINED_GENERATION else "separate"
+
+    stages = [
+        Stage("script", partial(script_stage, job),
+              params={"topic": topic, "region": region, "title_index": options["title_index"], "mode": script_mode},
+              provider="groq"),
+        Stage("tts", partial(tts_stage, job), deps=["script"], params={"engine": tts.engine, "voice": tts.voice},
+              provider=tts.engine),
+    ]
+    if options["video"]:
+        stages += [
+            Stage("footage", partial(footage_stage, job), params={"topic": topic, "resolution": VIDEO_RESOLUTION},
+                  provider="pexels"),
+            Stage("seo", partial(seo_stage, job), deps=["script"] if script_mode == "combined" else [],
+                  params={"topic": topic}, provider="groq"),
+            Stage("render", partial(render_stage, job), deps=["script", "tts", "footage"], kind="cpu",
+                  params={"captions_mode": options["captions_mode"], "render_mode": options["render_mode"],
+                          "engine": RENDER_ENGINE, "resolution": VIDEO_RESOLUTION}),
+            Stage("remote_thumbnail", partial(remote_thumbnail_stage, job), optional=True, params={"topic": topic},
+                  provider="huggingface"),
+            Stage("thumbnail", partial(thumbnail_stage, job), deps=["render", "seo", "remote_thumbnail"],
+                  optional=True, params={"style": THUMBNAIL_STYLE, "fallback": options["thumbnail_fallback"]}),
+        ]
+        if options["upload"]:
+            stages.append(Stage("upload", partial(upload_stage, job), deps=["render", "seo", "thumbnail"],
+                                params={"privacy_status": options["privacy_status"]}, provider="youtube"))
+    return Pipeline(stages, store=StageStore(workspace.path(CHECKPOINTS_NAME), reset=fresh))
+
+
+def run_video_job(topic, region=DEFAULT_REGION, options=None, tts=None, workspace=None, fresh=False):
+    """Runs one video job and returns (outputs, report); see Pipeline.run."""
+    outputs, report = build_video_job(topic, region, options, tts, workspace, fresh).run()
+    path = " → ".join(f"{step['stage']} ({step['seconds']:.1f}s)" for step in report["critical_path"])
+    print(f"\n⏱️ Job finished in {report['elapsed']:.1f}s; critical path: {path}")
+    if report["reused"]:
+        print(f"♻️ Reused from checkpoints: {', '.join(report['reused'])}")
+    return outputs, report
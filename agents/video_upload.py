@@ -31,7 +31,21 @@ def authenticate_youtube():
 
     return build("youtube", "v3", credentials=creds)
 
-def upload_video_with_thumbnail(file_path, title, description, tags, thumbnail_path, category_id, privacy_status):
+def upload_captions(youtube, video_id, srt_path, language="en", name="English"):
+    """Uploads an SRT file as a caption track of an already uploaded video."""
+    body = {
+        "snippet": {
+            "videoId": video_id,
+            "language": language,
+            "name": name,
+            "isDraft": False
+        }
+    }
+    media = MediaFileUpload(srt_path, mimetype="application/octet-stream")
+    return youtube.captions().insert(part="snippet", body=body, media_body=media).execute()
+
+def upload_video_with_thumbnail(file_path, title, description, tags, thumbnail_path, category_id, privacy_status,
+                                caption_path=None, caption_language="en"):
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Video file not found: {file_path}")
 
@@ -74,4 +88,13 @@ def upload_video_with_thumbnail(file_path, title, description, tags, thumbnail_p
             print(f"❌ Thumbnail upload failed: {str(e)}")
             # Continue despite thumbnail failure
 
+    # Upload captions as a sidecar track instead of (or as well as) burned-in subtitles
+    if caption_path and os.path.exists(caption_path):
+        try:
+            upload_captions(youtube, video_id, caption_path, language=caption_language)
+            print("💬 Captions uploaded")
+        except HttpError as e:
+            print(f"❌ Caption upload failed: {str(e)}")
+            # Continue despite caption failure
+
     return video_id
@@ -0,0 +1,52 @@
+import os
+import re
+import glob
+import uuid
+from datetime import datetime
+from contextlib import contextmanager
+from configs.settings import WORKSPACE_DIR
+
+
+def slugify(text, max_length=40):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:max_length] or "job"
+
+
+class Workspace:
+    """
+    A job's private directory. Artifacts get fixed names inside it, so concurrent jobs never collide,
+    and are written under a temporary name that is renamed into place only once complete.
+    """
+
+    def __init__(self, job_id, root=WORKSPACE_DIR):
+        if not re.fullmatch(r"[\w-][\w.-]*", job_id):
+            raise ValueError(f"Invalid job id '{job_id}': use letters, digits, '-', '_' and '.' only")
+        self.job_id = job_id
+        self.root = os.path.join(root, job_id)
+        os.makedirs(self.root, exist_ok=True)
+
+    @classmethod
+    def create(cls, label, root=WORKSPACE_DIR):
+        """New workspace with a unique, readable id such as 20250101-120000-ai-in-healthcare-1a2b3c."""
+        return cls(f"{datetime.now():%Y%m%d-%H%M%S}-{slugify(label)}-{uuid.uuid4().hex[:6]}", root)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    @contextmanager
+    def artifact(self, name):
+        """
+        Yields a temporary path (same extension, so tools still detect the format) to write `name` to.
+        On success the file, and any companions written next to it (e.g. a .srt beside a video),
+        are atomically renamed to their final names; on error they are removed.
+        """
+        final_path = self.path(name)
+        stem, ext = os.path.splitext(final_path)
+        temp_stem = f"{stem}.part-{uuid.uuid4().hex[:8]}"
+        try:
+            yield temp_stem + ext
+        except BaseException:
+            for leftover in glob.glob(glob.escape(temp_stem) + "*"):
+                os.remove(leftover)
+            raise
+        for temp_path in glob.glob(glob.escape(temp_stem) + "*"):
+            os.replace(temp_path, stem + temp_path[len(temp_stem):])
@@ -1 +1,246 @@
- 
+import os
+import json
+import time
+import queue
+import sqlite3
+import threading
+from agents.checkpoints import referenced_files
+from configs.settings import JOB_DB_PATH, JOB_DB_FLUSH_SECONDS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY, topic TEXT, region TEXT, status TEXT NOT NULL,
+    created_at REAL NOT NULL, started_at REAL, finished_at REAL, elapsed REAL,
+    workspace TEXT, options TEXT, error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_topic ON jobs(topic);
+CREATE INDEX IF NOT EXISTS idx_jobs_region_created ON jobs(region, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at);
+
+-- One row per run (attempt) of a job; re-running a job resumes it under a new run id
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY, job_id TEXT NOT NULL, status TEXT NOT NULL,
+    started_at REAL, finished_at REAL, elapsed REAL, error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_job_started ON runs(job_id, started_at);
+
+-- The final status of each stage in each run; earlier runs' rows are never overwritten
+CREATE TABLE IF NOT EXISTS stages (
+    run_id TEXT NOT NULL, job_id TEXT NOT NULL, stage TEXT NOT NULL, status TEXT NOT NULL, kind TEXT,
+    provider TEXT, started REAL, finished REAL, seconds REAL, error TEXT, updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, stage)
+);
+CREATE INDEX IF NOT EXISTS idx_stages_job ON stages(job_id);
+CREATE INDEX IF NOT EXISTS idx_stages_stage_status ON stages(stage, status);
+CREATE INDEX IF NOT EXISTS idx_stages_provider_status ON stages(provider, status);
+CREATE INDEX IF NOT EXISTS idx_stages_updated ON stages(updated_at);
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    job_id TEXT NOT NULL, stage TEXT NOT NULL, path TEXT NOT NULL, size INTEGER,
+    shared INTEGER NOT NULL,  -- 1 for assets from a shared cache (clips, TTS audio, thumbnails)
+    PRIMARY KEY (job_id, path)
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_path ON artifacts(path);
+
+CREATE TABLE IF NOT EXISTS uploads (
+    video_id TEXT PRIMARY KEY, job_id TEXT NOT NULL, title TEXT, privacy_status TEXT, uploaded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_uploads_job ON uploads(job_id);
+CREATE INDEX IF NOT EXISTS idx_uploads_uploaded ON uploads(uploaded_at);
+"""
+
+# Column updates keep earlier values when a later write leaves them out
+UPSERT_JOB = """
+INSERT INTO jobs (id, topic, region, status, created_at, started_at, finished_at, elapsed, workspace, options, error)
+VALUES (:id, :topic, :region, :status, :created_at, :started_at, :finished_at, :elapsed, :workspace, :options, :error)
+ON CONFLICT(id) DO UPDATE SET
+    topic = COALESCE(excluded.topic, jobs.topic), region = COALESCE(excluded.region, jobs.region),
+    status = excluded.status, started_at = COALESCE(excluded.started_at, jobs.started_at),
+    finished_at = excluded.finished_at, elapsed = excluded.elapsed,
+    workspace = COALESCE(excluded.workspace, jobs.workspace), options = COALESCE(excluded.options, jobs.options),
+    error = excluded.error
+"""
+UPSERT_RUN = """
+INSERT INTO runs (id, job_id, status, started_at, finished_at, elapsed, error)
+VALUES (:id, :job_id, :status, :started_at, :finished_at, :elapsed, :error)
+ON CONFLICT(id) DO UPDATE SET
+    status = excluded.status, started_at = COALESCE(excluded.started_at, runs.started_at),
+    finished_at = excluded.finished_at, elapsed = excluded.elapsed, error = excluded.error
+"""
+INSERT_STAGE = """
+INSERT OR IGNORE INTO stages (run_id, job_id, stage, status, kind, provider, started, finished, seconds, error,
+                              updated_at)
+VALUES (:run_id, :job_id, :stage, :status, :kind, :provider, :started, :finished, :seconds, :error, :updated_at)
+"""
+UPSERT_ARTIFACT = "INSERT OR REPLACE INTO artifacts (job_id, stage, path, size, shared) VALUES (?, ?, ?, ?, ?)"
+UPSERT_UPLOAD = ("INSERT OR REPLACE INTO uploads (video_id, job_id, title, privacy_status, uploaded_at) "
+                 "VALUES (?, ?, ?, ?, ?)")
+
+# Stage statuses worth keeping; queued/running are transient and superseded within the same run
+FINAL_STAGE_STATUSES = ("done", "reused", "failed", "skipped", "cancelled")
+SCHEMA_VERSION = 2
+
+
+class JobStore:
+    """
+    SQLite (WAL) history of jobs, their stages, the files they used and their uploads.
+    Writes only enqueue; a background thread commits them in batches (one transaction per
+    `flush_interval` seconds or `batch_size` writes), so recording costs the pipeline microseconds.
+    """
+
+    def __init__(self, path=JOB_DB_PATH, flush_interval=JOB_DB_FLUSH_SECONDS, batch_size=500):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._read_conn = None
+
+    def _connect(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")  # Readers never block the writer
+        conn.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; skips an fsync per commit
+        with conn:
+            self._migrate(conn)
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return conn
+
+    @staticmethod
+    def _migrate(conn):
+        """Version 1 kept one row per (job, stage); that table is set aside as stages_v1."""
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(stages)")]
+        if columns and "run_id" not in columns:
+            conn.execute("ALTER TABLE stages RENAME TO stages_v1")
+            for index in ("idx_stages_stage_status", "idx_stages_provider_status", "idx_stages_updated"):
+                conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+    # Writes
+
+    def _put(self, item):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="job-store-writer", daemon=True)
+                self._writer.start()
+        self._queue.put(item)
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not isinstance(batch[-1], threading.Event):
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                with conn:  # One transaction for the whole batch
+                    for item in batch:
+                        if not isinstance(item, threading.Event):
+                            conn.execute(*item)
+            except sqlite3.Error as e:
+                print(f"⚠️ Job store write failed: {e}")
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def flush(self, timeout=30):
+        """Blocks until everything recorded so far is committed."""
+        done = threading.Event()
+        self._put(done)
+        return done.wait(timeout)
+
+    def record_job(self, job_id, status, topic=None, region=None, started_at=None, finished_at=None,
+                   elapsed=None, workspace=None, options=None, error=None):
+        self._put((UPSERT_JOB, {
+            "id": job_id, "topic": topic, "region": region, "status": status, "created_at": time.time(),
+            "started_at": started_at, "finished_at": finished_at, "elapsed": elapsed, "workspace": workspace,
+            "options": json.dumps(options) if options is not None else None, "error": error,
+        }))
+
+    def record_run(self, run_id, job_id, status, started_at=None, finished_at=None, elapsed=None, error=None):
+        self._put((UPSERT_RUN, {"id": run_id, "job_id": job_id, "status": status, "started_at": started_at,
+                                "finished_at": finished_at, "elapsed": elapsed, "error": error}))
+
+    def record_stage(self, job_id, run_id, event):
+        """Records a Pipeline progress event ({"stage", "status", ...timings}) once the stage has settled."""
+        if event["status"] not in FINAL_STAGE_STATUSES:
+            return
+        self._put((INSERT_STAGE, {
+            "run_id": run_id, "job_id": job_id, "stage": event["stage"], "status": event["status"],
+            "kind": event.get("kind"),
+            "provider": event.get("provider"), "started": event.get("started"), "finished": event.get("finished"),
+            "seconds": event.get("seconds"), "error": event.get("error"), "updated_at": time.time(),
+        }))
+
+    def record_artifacts(self, job_id, outputs, workspace_root):
+        """Records every file the stage outputs point to; files outside the workspace are shared cache assets."""
+        workspace_root = os.path.abspath(workspace_root)
+        for stage, output in outputs.items():
+            for path in referenced_files(output):
+                shared = not os.path.abspath(path).startswith(workspace_root + os.sep)
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    size = None  # A shared cache may evict the clip at any moment; the job still used it
+                self._put((UPSERT_ARTIFACT, (job_id, stage, path, size, int(shared))))
+
+    def record_upload(self, video_id, job_id, title=None, privacy_status=None):
+        self._put((UPSERT_UPLOAD, (video_id, job_id, title, privacy_status, time.time())))
+
+    # Queries
+
+    def query(self, sql, params=()):
+        """Runs a read query and returns rows as dicts."""
+        with self._lock:
+            if self._read_conn is None:
+                self._read_conn = self._connect()
+                self._read_conn.row_factory = sqlite3.Row
+            return [dict(row) for row in self._read_conn.execute(sql, params).fetchall()]
+
+    def job(self, job_id):
+        rows = self.query("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def job_runs(self, job_id):
+        """A job's runs, oldest first."""
+        return self.query("SELECT * FROM runs WHERE job_id = ? ORDER BY started_at", (job_id,))
+
+    def produced_topics(self, region=None, since=0):
+        """Topics with a succeeded job (optionally in a region) since a timestamp, newest first."""
+        if region:
+            return self.query("SELECT topic, region, MAX(finished_at) AS last_produced, COUNT(*) AS jobs FROM jobs "
+                              "WHERE region = ? AND status = 'succeeded' AND created_at >= ? "
+                              "GROUP BY topic ORDER BY last_produced DESC", (region, since))
+        return self.query("SELECT topic, region, MAX(finished_at) AS last_produced, COUNT(*) AS jobs FROM jobs "
+                          "WHERE status = 'succeeded' AND created_at >= ? "
+                          "GROUP BY topic, region ORDER BY last_produced DESC", (since,))
+
+    def stage_durations(self, since=0):
+        """Count, mean and max seconds of each stage run that did work, across all runs (reused ones excluded)."""
+        return self.query("SELECT stage, COUNT(*) AS runs, AVG(seconds) AS avg_seconds, MAX(seconds) AS max_seconds "
+                          "FROM stages WHERE status = 'done' AND updated_at >= ? GROUP BY stage ORDER BY stage",
+                          (since,))
+
+    def failures_by_provider(self, since=0):
+        return self.query("SELECT provider, stage, COUNT(*) AS failures FROM stages "
+                          "WHERE status = 'failed' AND updated_at >= ? GROUP BY provider, stage "
+                          "ORDER BY failures DESC", (since,))
+
+    def job_artifacts(self, job_id, shared_only=False):
+        sql = "SELECT stage, path, size, shared FROM artifacts WHERE job_id = ?"
+        return self.query(sql + (" AND shared = 1" if shared_only else ""), (job_id,))
+
+    def jobs_using(self, path):
+        """Jobs whose artifacts include `path` (e.g. which videos used a cached clip)."""
+        return self.query("SELECT job_id, stage FROM artifacts WHERE path = ?", (path,))
+
+
+job_store = JobStore()
@@ -1 +1,103 @@
- 
+import json
+import asyncio
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, model_validator
+from configs.settings import DEFAULT_REGION
+
+TERMINAL = ("succeeded", "failed", "cancelled")
+EVENT_POLL_SECONDS = 0.25
+JOB_ID_PATTERN = r"^[a-z0-9][a-z0-9-]{0,63}$"  # The id names the job's workspace and manifest, so no paths
+
+router = APIRouter()
+
+
+class JobRequest(BaseModel):
+    """A video job; the same keys and policies as an entry in a batch.py job file."""
+    topic: str | None = None
+    trending: bool = False
+    specific_topic: str | None = None
+    region: str = DEFAULT_REGION
+    id: str | None = Field(default=None, pattern=JOB_ID_PATTERN)
+    title_policy: Literal["first", "random"] | int = "first"
+    topic_policy: Literal["first", "random"] = "first"
+    video: bool = True
+    captions_mode: Literal["burn", "sidecar", "both"] | None = None
+    render_mode: Literal["single_pass", "two_step"] | None = None
+    thumbnail_fallback: Literal["default", "skip"] = "default"
+    upload: bool = True
+    privacy_status: Literal["public", "private", "unlisted"] = "public"
+    fresh: bool = False
+
+    @model_validator(mode="after")
+    def needs_topic(self):
+        if not self.topic and not self.trending:
+            raise ValueError("Give a 'topic' or set 'trending': true")
+        return self
+
+
+def get_job_or_404(request, job_id):
+    state = request.app.state.jobs.get(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return state
+
+
+@router.get("/health")
+def health():
+    return {"status": "ok"}
+
+
+@router.post("/jobs", status_code=202)
+def submit_job(body: JobRequest, request: Request):
+    job = {key: value for key, value in body.model_dump().items() if value is not None}
+    try:
+        state = request.app.state.jobs.submit(job)
+    except OverflowError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return state.summary()
+
+
+@router.get("/jobs")
+def list_jobs(request: Request, status: str | None = None):
+    return [state.summary() for state in request.app.state.jobs.list(status)]
+
+
+@router.get("/jobs/{job_id}")
+def job_status(job_id: str, request: Request):
+    return get_job_or_404(request, job_id).summary()
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str, request: Request):
+    get_job_or_404(request, job_id)
+    return request.app.state.jobs.cancel(job_id).summary()
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Server-sent events: one `data:` JSON line per job or stage status change, until the job ends.
+    Reconnecting clients send Last-Event-ID and receive only the events they missed.
+    """
+    state = get_job_or_404(request, job_id)
+    last_id = request.headers.get("last-event-id")
+    start = int(last_id) + 1 if last_id and last_id.isdigit() else 0
+
+    async def stream():
+        sent = start
+        while True:
+            events = state.events[sent:]
+            for event in events:
+                yield f"id: {event['id']}\nevent: {'stage' if 'stage' in event else 'job'}\ndata: {json.dumps(event)}\n\n"
+            sent += len(events)
+            if state.status in TERMINAL and sent >= len(state.events):
+                return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(EVENT_POLL_SECONDS)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,170 @@
+"""
+HTTP job service for the video pipeline.
+
+    uvicorn backend.server:app
+
+Jobs run on a bounded pool of worker threads, off the event loop. With RENDER_ENGINE=ffmpeg or segmented
+the encode happens in ffmpeg or worker processes; the default moviepy engine composites frames in Python
+on the job's thread, so it competes with the API for the GIL while it renders.
+"""
+import time
+import uuid
+import threading
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI
+from batch import run_job
+from agents.workspace import slugify
+from backend.routes import router
+from backend.database import job_store
+from configs.settings import (DEFAULT_REGION, SERVER_WORKERS, SERVER_MAX_QUEUED, SERVER_JOB_TTL_SECONDS,
+                             SERVER_MAX_FINISHED)
+
+ACTIVE = ("queued", "running")
+
+
+class JobState:
+    """Status, progress events and the cancel flag of one submitted job."""
+
+    def __init__(self, job):
+        self.id = job["id"]
+        self.job = job
+        self.status = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.stages = {}
+        self.events = []  # Progress events in order; SSE clients resume by index
+        self.manifest = None
+        self.cancel = threading.Event()
+        self.future = None
+        self.lock = threading.Lock()
+
+    def add_event(self, event):
+        with self.lock:
+            event = {**event, "id": len(self.events), "time": time.time()}
+            self.events.append(event)
+            if "stage" in event:
+                self.stages[event["stage"]] = event["status"]
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "topic": self.job.get("topic"),
+            "region": self.job.get("region"),
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stages": dict(self.stages),
+            "manifest": self.manifest,
+        }
+
+
+class JobManager:
+    """
+    Queues jobs onto a bounded worker pool and tracks their state. Finished jobs are forgotten after
+    `finished_ttl` seconds or beyond the newest `max_finished`; their history stays in the job store.
+    """
+
+    def __init__(self, workers=SERVER_WORKERS, max_queued=SERVER_MAX_QUEUED, runner=run_job,
+                 finished_ttl=SERVER_JOB_TTL_SECONDS, max_finished=SERVER_MAX_FINISHED):
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="server-job")
+        self.max_queued = max_queued
+        self.runner = runner
+        self.finished_ttl = finished_ttl
+        self.max_finished = max_finished
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, job):
+        """Queues a job dict (see batch.py for its keys). Raises OverflowError when the queue is full."""
+        job.setdefault("region", DEFAULT_REGION)
+        job.setdefault("id", f"{slugify(job.get('topic') or 'trending-' + job['region'])}-{uuid.uuid4().hex[:8]}")
+        with self.lock:
+            self._evict()
+            if job["id"] in self.jobs and self.jobs[job["id"]].status in ACTIVE:
+                raise ValueError(f"Job '{job['id']}' is already {self.jobs[job['id']].status}")
+            if sum(state.status == "queued" for state in self.jobs.values()) >= self.max_queued:
+                raise OverflowError("Job queue is full")
+            state = JobState(job)
+            state.add_event({"status": "queued"})
+            # Published together with its future, so cancel() never sees a job without one
+            state.future = self.pool.submit(self._run, state)
+            self.jobs[state.id] = state
+        return state
+
+    def _run(self, state):
+        if state.cancel.is_set():
+            self._finish(state, "cancelled")
+            return
+        state.status, state.started_at = "running", time.time()
+        state.add_event({"status": "running"})
+        try:
+            state.manifest = self.runner(state.job, fresh=state.job.get("fresh", False),
+                                         on_event=state.add_event, cancel=state.cancel)
+            status = state.manifest["status"]
+        except Exception as e:
+            state.manifest = {"error": str(e)}
+            status = "failed"
+        self._finish(state, status)
+
+    def _finish(self, state, status):
+        # The final event goes out before the status flips, so event streams never end without it
+        state.finished_at = time.time()
+        state.add_event({"status": status})
+        state.status = status
+        with self.lock:
+            self._evict()
+
+    def _evict(self):
+        """Drops expired and surplus finished jobs; the caller holds self.lock."""
+        finished = sorted((state for state in self.jobs.values() if state.status not in ACTIVE),
+                          key=lambda state: state.finished_at or 0)
+        cutoff = time.time() - self.finished_ttl
+        surplus = len(finished) - self.max_finished
+        for index, state in enumerate(finished):
+            if index < surplus or (state.finished_at or 0) < cutoff:
+                del self.jobs[state.id]
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self, status=None):
+        """A snapshot of the tracked jobs, safe to iterate while others are submitted."""
+        with self.lock:
+            states = list(self.jobs.values())
+        return [state for state in states if status is None or state.status == status]
+
+    def cancel(self, job_id):
+        """Cancels a queued job outright, or stops a running one after its current stages finish."""
+        state = self.get(job_id)
+        if state is None or state.status not in ACTIVE:
+            return state
+        state.cancel.set()
+        if state.future.cancel():
+            self._finish(state, "cancelled")
+        return state
+
+    def shutdown(self):
+        for state in self.list():
+            state.cancel.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    app.state.jobs.shutdown()
+    job_store.flush()  # Commit the last queued history writes
+
+
+def create_app(manager=None):
+    app = FastAPI(title="YouTube AutoAgent", description="Submit and follow video pipeline jobs.", lifespan=lifespan)
+    app.state.jobs = manager or JobManager()
+    app.include_router(router)
+    return app
+
+
+app = create_app()
@@ -0,0 +1,180 @@
+"""
+Headless batch mode: runs a queue of video jobs without any console prompts.
+
+    python batch.py jobs.json [--workers 2] [--out manifests] [--fresh]
+
+The job file is JSON: {"defaults": {...}, "jobs": [{...}, ...]}. Each job gives a "topic", or
+"trending": true with an optional "specific_topic" to take one from the region's trending list.
+Any key may also be set in "defaults":
+    region            country code (DEFAULT_REGION)
+    title_policy      "first", "random" or a 0-based index into the generated titles ("first")
+    topic_policy      "first" or "random" pick from the trending topics ("first")
+    video, captions_mode, render_mode, thumbnail_fallback ("default"/"skip"), upload, privacy_status
+A JSON manifest with stage timings, the critical path, the stages reused from checkpoints and the
+outputs is written per job. Jobs keep their workspace (named after the job id) between runs, so re-running
+a job file resumes each job from its first stale stage; --fresh starts every job over.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from agents.idea_generation import get_trending_ideas
+from agents.video_job import DEFAULT_OPTIONS, build_video_job
+from agents.workspace import Workspace, slugify
+from backend.database import job_store
+from models.file_utils import write_atomic
+from configs.settings import DEFAULT_REGION, MAX_RESULTS, BATCH_WORKERS, BATCH_MANIFEST_DIR, WORKSPACE_DIR
+
+TITLE_COUNT = 5  # generate_titles always returns at least this many
+
+
+def load_jobs(path):
+    """Reads a job file and returns its jobs with defaults applied and an id assigned."""
+    with open(path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+    defaults = spec.get("defaults", {})
+
+    jobs = []
+    for index, entry in enumerate(spec.get("jobs", []), start=1):
+        job = {**defaults, **entry}
+        if not job.get("topic") and not job.get("trending"):
+            raise ValueError(f"Job {index} needs a 'topic' or 'trending': true")
+        job.setdefault("region", DEFAULT_REGION)
+        job.setdefault("id", f"{index:03d}-{slugify(job.get('topic') or 'trending-' + job['region'])}")
+        jobs.append(job)
+    return jobs
+
+
+def pick(policy, count):
+    """Resolves a selection policy ("first", "random" or an index) to an index below count."""
+    if policy == "random":
+        return random.randrange(count)
+    if policy in (None, "first"):
+        return 0
+    index = int(policy)
+    if not 0 <= index < count:
+        raise ValueError(f"Selection index {index} out of range (0-{count - 1})")
+    return index
+
+
+def resolve_topic(job):
+    if job.get("topic"):
+        return job["topic"]
+    trending = get_trending_ideas(job["region"], job.get("specific_topic"), MAX_RESULTS, return_json=False)
+    topics = trending.get("trending_topics", [])
+    if not topics:
+        raise RuntimeError(f"No trending topics found for {job['region']}")
+    return topics[pick(job.get("topic_policy"), len(topics))]
+
+
+def job_options(job):
+    options = {key: job[key] for key in DEFAULT_OPTIONS if key in job}
+    options["title_index"] = pick(job.get("title_policy"), TITLE_COUNT)
+    if options.get("thumbnail_fallback") == "ask":
+        options["thumbnail_fallback"] = "default"  # Nobody is there to answer
+    return options
+
+
+def summarize_outputs(outputs):
+    """Keeps the JSON-friendly parts of the stage outputs for the manifest."""
+    summary = {}
+    if outputs.get("script"):
+        summary["script"] = outputs["script"]["script"]
+    if outputs.get("tts"):
+        summary["audio"] = outputs["tts"]["audio"]
+    if outputs.get("render"):
+        summary.update(video=outputs["render"]["video"], captions=outputs["render"]["captions"])
+    if outputs.get("seo"):
+        summary["seo"] = outputs["seo"]
+    if outputs.get("thumbnail"):
+        summary["thumbnail"] = outputs["thumbnail"]
+    if outputs.get("upload"):
+        summary["video_id"] = outputs["upload"]
+    return summary
+
+
+def write_manifest(manifest, manifest_dir):
+    return write_atomic(os.path.join(manifest_dir, f"{manifest['id']}.json"),
+                        json.dumps(manifest, indent=2, ensure_ascii=False))
+
+
+def run_job(job, manifest_dir=BATCH_MANIFEST_DIR, workspace_root=WORKSPACE_DIR, fresh=False,
+            on_event=None, cancel=None):
+    """
+    Runs one job end to end in its own workspace (named after the job id) and writes its manifest.
+    Never raises; failures end up in the manifest. on_event and cancel are passed to Pipeline.run.
+    The job, its stages, the files it used and its upload are recorded in the job store.
+    """
+    started = time.perf_counter()
+    workspace = Workspace(job["id"], workspace_root)
+    run_id = f"{job['id']}-{uuid.uuid4().hex[:8]}"  # Each attempt at the job gets its own history
+    manifest = {"id": job["id"], "run_id": run_id, "region": job["region"], "status": "failed",
+                "workspace": workspace.root, "started_at": datetime.now(timezone.utc).isoformat()}
+    job_store.record_job(job["id"], "running", topic=job.get("topic"), region=job["region"],
+                         started_at=time.time(), workspace=workspace.root)
+    job_store.record_run(run_id, job["id"], "running", started_at=time.time())
+
+    def record_event(event):
+        job_store.record_stage(job["id"], run_id, event)
+        if on_event is not None:
+            on_event(event)
+
+    try:
+        manifest["topic"] = resolve_topic(job)
+        manifest["options"] = job_options(job)
+        outputs, report = build_video_job(manifest["topic"], job["region"], manifest["options"],
+                                          workspace=workspace, fresh=fresh).run(on_event=record_event, cancel=cancel)
+        status = "cancelled" if report["cancelled"] else "succeeded" if report["ok"] else "failed"
+        manifest.update(status=status, stages=report["stages"],
+                        critical_path=report["critical_path"], reused=report["reused"],
+                        outputs=summarize_outputs(outputs))
+        job_store.record_artifacts(job["id"], outputs, workspace.root)
+        if outputs.get("upload"):
+            job_store.record_upload(outputs["upload"], job["id"], (outputs.get("seo") or {}).get("title"),
+                                    manifest["options"].get("privacy_status"))
+    except Exception as e:
+        manifest["error"] = str(e)
+        print(f"❌ Job {job['id']} failed: {e}")
+    manifest["finished_at"] = datetime.now(timezone.utc).isoformat()
+    manifest["elapsed"] = round(time.perf_counter() - started, 3)
+    job_store.record_job(job["id"], manifest["status"], topic=manifest.get("topic"), finished_at=time.time(),
+                         elapsed=manifest["elapsed"], options=manifest.get("options"), error=manifest.get("error"))
+    job_store.record_run(run_id, job["id"], manifest["status"], finished_at=time.time(), elapsed=manifest["elapsed"],
+                         error=manifest.get("error"))
+    manifest["manifest"] = write_manifest(manifest, manifest_dir)
+    print(f"{'✅' if manifest['status'] == 'succeeded' else '❌'} Job {job['id']}: {manifest['status']} "
+          f"in {manifest['elapsed']:.1f}s")
+    return manifest
+
+
+def run_batch(jobs, workers=BATCH_WORKERS, manifest_dir=BATCH_MANIFEST_DIR, workspace_root=WORKSPACE_DIR,
+              fresh=False):
+    """Runs jobs on a pool of `workers` and returns their manifests in job order."""
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job") as pool:
+        return list(pool.map(lambda job: run_job(job, manifest_dir, workspace_root, fresh), jobs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run YouTube video jobs from a job file, without prompts.")
+    parser.add_argument("job_file")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="jobs to run at once")
+    parser.add_argument("--out", default=BATCH_MANIFEST_DIR, help="directory for the per-job manifests")
+    parser.add_argument("--fresh", action="store_true", help="ignore checkpoints and rerun every stage")
+    args = parser.parse_args(argv)
+
+    manifests = run_batch(load_jobs(args.job_file), args.workers, args.out, fresh=args.fresh)
+    job_store.flush()
+    succeeded = sum(manifest["status"] == "succeeded" for manifest in manifests)
+    print(f"\n📋 Batch done: {succeeded}/{len(manifests)} jobs succeeded. Manifests in '{args.out}'.")
+    return 0 if succeeded == len(manifests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,5 +10,97 @@ MAX_RESULTS = int(os.getenv("MAX_RESULTS", 5))
 PEXELS_API = os.getenv("PEXELS_API")
 HUGGINGFACE_API_KEY = os.getenv("Huggingface_API_KEY")
 
+# Video rendering
+VIDEO_RESOLUTION = tuple(int(v) for v in os.getenv("VIDEO_RESOLUTION", "1920x1080").split("x"))
+RENDER_MODE = os.getenv("RENDER_MODE", "single_pass")  # "single_pass" or "two_step"
+RENDER_ENGINE = os.getenv("RENDER_ENGINE", "moviepy")  # "moviepy", "ffmpeg" (native filtergraph) or "segmented"
+TIMELINE_LOOKAHEAD = int(os.getenv("TIMELINE_LOOKAHEAD", 1))  # Upcoming clips kept open by the streaming timeline
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", os.cpu_count() or 1))  # Processes used by the segmented engine
 
+# Stock footage downloads
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", 4))
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", 3))
+DOWNLOAD_CONNECT_TIMEOUT = float(os.getenv("DOWNLOAD_CONNECT_TIMEOUT", 10))
+DOWNLOAD_READ_TIMEOUT = float(os.getenv("DOWNLOAD_READ_TIMEOUT", 30))
 
+# Persistent stock footage cache
+MEDIA_CACHE_DIR = os.getenv("MEDIA_CACHE_DIR", os.path.join("cache", "media"))
+MEDIA_CACHE_MAX_BYTES = int(os.getenv("MEDIA_CACHE_MAX_BYTES", 5 * 1024 ** 3))  # 5 GB
+MEDIA_CACHE_MIN_AGE = int(os.getenv("MEDIA_CACHE_MIN_AGE", 300))  # Seconds a used clip is safe from eviction
+
+# Subtitles
+CAPTIONS_MODE = os.getenv("CAPTIONS_MODE", "burn")  # "burn" into frames, upload as "sidecar" track, or "both"
+SUBTITLE_BACKEND = os.getenv("SUBTITLE_BACKEND", "pillow")  # "pillow" (in-process) or "imagemagick"
+SUBTITLE_FONT = os.getenv("SUBTITLE_FONT", "DejaVuSans-Bold.ttf")
+
+# Clip pre-normalization (canonical intermediates cached by source hash)
+NORMALIZE_CLIPS = os.getenv("NORMALIZE_CLIPS", "true").lower() == "true"
+NORMALIZE_WORKERS = int(os.getenv("NORMALIZE_WORKERS", os.cpu_count() or 1))
+NORMALIZED_CACHE_DIR = os.getenv("NORMALIZED_CACHE_DIR", os.path.join("cache", "normalized"))
+NORMALIZED_CACHE_MAX_BYTES = int(os.getenv("NORMALIZED_CACHE_MAX_BYTES", 2 * 1024 ** 3))  # 2 GB
+
+# Shared HTTP client
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 30))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 5))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+HTTP_RATE_LIMITS = {  # Requests per second, per API key
+    "api.groq.com": float(os.getenv("GROQ_REQUESTS_PER_SECOND", 0.5)),
+    "api.pexels.com": float(os.getenv("PEXELS_REQUESTS_PER_SECOND", 1)),
+    "api-inference.huggingface.co": float(os.getenv("HUGGINGFACE_REQUESTS_PER_SECOND", 0.5)),
+}
+
+# One JSON-structured Groq call for script + SEO metadata (falls back to separate calls)
+COMBINED_GENERATION = os.getenv("COMBINED_GENERATION", "true").lower() == "true"
+
+# Stream the script sentence by sentence straight into TTS (takes precedence over COMBINED_GENERATION)
+STREAM_SCRIPT = os.getenv("STREAM_SCRIPT", "false").lower() == "true"
+
+# LLM response cache
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("cache", "llm_cache.sqlite3"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))  # One week
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 10000))
+
+# Text to speech
+TTS_SENTENCE_CHUNKING = os.getenv("TTS_SENTENCE_CHUNKING", "true").lower() == "true"
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", 4))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join("cache", "tts"))
+# "gtts" (network), or a local CPU engine: "pyttsx3" (system voices) or "mms" (transformers, facebook/mms-tts-eng)
+TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")
+
+# Thumbnails
+THUMBNAIL_STYLE = os.getenv("THUMBNAIL_STYLE", "bold")
+THUMBNAIL_DEADLINE = float(os.getenv("THUMBNAIL_DEADLINE", 20))  # Seconds the remote model may race the local composer
+THUMBNAIL_CACHE_DIR = os.getenv("THUMBNAIL_CACHE_DIR", os.path.join("cache", "thumbnails"))
+
+# Pipeline: network-bound stages share one pool; CPU-bound stages (rendering) are capped separately
+PIPELINE_IO_WORKERS = int(os.getenv("PIPELINE_IO_WORKERS", 4))
+PIPELINE_CPU_WORKERS = int(os.getenv("PIPELINE_CPU_WORKERS", 1))
+
+# Headless batch mode (batch.py)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 2))  # Concurrent jobs, each in its own workspace
+BATCH_MANIFEST_DIR = os.getenv("BATCH_MANIFEST_DIR", "manifests")
+
+# Per-job workspaces: every job's artifacts live under WORKSPACE_DIR/<job id>/
+WORKSPACE_DIR = os.getenv("WORKSPACE_DIR", "jobs")
+
+# Job server (backend/server.py)
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 2))  # Jobs running at once
+SERVER_MAX_QUEUED = int(os.getenv("SERVER_MAX_QUEUED", 100))  # Submissions beyond this are rejected with 429
+SERVER_JOB_TTL_SECONDS = float(os.getenv("SERVER_JOB_TTL_SECONDS", 3600))  # Finished jobs stay queryable this long
+SERVER_MAX_FINISHED = int(os.getenv("SERVER_MAX_FINISHED", 500))  # ...and at most this many are kept in memory
+
+# Job history database (backend/database.py)
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join("data", "jobs.sqlite3"))
+JOB_DB_FLUSH_SECONDS = float(os.getenv("JOB_DB_FLUSH_SECONDS", 1.0))  # Max delay before queued writes commit
+
+# Performance analytics (agents/performance_analytics.py)
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", 10000))  # Data API units per day (resets at midnight PT)
+ANALYTICS_STORE_PATH = os.getenv("ANALYTICS_STORE_PATH", os.path.join("data", "performance.npz"))
+ANALYTICS_QUOTA_PATH = os.getenv("ANALYTICS_QUOTA_PATH", os.path.join("data", "youtube_quota.json"))
+ANALYTICS_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REFRESH_SECONDS", 6 * 3600))  # Stats younger than this are kept
+
+# Audience engagement (agents/audience_engagement.py)
+COMMENT_CURSORS_PATH = os.getenv("COMMENT_CURSORS_PATH", os.path.join("data", "comment_cursors.json"))
+COMMENT_MAX_CLUSTERS = int(os.getenv("COMMENT_MAX_CLUSTERS", 2000))  # Bounds memory on very busy videos
+COMMENT_SIMILARITY = float(os.getenv("COMMENT_SIMILARITY", 0.6))  # Word-set Jaccard for "similar" comments
+COMMENT_REPLY_BATCH = int(os.getenv("COMMENT_REPLY_BATCH", 20))  # Comments per reply-drafting LLM call
@@ -1,17 +1,7 @@
-import os
 from agents.idea_generation import get_trending_ideas
-from agents.script_writer import script_generator
-from agents.text_to_speech import TTSModel
-from agents.video_editor import create_video
-from agents.subtitle_generator import add_subtitles_to_video
-from agents.thumbnail_generator import generate_thumbnail
-from agents.seo_optimizer import optimize_seo
-from agents.video_upload import upload_video_with_thumbnail
-from configs.settings import DEFAULT_REGION, MAX_RESULTS
-
-DEFAULT_THUMBNAIL = "default_thumbnail.png"
-GENERATED_THUMBNAIL = "generated_thumbnail.png"
-FINAL_VIDEO_NAME = "final_video_with_subs.mp4"
+from agents.video_job import run_video_job
+from models.llm_model import generate_titles
+from configs.settings import DEFAULT_REGION, MAX_RESULTS, CAPTIONS_MODE
 
 def select_from_list(prompt, options):
     print(f"\n📌 {prompt}")
@@ -46,105 +36,37 @@ def get_topic():
         print("❌ Invalid choice.")
         return None, None
 
-def generate_script(region, topic):
-    result = script_generator(region, topic, return_json=False)
-    if isinstance(result, list):
-        title = select_from_list("Suggested Video Titles", result)
-        return script_generator(region, title, return_json=False) if title else None
-    elif isinstance(result, dict):
-        if "error" in result:
-            print(f"❌ Script generation failed: {result['error']}")
-            return None
-        return result.get("script")
-    return result if isinstance(result, str) else None
+def select_captions_mode():
+    choice = input(f"\n💬 Subtitles: burn / sidecar / both (Enter={CAPTIONS_MODE}): ").strip().lower()
+    if choice in ("burn", "sidecar", "both"):
+        return choice
+    return CAPTIONS_MODE
+
+def select_title_index(topic):
+    """Asks for the video title up front so the pipeline can run unattended (titles are served from the LLM cache later)."""
+    titles = generate_titles(topic)
+    if not titles or len(titles) < 5:
+        print("❌ Could not generate enough specific titles for the topic.")
+        return None
+    title = select_from_list("Suggested Video Titles", titles)
+    return titles.index(title) if title else None
 
 def main():
     topic, region = get_topic()
     if not topic:
         return
 
-    script = generate_script(region, topic)
-    if not script or not script.strip():
-        print("❌ Invalid or empty script.")
+    title_index = select_title_index(topic)
+    if title_index is None:
         return
 
-    print("\n📌 Generated Script:\n", script)
-
-    # TTS
-    print("\n🎙️ Converting script to speech...")
-    try:
-        tts = TTSModel()
-        audio_file = tts.convert_text_to_speech(script)
-        if not (audio_file and os.path.exists(audio_file)):
-            raise Exception("Audio file not created.")
-        print(f"✅ Audio generated: {audio_file}")
-    except Exception as e:
-        print(f"❌ TTS Error: {e}")
-        return
-
-    # Video Generation
-    if input("\n🎥 Generate video? (Enter=yes / no=skip): ").strip().lower() in ["", "yes"]:
-        print("\n🔍 Searching Pexels...")
-        video_path = create_video(topic, audio_file)
-        if not (video_path and os.path.exists(video_path)):
-            print("❌ Video generation failed.")
-            return
-
-        print(f"✅ Video created: {video_path}")
-        print("\n📝 Adding subtitles...")
-        final_video = add_subtitles_to_video(video_path, script, FINAL_VIDEO_NAME)
-        if not final_video or not os.path.exists(final_video):
-            print("❌ Subtitles failed.")
-            return
-        print(f"✅ Final video: {final_video}")
-
-        # Thumbnail
-        print("\n🖼️ Generating thumbnail...")
-        thumb_path = generate_thumbnail(topic)
-        thumb_file = GENERATED_THUMBNAIL if thumb_path and os.path.exists(GENERATED_THUMBNAIL) else None
-
-        if not thumb_file:
-            fallback = input("❌ Thumbnail failed. Use default or skip? (default/skip): ").strip().lower()
-            if fallback == "default" and os.path.exists(DEFAULT_THUMBNAIL):
-                if DEFAULT_THUMBNAIL != GENERATED_THUMBNAIL:
-                    os.rename(DEFAULT_THUMBNAIL, GENERATED_THUMBNAIL)
-                thumb_file = GENERATED_THUMBNAIL
-                print(f"✅ Default thumbnail used: {thumb_file}")
-            else:
-                thumb_file = None
-
-        # SEO Optimization
-        print("\n📈 Optimizing SEO...")
-        seo = optimize_seo(topic) or {}
-
-        # Set defaults with validation
-        seo["title"] = seo.get("title") or f"{topic.strip()} - Auto-Generated"
-        seo["description"] = seo.get("description") or f"Explore {topic.strip()} in this AI-generated video!"
-        seo["tags"] = seo.get("tags") or [topic.strip(), f"{topic.strip()} video", "AI", "auto-generated"]
-
-        # Ensure title is valid
-        if not seo["title"] or not seo["title"].strip():
-            print("❌ Error: SEO title is missing or empty.")
-            return
-
-        print("✅ SEO:", seo)
-
+    options = {"title_index": title_index, "thumbnail_fallback": "ask"}
+    options["video"] = input("\n🎥 Generate video? (Enter=yes / no=skip): ").strip().lower() in ["", "yes"]
+    if options["video"]:
+        options["captions_mode"] = select_captions_mode()
 
-        # Upload
-        print("\n📤 Uploading to YouTube...")
-        try:
-            video_id = upload_video_with_thumbnail(
-                file_path=final_video,
-                title=seo["title"],
-                description=seo["description"],
-                tags=seo["tags"],
-                thumbnail_path=thumb_file,
-                category_id="22",
-                privacy_status="public"
-            )
-            print(f"\n✅ Uploaded! Video ID: {video_id}")
-        except Exception as e:
-            print(f"\n❌ Upload error: {e}")
+    # Script, TTS, footage, SEO, render, thumbnail and upload run as a DAG; independent stages overlap
+    run_video_job(topic, region, options)
 
 if __name__ == "__main__":
     main()
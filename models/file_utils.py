@@ -0,0 +1,38 @@
+import os
+import uuid
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_output(path):
+    """
+    Yields a temporary path beside `path` to write to; when the block succeeds the file is renamed
+    over `path` in one step, so readers (e.g. other jobs sharing a cache) never see a partial file.
+    On error the temporary file is removed. The file is created 0666 less the umask, like open() would.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"  # Unique, so concurrent writers never share one
+    os.close(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_atomic(path, data):
+    """Atomically writes bytes or text (UTF-8) to path and returns the path."""
+    with atomic_output(path) as temp_path:
+        if isinstance(data, bytes):
+            with open(temp_path, "wb") as f:
+                f.write(data)
+        else:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+    return path
@@ -0,0 +1,145 @@
+import time
+import random
+import hashlib
+import threading
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from configs.settings import HTTP_TIMEOUT, HTTP_MAX_RETRIES, HTTP_POOL_SIZE, HTTP_RATE_LIMITS
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+_sessions = {}
+_buckets = {}
+_lock = threading.Lock()
+_stats = defaultdict(lambda: {"requests": 0, "errors": 0, "retries": 0, "total_latency": 0.0, "max_latency": 0.0})
+
+
+class TokenBucket:
+    """Blocking token bucket: allows `rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_session(url):
+    """Returns the pooled keep-alive Session for the URL's host."""
+    host = urlparse(url).netloc
+    with _lock:
+        if host not in _sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return _sessions[host]
+
+
+def _get_bucket(host, api_key):
+    """One token bucket per (host, API key); None when the host has no configured limit."""
+    rate = HTTP_RATE_LIMITS.get(host)
+    if not rate:
+        return None
+    key = (host, hashlib.sha256((api_key or "").encode("utf-8")).hexdigest())
+    with _lock:
+        if key not in _buckets:
+            _buckets[key] = TokenBucket(rate)
+        return _buckets[key]
+
+
+def _retry_delay(response, attempt):
+    """Honours Retry-After (seconds or HTTP date) and otherwise backs off exponentially with full jitter."""
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            try:
+                return min(max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()), BACKOFF_MAX)
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def request(method, url, api_key=None, timeout=HTTP_TIMEOUT, max_retries=HTTP_MAX_RETRIES, **kwargs):
+    """
+    Sends a request through the shared per-host pool, rate-limited per API key and retried on
+    429/5xx and connection errors. Returns the last response; raises RequestException if no response arrived.
+    """
+    parsed = urlparse(url)
+    endpoint = f"{method.upper()} {parsed.netloc}{parsed.path}"
+    session = get_session(url)
+    bucket = _get_bucket(parsed.netloc, api_key)
+
+    for attempt in range(max_retries + 1):
+        if bucket:
+            bucket.acquire()
+
+        started = time.monotonic()
+        response = None
+        error = None
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+        latency = time.monotonic() - started
+
+        with _lock:
+            stats = _stats[endpoint]
+            stats["requests"] += 1
+            stats["total_latency"] += latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+            if error is not None or response.status_code >= 400:
+                stats["errors"] += 1
+
+        retryable = error is not None or response.status_code in RETRY_STATUSES
+        if not retryable or attempt == max_retries:
+            break
+
+        delay = _retry_delay(response, attempt)
+        reason = error or f"HTTP {response.status_code}"
+        print(f"⚠️ {endpoint}: {reason}. Retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+        with _lock:
+            _stats[endpoint]["retries"] += 1
+        time.sleep(delay)
+
+    if response is None:
+        raise error
+    return response
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def stats():
+    """Per-endpoint request/error/retry counts and latencies."""
+    with _lock:
+        return {
+            endpoint: dict(s, avg_latency=s["total_latency"] / s["requests"] if s["requests"] else 0.0)
+            for endpoint, s in _stats.items()
+        }
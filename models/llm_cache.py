@@ -0,0 +1,89 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from configs.settings import LLM_CACHE_PATH, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES
+
+
+def cache_key(model, messages, params):
+    """Stable hash of everything that determines a completion."""
+    payload = json.dumps({"model": model, "messages": messages, "params": params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Disk-backed (SQLite) cache of LLM completions keyed by cache_key().
+    Entries expire after `ttl` seconds and the least recently used ones are dropped beyond `max_entries`.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")  # Several jobs can share the cache file
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions(last_used)")
+        return self._conn
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT content, created FROM completions WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl:
+                conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self.hits += 1
+                return row[0]
+            if row:  # Expired
+                conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                conn.commit()
+            self.misses += 1
+            return None
+
+    def set(self, key, content):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO completions (key, content, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, content, now, now),
+            )
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM completions WHERE created < ?", (now - self.ttl,))
+        conn.execute(
+            "DELETE FROM completions WHERE key IN ("
+            "SELECT key FROM completions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+llm_cache = LLMCache()
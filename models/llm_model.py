@@ -1,9 +1,12 @@
 import os
-import requests
+import json
 import re  # ✅ Used to clean non-spoken text
+from models import http_client
+from models.llm_cache import llm_cache, cache_key
 from configs.settings import GROQ_API_KEY
 
 GROQ_MODEL = "mistral-saba-24b"  # ✅ Best available model from Groq
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
 
 def clean_script_for_voice(script):
     """Cleans the script by removing unwanted characters and ensuring a short, well-structured format."""
@@ -29,40 +32,214 @@ def clean_script_for_voice(script):
 
 
 
-def generate_titles(topic):
+def chat_completion(messages, use_cache=True, model=GROQ_MODEL, timeout=None, max_retries=None, validate=None, **params):
+    """
+    Sends a chat completion to Groq and returns (status_code, content).
+    Successful completions are stored in the LLM cache keyed by model, messages and params
+    (only if validate(content) passes, when given); pass use_cache=False to force a fresh call.
+    """
+    key = cache_key(model, messages, params)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return 200, cached
+
+    request_kwargs = {}
+    if timeout is not None:
+        request_kwargs["timeout"] = timeout
+    if max_retries is not None:
+        request_kwargs["max_retries"] = max_retries
+
+    response = http_client.post(
+        GROQ_API_URL,
+        api_key=GROQ_API_KEY,
+        headers={"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"},
+        json={"model": model, "messages": messages, **params},
+        **request_kwargs
+    )
+
+    if response.status_code != 200:
+        return response.status_code, response.text
+
+    content = response.json().get("choices", [{}])[0].get("message", {}).get("content", "")
+    if content and (validate is None or validate(content)):
+        llm_cache.set(key, content)
+    return 200, content
+
+TITLE_COUNT = 5  # script_writer needs this many titles to offer a choice
+
+def valid_titles(content):
+    """A title list is only worth caching if it has at least TITLE_COUNT non-empty lines."""
+    return len([line for line in content.split("\n") if line.strip()]) >= TITLE_COUNT
+
+def valid_script(content):
+    """Rejects replies that are empty once cleaned for voice, or that are error text rather than a script."""
+    script = clean_script_for_voice(content.strip())
+    return bool(script) and not script.lower().startswith("error")
+
+def generate_titles(topic, use_cache=True):
     """Generate 5 specific video titles for the given topic using Groq API."""
     prompt_message = [
         {"role": "system", "content": "You are an expert YouTube content strategist."},
         {"role": "user", "content": f"Generate exactly 5 unique, trending, and engaging YouTube video titles about {topic}. Return each title as a separate line."}
     ]
 
-    response = requests.post(
-        "https://api.groq.com/openai/v1/chat/completions",
-        headers={"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"},
-        json={"model": GROQ_MODEL, "messages": prompt_message, "max_tokens": 200}
-    )
+    status_code, content = chat_completion(prompt_message, use_cache=use_cache, validate=valid_titles, max_tokens=200)
 
-    if response.status_code == 200:
-        return response.json().get("choices", [{}])[0].get("message", {}).get("content", "").strip().split("\n")
+    if status_code == 200:
+        return content.strip().split("\n")
 
     return ["Error fetching titles from Groq API"]
 
-def generate_script(title):
-    """Generate a fully dynamic video script for the selected title using Groq API."""
-    prompt_message = [
+def script_prompt(title):
+    return [
         {"role": "user", "content": f"""Write a complete and engaging 30-second YouTube script for the title: '{title}'.
 Make sure it covers all key details in a short and impactful way, like a viral YouTube Short.
 Use concise sentences, avoid unnecessary repetition, and provide a clear summary of the topic in 70-80 words."""}
     ]
 
-    response = requests.post(
-        "https://api.groq.com/openai/v1/chat/completions",
-        headers={"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"},
-        json={"model": GROQ_MODEL, "messages": prompt_message, "max_tokens": 300}
-    )
+def generate_script(title, use_cache=True):
+    """Generate a fully dynamic video script for the selected title using Groq API."""
+    prompt_message = script_prompt(title)
+
+    status_code, content = chat_completion(prompt_message, use_cache=use_cache, validate=valid_script, max_tokens=300)
 
-    if response.status_code == 200:
-        raw_script = response.json().get("choices", [{}])[0].get("message", {}).get("content", "").strip()
+    if status_code == 200:
+        raw_script = content.strip()
         return clean_script_for_voice(raw_script)  # ✅ Ensures only spoken words are returned
 
     return "Error generating script from Groq API"
+
+def stream_chat_completion(messages, model=GROQ_MODEL, **params):
+    """Yields content deltas of a streamed Groq completion as the server-sent events arrive."""
+    response = http_client.post(
+        GROQ_API_URL,
+        api_key=GROQ_API_KEY,
+        headers={"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"},
+        json={"model": model, "messages": messages, "stream": True, **params},
+        stream=True
+    )
+    if response.status_code != 200:
+        print(f"❌ Groq streaming error: {response.status_code}, {response.text}")
+        return
+
+    with response:
+        for line in response.iter_lines(chunk_size=None, decode_unicode=True):  # Yield each event as it arrives
+            if not line or not line.startswith("data:"):
+                continue  # Blank separators and SSE comments / keep-alives
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            delta = json.loads(data).get("choices", [{}])[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+def split_complete_sentences(buffer):
+    """Splits off finished sentences; returns (sentences, remainder). Never splits inside [scene directions]."""
+    sentences = []
+    start = 0
+    depth = 0
+    for i, char in enumerate(buffer):
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth = max(0, depth - 1)
+        elif char in ".!?" and depth == 0 and i + 1 < len(buffer) and buffer[i + 1].isspace():
+            sentences.append(buffer[start:i + 1])
+            start = i + 1
+    return sentences, buffer[start:]
+
+def stream_script_sentences(title, max_words=75, use_cache=True):
+    """
+    Streams the script for a title and yields cleaned, voice-ready sentences as soon as each one is complete,
+    so TTS can start while the model is still generating. The ~75-word limit applies across the whole stream.
+    A cached script for the same prompt is replayed without a network call; a fresh stream is cached once finished.
+    """
+    prompt_message = script_prompt(title)
+    key = cache_key(GROQ_MODEL, prompt_message, {"max_tokens": 300})
+    cached = llm_cache.get(key) if use_cache else None
+    deltas = [cached] if cached is not None else stream_chat_completion(prompt_message, max_tokens=300)
+
+    raw_script = ""
+    buffer = ""
+    words_used = 0
+    finished = False
+    for delta in deltas:
+        raw_script += delta
+        if finished:
+            continue  # Keep reading so the full completion can be cached
+        sentences, buffer = split_complete_sentences(buffer + delta)
+        for sentence in sentences:
+            sentence, words_used, finished = _budget_sentence(sentence, words_used, max_words)
+            if sentence:
+                yield sentence
+            if finished:
+                break
+
+    if not finished and buffer.strip():
+        sentence, _, _ = _budget_sentence(buffer, words_used, max_words)
+        if sentence:
+            yield sentence
+
+    if cached is None and raw_script:
+        llm_cache.set(key, raw_script)
+
+def _budget_sentence(sentence, words_used, max_words):
+    """Cleans one sentence and applies the word budget; returns (sentence, words_used, finished)."""
+    finished = bool(re.search(r"Total word count", sentence, flags=re.IGNORECASE))
+    sentence = clean_script_for_voice(sentence)
+    words = sentence.split()
+    if words_used + len(words) > max_words:
+        words = words[:max_words - words_used]
+        return (" ".join(words) + "..." if words else ""), max_words, True
+    return sentence, words_used + len(words), finished
+
+# Fields (and types) the combined script + SEO response must contain
+SCRIPT_SEO_SCHEMA = {"script": str, "title": str, "description": str, "tags": list, "hashtags": list}
+
+def parse_script_seo(content):
+    """Parses and validates a combined script + SEO JSON response; returns the dict or None."""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    for field, field_type in SCRIPT_SEO_SCHEMA.items():
+        value = data.get(field)
+        if not isinstance(value, field_type) or not value:
+            return None
+        if field_type is list and not all(isinstance(item, str) for item in value):
+            return None
+    return data
+
+def generate_script_and_seo(title, use_cache=True):
+    """
+    Generates the voice script and SEO metadata for a title in one JSON-structured Groq call.
+    Returns {"script", "title", "description", "tags", "hashtags"} or None if the response fails validation.
+    """
+    prompt_message = [
+        {"role": "system", "content": "You are an expert YouTube content strategist. Reply with a single JSON object only."},
+        {"role": "user", "content": f"""For the YouTube video titled '{title}', return a JSON object with exactly these keys:
+"script": a complete and engaging 30-second script, like a viral YouTube Short, 70-80 words of spoken narration only (no scene directions),
+"title": a more SEO-friendly version of this exact title (without changing its meaning),
+"description": a compelling video description (150-200 words, engaging and informative),
+"tags": a list of 10 SEO-rich tags,
+"hashtags": a list of 5 relevant hashtags, each starting with #."""}
+    ]
+
+    status_code, content = chat_completion(
+        prompt_message, use_cache=use_cache, validate=parse_script_seo,
+        max_tokens=900, temperature=0.7, response_format={"type": "json_object"}
+    )
+    if status_code != 200:
+        print(f"❌ Combined generation error: {status_code}")
+        return None
+
+    data = parse_script_seo(content)
+    if not data:
+        print("⚠️ Combined generation returned invalid JSON, falling back to separate calls.")
+        return None
+
+    data["script"] = clean_script_for_voice(data["script"])
+    return data
@@ -0,0 +1,141 @@
+import os
+import re
+import time
+import hashlib
+import threading
+from urllib.parse import urlparse
+from configs.settings import MEDIA_CACHE_DIR, MEDIA_CACHE_MAX_BYTES, MEDIA_CACHE_MIN_AGE
+from models.media_downloader import download_file
+from models.file_utils import atomic_output
+
+# e.g. https://videos.pexels.com/video-files/857195/857195-hd_1280_720_25fps.mp4
+PEXELS_FILE_PATTERN = re.compile(r"/(\d+)/([^/]+)\.\w+$")
+
+
+def pexels_key_from_url(url):
+    """Returns (video_id, rendition) parsed from a Pexels file link, falling back to a URL hash."""
+    path = urlparse(url).path
+    match = PEXELS_FILE_PATTERN.search(path)
+    if match:
+        return match.group(1), match.group(2)
+    return hashlib.sha1(url.encode("utf-8")).hexdigest(), "source"
+
+
+class MediaCache:
+    """
+    Persistent on-disk cache for stock clips keyed by (video id, rendition).
+    Files are written atomically (see atomic_output) so several jobs can share one cache directory,
+    and the least recently used files are evicted once the total size exceeds max_bytes.
+    Files used within the last min_age seconds are never evicted, since a job may still be reading them.
+    """
+
+    def __init__(self, cache_dir=MEDIA_CACHE_DIR, max_bytes=MEDIA_CACHE_MAX_BYTES, min_age=MEDIA_CACHE_MIN_AGE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+        self.hits = 0
+        self.misses = 0
+        self._size = None  # Running total of cached bytes; counted from disk on first use and at each eviction
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+
+    def path_for(self, video_id, rendition):
+        key = hashlib.sha1(f"{video_id}:{rendition}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.mp4")
+
+    def get(self, video_id, rendition):
+        """Returns the cached file path (marking it as recently used) or None."""
+        path = self.path_for(video_id, rendition)
+        try:
+            os.utime(path)  # Bump mtime, which is the LRU clock
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def fetch(self, video_id, rendition, url):
+        """Returns a local path for the clip, downloading it into the cache on a miss."""
+        cached = self.get(video_id, rendition)
+        if cached:
+            return cached
+
+        final_path = self.path_for(video_id, rendition)
+        try:
+            with atomic_output(final_path) as temp_path:
+                if not download_file(url, temp_path):
+                    raise OSError(f"download of {url} failed")
+        except OSError:
+            return None
+        self.add(final_path)
+        return final_path
+
+    def fetch_url(self, url):
+        """Same as fetch() for a bare Pexels link."""
+        video_id, rendition = pexels_key_from_url(url)
+        return self.fetch(video_id, rendition, url)
+
+    def add(self, path):
+        """
+        Counts a file just written into the cache and, only if that takes the cache over max_bytes,
+        evicts older clips (never this one).
+        """
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())  # Already includes the new file
+            else:
+                self._size += os.path.getsize(path)
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict(keep=path)
+
+    def _entries(self):
+        """(mtime, size, path) of every cached clip."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".mp4"):
+                    continue  # Skip in-flight .tmp/.part files from other jobs
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self, keep=None):
+        """
+        Removes least recently used clips until the cache fits in max_bytes, skipping `keep` and
+        anything used within the last min_age seconds (the cache may stay over budget until they age).
+        """
+        with self._evict_lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            cutoff = time.time() - self.min_age
+            for mtime, size, path in entries:
+                if total <= self.max_bytes or mtime > cutoff:
+                    break  # Sorted by mtime, so everything after this was used even more recently
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass  # Another job evicted it first
+            with self._lock:
+                self._size = total  # Resynced from disk, which also picks up other processes' writes
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+media_cache = MediaCache()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from models.http_client import get_session
+from configs.settings import DOWNLOAD_WORKERS, DOWNLOAD_RETRIES, DOWNLOAD_CONNECT_TIMEOUT, DOWNLOAD_READ_TIMEOUT
+
+CHUNK_SIZE = 1024 * 1024  # 1MB chunks
+
+def _expected_length(response, offset):
+    """Works out the full file size from Content-Range / Content-Length, or None if unknown."""
+    content_range = response.headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    content_length = response.headers.get("Content-Length")
+    if content_length and content_length.isdigit():
+        return int(content_length) + offset
+    return None
+
+
+def download_file(url, dest_path=None, retries=DOWNLOAD_RETRIES):
+    """
+    Downloads a URL to dest_path (a new temp .mp4 if not given) and returns the path, or None on failure.
+    Interrupted transfers are resumed with Range requests and the final size is checked against the server's length.
+    """
+    if dest_path is None:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp_file:
+            dest_path = temp_file.name
+
+    part_path = dest_path + ".part"
+    session = get_session(url)  # Shared keep-alive pool for the CDN host
+
+    for attempt in range(retries + 1):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with session.get(url, stream=True, headers=headers,
+                             timeout=(DOWNLOAD_CONNECT_TIMEOUT, DOWNLOAD_READ_TIMEOUT)) as response:
+                if response.status_code == 416:  # Stale partial file, start again
+                    os.remove(part_path)
+                    continue
+                response.raise_for_status()
+
+                if offset and response.status_code != 206:  # Server ignored the Range header
+                    offset = 0
+                expected = _expected_length(response, offset)
+
+                with open(part_path, "ab" if offset else "wb") as part_file:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        part_file.write(chunk)
+
+            size = os.path.getsize(part_path)
+            if expected is not None and size != expected:
+                raise IOError(f"incomplete download ({size}/{expected} bytes)")
+
+            os.replace(part_path, dest_path)
+            return dest_path
+        except (requests.exceptions.RequestException, IOError) as e:
+            print(f"⚠️ Download failed for {url} (attempt {attempt + 1}/{retries + 1}): {e}")
+
+    print(f"❌ Failed to download video from {url}")
+    for path in (part_path, dest_path):
+        if os.path.exists(path):
+            os.remove(path)
+    return None
+
+
+def download_all(urls, max_workers=DOWNLOAD_WORKERS, fetch=download_file):
+    """
+    Starts downloading every URL at once on a bounded worker pool using fetch(url) -> path.
+    Returns futures in the same order as urls, so clip N can be opened as soon as its future is done.
+    """
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls) or 1)))
+    futures = [executor.submit(fetch, url) for url in urls]
+    executor.shutdown(wait=False)  # Workers finish the queued downloads in the background
+    return futures
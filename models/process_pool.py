@@ -0,0 +1,55 @@
+import atexit
+import threading
+from multiprocessing import get_context
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Worker processes are spawned, never forked: the pipeline, batch runner and server are multithreaded,
+# and a forked child inherits whatever locks those threads held at that instant, which can deadlock it.
+WORKER_CONTEXT = get_context("spawn")
+
+
+class WorkerPool:
+    """
+    A long-lived process pool shared by many threads. It starts on first use, is replaced when a
+    crashed worker breaks it, and is shut down when the interpreter exits.
+    """
+
+    def __init__(self, max_workers, initializer=None, initargs=()):
+        self.max_workers = max(1, max_workers)
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pool = None
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=WORKER_CONTEXT,
+                                                 initializer=self.initializer, initargs=self.initargs)
+            return self._pool
+
+    def submit(self, fn, *args, **kwargs):
+        return self._executor().submit(fn, *args, **kwargs)
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Runs fn in a worker and returns its result. If the pool is broken, BrokenProcessPool is raised
+        and the pool is discarded, so the next call starts a fresh one.
+        """
+        pool = self._executor()
+        try:
+            return pool.submit(fn, *args, **kwargs).result()
+        except BrokenProcessPool:
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
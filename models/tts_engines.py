@@ -0,0 +1,151 @@
+import io
+import os
+import time
+import tempfile
+import threading
+import importlib
+from gtts import gTTS
+from models.process_pool import WorkerPool
+from configs.settings import TTS_WORKERS
+
+TTS_ENGINES = {}
+
+
+def register_engine(name):
+    """Class decorator adding a TTS backend to the registry under `name`."""
+    def decorator(cls):
+        cls.name = name
+        TTS_ENGINES[name] = cls
+        return cls
+    return decorator
+
+
+def create_engine(name, voice=None):
+    if name not in TTS_ENGINES:
+        raise ValueError(f"Unknown TTS engine '{name}'. Available: {', '.join(TTS_ENGINES)}")
+    return TTS_ENGINES[name](voice)
+
+
+@register_engine("gtts")
+class GTTSEngine:
+    """Google Translate TTS (network round-trip per call)."""
+    audio_format = "mp3"
+    local = False
+
+    def __init__(self, voice=None):
+        self.voice = voice or "en"
+
+    def synthesize(self, text):
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.voice).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+@register_engine("pyttsx3")
+class Pyttsx3Engine:
+    """Offline system voices (eSpeak on Linux, SAPI5 on Windows, NSSpeechSynthesizer on macOS)."""
+    audio_format = "wav"
+    local = True
+
+    def __init__(self, voice=None):
+        import pyttsx3
+        self.engine = pyttsx3.init()
+        self.voice = voice
+        if voice:
+            self.engine.setProperty("voice", voice)
+
+    def synthesize(self, text):
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+
+@register_engine("mms")
+class MMSEngine:
+    """Meta MMS VITS model via transformers, run on CPU. The model loads once per worker process."""
+    audio_format = "wav"
+    local = True
+
+    def __init__(self, voice=None):
+        import torch
+        from transformers import AutoTokenizer, VitsModel
+        self.torch = torch
+        self.voice = voice or "facebook/mms-tts-eng"
+        self.tokenizer = AutoTokenizer.from_pretrained(self.voice)
+        self.model = VitsModel.from_pretrained(self.voice).eval()
+
+    def synthesize(self, text):
+        from scipy.io import wavfile
+        inputs = self.tokenizer(text, return_tensors="pt")
+        with self.torch.no_grad():
+            waveform = self.model(**inputs).waveform[0].numpy()
+        buffer = io.BytesIO()
+        wavfile.write(buffer, self.model.config.sampling_rate, waveform)
+        return buffer.getvalue()
+
+
+# Warm worker pools: each worker process loads its engine once and keeps it for every later call
+_pools = {}
+_pools_lock = threading.Lock()
+_worker_engine = None
+
+
+def _init_worker(name, voice, module):
+    global _worker_engine
+    importlib.import_module(module)  # Workers are spawned: engines registered outside this module register again here
+    _worker_engine = create_engine(name, voice)
+
+
+def synthesize_in_worker(text):
+    return _worker_engine.synthesize(text)
+
+
+def get_engine_pool(name, voice=None, workers=TTS_WORKERS):
+    """Returns the long-lived worker pool for a local engine; its processes start on first use."""
+    with _pools_lock:
+        key = (name, voice, workers)
+        if key not in _pools:
+            _pools[key] = WorkerPool(workers, initializer=_init_worker,
+                                     initargs=(name, voice, TTS_ENGINES[name].__module__))
+        return _pools[key]
+
+
+def shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+def benchmark_engines(text="Artificial intelligence is changing how we create videos.", engines=None, runs=3):
+    """
+    Measures each engine's real-time factor (synthesis seconds / audio seconds; lower is faster)
+    on warm instances. Engines whose dependencies are missing are reported as unavailable.
+    """
+    from pydub import AudioSegment
+    results = {}
+    for name in engines or TTS_ENGINES:
+        try:
+            engine = create_engine(name)
+            audio = engine.synthesize(text)  # Warm-up, excluded from timing
+            started = time.perf_counter()
+            for _ in range(runs):
+                audio = engine.synthesize(text)
+            elapsed = (time.perf_counter() - started) / runs
+            seconds = len(AudioSegment.from_file(io.BytesIO(audio), format=engine.audio_format)) / 1000
+            results[name] = {"synthesis_s": elapsed, "audio_s": seconds, "rtf": elapsed / seconds if seconds else None}
+        except Exception as e:
+            results[name] = {"error": str(e)}
+        print(f"🎙️ {name}: {results[name]}")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_engines()
@@ -1,14 +1,94 @@
-from gtts import gTTS
 import os
+import re
+import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pydub import AudioSegment
+from moviepy.config import get_setting
+from configs.settings import TTS_CACHE_DIR, TTS_WORKERS, TTS_SENTENCE_CHUNKING, TTS_ENGINE
+from models.tts_engines import TTS_ENGINES, create_engine, get_engine_pool, synthesize_in_worker
+from models.file_utils import write_atomic
+
+# pydub shells out to ffmpeg; fall back to the binary moviepy already uses when it isn't on PATH
+if not shutil.which(AudioSegment.converter):
+    AudioSegment.converter = get_setting("FFMPEG_BINARY")
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_sentences(text):
+    """Splits a script into sentences on ., ! and ? followed by whitespace."""
+    return [sentence.strip() for sentence in SENTENCE_SPLIT.split(text.strip()) if sentence.strip()]
+
 
 class TTSModel:
-    def convert_text_to_speech(self, text):
+    def __init__(self, voice=None, cache_dir=TTS_CACHE_DIR, max_workers=TTS_WORKERS, engine=TTS_ENGINE):
+        if engine not in TTS_ENGINES:
+            raise ValueError(f"Unknown TTS engine '{engine}'. Available: {', '.join(TTS_ENGINES)}")
+        self.engine = engine
+        self.voice = voice
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.audio_format = TTS_ENGINES[engine].audio_format
+        # Network engines are cheap to build and run on threads; local ones live in a warm process pool
+        self.backend = None if TTS_ENGINES[engine].local else create_engine(engine, voice)
+        self.timings = []  # [(sentence, start, end)] of the last sentence-level synthesis, in seconds
+
+    def convert_text_to_speech(self, text, audio_file="output_audio.mp3"):
+        if TTS_SENTENCE_CHUNKING:
+            return self.convert_sentences_to_speech(split_sentences(text), audio_file)
+        try:
+            self.synthesize_sentence(text).export(audio_file, format="mp3")
+            print(f"✅ Speech saved as {audio_file}")
+            if os.name == "nt":
+                os.system(f"start {audio_file}")  # Opens the audio file automatically (Windows)
+            return audio_file
+        except Exception as e:
+            print(f"❌ Error in TTS conversion: {e}")
+
+    def _cache_path(self, text):
+        key = hashlib.sha256(f"{self.engine}:{self.voice}:{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{self.audio_format}")
+
+    def _synthesize_bytes(self, text):
+        if self.backend is not None:
+            return self.backend.synthesize(text)
+        return get_engine_pool(self.engine, self.voice, self.max_workers).run(synthesize_in_worker, text)
+
+    def synthesize_sentence(self, text):
+        """Synthesizes one sentence and returns it as an AudioSegment, reusing cached audio for identical text."""
+        cache_path = self._cache_path(text)
+        if not os.path.exists(cache_path):
+            write_atomic(cache_path, self._synthesize_bytes(text))
+        codec = "mp3" if self.audio_format == "mp3" else None  # WAV is read natively, without ffmpeg
+        return AudioSegment.from_file(cache_path, format=self.audio_format, codec=codec)
+
+    def convert_sentences_to_speech(self, sentences, audio_file="output_audio.mp3"):
+        """
+        Synthesizes sentences concurrently as they arrive (a list or a streaming LLM iterator),
+        then joins them in order into one audio file. Returns the file path or None;
+        the exact (sentence, start, end) of every sentence is left in self.timings.
+        """
+        self.timings = []
         try:
-            tts = gTTS(text=text, lang="en")
-            audio_file = "output_audio.mp3"
-            tts.save(audio_file)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                # Each sentence is submitted the moment the iterator yields it
+                futures = [(sentence, pool.submit(self.synthesize_sentence, sentence)) for sentence in sentences]
+                segments = [(sentence, future.result()) for sentence, future in futures]
+
+            if not segments:
+                print("❌ Error in TTS conversion: no sentences to synthesize")
+                return None
+
+            combined = AudioSegment.empty()
+            for sentence, segment in segments:
+                start = len(combined) / 1000
+                combined += segment
+                self.timings.append((sentence, start, len(combined) / 1000))
+
+            combined.export(audio_file, format="mp3")
             print(f"✅ Speech saved as {audio_file}")
-            os.system(f"start {audio_file}")  # Opens the audio file automatically (Windows)
             return audio_file
         except Exception as e:
             print(f"❌ Error in TTS conversion: {e}")
+            return None
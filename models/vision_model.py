@@ -1,19 +1,95 @@
+import threading
 import requests
-from configs.settings import PEXELS_API
+from cachetools import TTLCache
+from models import http_client
+from configs.settings import PEXELS_API, VIDEO_RESOLUTION
 
 PEXELS_URL = "https://api.pexels.com/videos/search"
+ASPECT_TOLERANCE = 0.05
 
-def search_videos_on_pexels(query, num_results=7):
+# Cache search responses per query for an hour
+search_cache = TTLCache(maxsize=256, ttl=3600)
+search_cache_lock = threading.Lock()  # TTLCache isn't thread-safe; stages, batch and server workers share it
+
+
+def search_pexels_videos(query, num_results=7):
     """
-    Searches for multiple videos on Pexels based on the selected topic.
+    Searches Pexels and returns structured results:
+    [{"id", "duration", "renditions": [{"width", "height", "fps", "quality", "link"}, ...]}, ...]
     """
+    cache_key = f"{query}-{num_results}"
+    with search_cache_lock:
+        cached = search_cache.get(cache_key)  # One lookup, so the entry can't expire between check and read
+    if cached is not None:
+        return cached
+
     headers = {"Authorization": PEXELS_API}
     params = {"query": query, "per_page": num_results}
-    response = requests.get(PEXELS_URL, headers=headers, params=params)
+    try:
+        response = http_client.get(PEXELS_URL, api_key=PEXELS_API, headers=headers, params=params)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Pexels API Error: {e}")
+        return []
     
-    if response.status_code == 200:
-        videos = response.json().get("videos", [])
-        return [video["video_files"][0]["link"] for video in videos if video.get("video_files")]
-    else:
+    if response.status_code != 200:
         print(f"❌ Pexels API Error: {response.status_code}")
         return []
+
+    results = []
+    for video in response.json().get("videos", []):
+        renditions = [
+            {
+                "width": f.get("width") or 0,
+                "height": f.get("height") or 0,
+                "fps": f.get("fps"),
+                "quality": f.get("quality"),
+                "link": f["link"],
+            }
+            for f in video.get("video_files", []) if f.get("link")
+        ]
+        if renditions:
+            results.append({"id": video.get("id"), "duration": video.get("duration"), "renditions": renditions})
+
+    with search_cache_lock:
+        search_cache[cache_key] = results
+    return results
+
+
+def select_rendition(renditions, target=VIDEO_RESOLUTION):
+    """
+    Picks the smallest rendition that still covers the target resolution, preferring the target aspect ratio.
+    Falls back to the largest available rendition when none is big enough.
+    """
+    target_w, target_h = target
+    target_aspect = target_w / target_h
+    sized = [r for r in renditions if r["width"] and r["height"]]
+    if not sized:
+        return renditions[0] if renditions else None
+
+    same_aspect = [r for r in sized if abs(r["width"] / r["height"] - target_aspect) <= ASPECT_TOLERANCE * target_aspect]
+    pool = same_aspect or sized
+
+    covering = [r for r in pool if r["width"] >= target_w and r["height"] >= target_h]
+    if covering:
+        return min(covering, key=lambda r: (r["width"] * r["height"], r["fps"] or 0))
+    return max(pool, key=lambda r: r["width"] * r["height"])
+
+
+def search_videos_on_pexels(query, num_results=7, target=VIDEO_RESOLUTION):
+    """
+    Searches for multiple videos on Pexels based on the selected topic.
+    Returns one selected rendition per video: [{"id", "link", "width", "height", "fps", "duration"}, ...]
+    """
+    clips = []
+    for video in search_pexels_videos(query, num_results):
+        rendition = select_rendition(video["renditions"], target)
+        if rendition:
+            clips.append({
+                "id": video["id"],
+                "link": rendition["link"],
+                "width": rendition["width"],
+                "height": rendition["height"],
+                "fps": rendition["fps"],
+                "duration": video["duration"],
+            })
+    return clips
@@ -0,0 +1,21 @@
+import io
+from pydub import AudioSegment
+from models.tts_engines import register_engine
+
+
+@register_engine("fake-local")
+class FakeLocalEngine:
+    """
+    A local engine producing 100 ms of WAV silence per word. It lives in its own importable module
+    (not a test file) so that spawned TTS workers can import it and find it registered.
+    """
+    audio_format = "wav"
+    local = True
+
+    def __init__(self, voice=None):
+        self.voice = voice
+
+    def synthesize(self, text):
+        buffer = io.BytesIO()
+        AudioSegment.silent(duration=100 * len(text.split())).export(buffer, format="wav")
+        return buffer.getvalue()
@@ -0,0 +1,151 @@
+import os
+import json
+import tempfile
+import tracemalloc
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from agents.performance_analytics import QuotaTracker, QuotaExceeded
+from agents.audience_engagement import (CommentCursors, CommentClusterer, iter_new_comments, draft_replies,
+                                        engage_video, PAGE_SIZE)
+
+START = datetime(2025, 1, 1)
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class FakeYouTube:
+    """Pages through commentThreads().list newest first; comments are built on demand from `make`."""
+
+    def __init__(self, total, make=lambda i: f"comment number {i}"):
+        self.total = total
+        self.make = make
+        self.calls = 0
+
+    def commentThreads(self):
+        return self
+
+    def list(self, videoId, order, maxResults, pageToken=None, **kwargs):
+        self.calls += 1
+        start = int(pageToken or 0)
+        end = min(start + maxResults, self.total)
+        items = []
+        for position in range(start, end):
+            index = self.total - 1 - position  # Newest (highest index) first
+            items.append({"id": f"c{index}", "snippet": {"totalReplyCount": 0, "topLevelComment": {"snippet": {
+                "authorDisplayName": "viewer", "textDisplay": self.make(index), "likeCount": index % 7,
+                "publishedAt": (START + timedelta(seconds=index)).strftime("%Y-%m-%dT%H:%M:%SZ")}}}})
+        return FakeRequest({"items": items, **({"nextPageToken": str(end)} if end < self.total else {})})
+
+
+class TestCommentSync(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.cursors = CommentCursors(os.path.join(self.workdir, "cursors.json"))
+
+    def sync(self, youtube, quota=None):
+        return list(iter_new_comments(youtube, "vid", self.cursors, quota))
+
+    def test_pages_and_fetches_only_new_comments(self):
+        youtube = FakeYouTube(250)
+        comments = self.sync(youtube)
+        self.assertEqual((len(comments), youtube.calls), (250, 3))
+        self.assertEqual(comments[0]["id"], "c249")
+
+        youtube.calls = 0
+        self.assertEqual((self.sync(youtube), youtube.calls), ([], 1))
+
+        youtube.total, youtube.calls = 255, 0
+        self.assertEqual([comment["id"] for comment in self.sync(youtube)], ["c254", "c253", "c252", "c251", "c250"])
+        self.assertEqual(youtube.calls, 1)
+        reloaded = CommentCursors(self.cursors.path).get("vid")
+        self.assertEqual(reloaded["ids"], ["c254"])
+
+    def test_cursor_moves_only_after_a_complete_sync(self):
+        youtube = FakeYouTube(250)
+        for _ in iter_new_comments(youtube, "vid", self.cursors):
+            break  # Caller stops early
+        self.assertIsNone(self.cursors.get("vid"))
+
+        quota = QuotaTracker(daily_units=2, path=None)
+        with self.assertRaises(QuotaExceeded):
+            self.sync(youtube, quota)
+        self.assertIsNone(self.cursors.get("vid"))
+        self.assertEqual(len(self.sync(youtube)), 250)
+
+
+class TestCommentClusterer(unittest.TestCase):
+    def comment(self, text, likes=0):
+        self.count = getattr(self, "count", 0) + 1
+        return {"id": f"c{self.count}", "text": text, "likes": likes}
+
+    def test_duplicates_and_similar_comments_share_a_cluster(self):
+        clusterer = CommentClusterer(similarity=0.6)
+        for text, likes in [("Great video!!!", 1), ("great video", 5), ("GREAT video https://spam.example", 0),
+                            ("This explanation of black holes was amazing", 2),
+                            ("this explanation of black holes was really amazing!", 0),
+                            ("When is the next part coming out?", 0)]:
+            clusterer.add(self.comment(text, likes))
+        self.assertEqual(clusterer.duplicates, 2)
+        top = clusterer.top(10)
+        self.assertEqual([cluster["count"] for cluster in top], [3, 2, 1])
+        self.assertEqual((top[0]["text"], top[0]["reply_to"], top[0]["likes"]), ("great video", "c2", 6))
+
+    def test_memory_stays_flat_on_huge_comment_streams(self):
+        topics = ["space", "physics", "music", "cooking", "travel", "history", "coding", "football"]
+        # Half repeat a few phrasings, half are unique and keep opening new clusters
+        youtube = FakeYouTube(20000, make=lambda i: f"I love {topics[i % 8]} videos!" if i % 2 else
+                              f"random words {i} {i * 7} {i * 13} {i * 31}")
+        cursors = CommentCursors(os.path.join(tempfile.mkdtemp(), "cursors.json"))
+        clusterer = CommentClusterer(max_clusters=200)
+
+        tracemalloc.start()
+        for comment in iter_new_comments(youtube, "vid", cursors):
+            clusterer.add(comment)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertEqual(clusterer.seen, 20000)
+        self.assertLessEqual(len(clusterer.clusters), 200)
+        self.assertEqual(clusterer.top(1)[0]["count"], 10000)  # The repeated phrasings survive pruning as one cluster
+        self.assertLess(peak, 8 * 1024 * 1024)
+
+
+class TestReplyDrafting(unittest.TestCase):
+    def fake_completion(self, messages, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        count = messages[-1]["content"].count("similar)")
+        replies = [{"id": number, "reply": "" if number == 1 else f"Thanks {number}!"} for number in range(1, count + 1)]
+        return 200, json.dumps({"replies": replies})
+
+    def setUp(self):
+        self.prompts = []
+        self.clusters = [{"id": i, "text": f"comment {i}", "reply_to": f"c{i}", "count": 1, "likes": 0}
+                         for i in range(45)]
+
+    def test_many_comments_per_llm_call(self):
+        with patch("agents.audience_engagement.chat_completion", side_effect=self.fake_completion):
+            drafts = draft_replies(self.clusters, "Black holes", batch_size=20)
+        self.assertEqual(len(self.prompts), 3)
+        self.assertIn("'Black holes'", self.prompts[0])
+        self.assertEqual(len(drafts), 45 - 3)  # The first of each batch got an empty reply
+        self.assertEqual(drafts[0], {"reply_to": "c1", "comment": "comment 1", "similar": 1, "reply": "Thanks 2!"})
+
+    def test_failed_batch_is_skipped(self):
+        with patch("agents.audience_engagement.chat_completion", return_value=(503, "overloaded")):
+            self.assertEqual(draft_replies(self.clusters[:5]), [])
+
+    def test_engage_video(self):
+        cursors = CommentCursors(os.path.join(tempfile.mkdtemp(), "cursors.json"))
+        youtube = FakeYouTube(PAGE_SIZE * 3, make=lambda i: "first!" if i % 2 else f"question {i} about {i * 7}")
+        with patch("agents.audience_engagement.chat_completion", side_effect=self.fake_completion):
+            result = engage_video("vid", youtube, cursors, max_replies=10)
+        self.assertEqual((result["new_comments"], result["duplicates"]), (300, 149))
+        self.assertEqual(len(self.prompts), 1)
+        self.assertIn("1. (150 similar) first!", self.prompts[0])  # Replies go to the biggest clusters first
+        self.assertEqual(len(result["drafts"]), 9)
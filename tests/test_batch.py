@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import batch
+from backend.database import JobStore
+
+
+class FakePipeline:
+    def __init__(self, topic, region, options, workspace=None, fresh=False):
+        self.topic = topic
+
+    def run(self, on_event=None, cancel=None):
+        if on_event is not None:
+            for status in ("running", "done"):
+                on_event({"stage": "script", "status": status, "seconds": 0.1})
+        outputs = {"script": {"script": f"About {self.topic}."}, "upload": f"vid-{self.topic}"}
+        report = {"ok": True, "elapsed": 0.1, "stages": {"script": {"status": "done"}},
+                  "critical_path": [{"stage": "script", "seconds": 0.1}], "reused": [],
+                  "cancelled": False}
+        return outputs, report
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.store = JobStore(os.path.join(self.workdir, "jobs.sqlite3"), flush_interval=0.01)
+        patcher = mock.patch.object(batch, "job_store", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_job_file(self, spec):
+        path = os.path.join(self.workdir, "jobs.json")
+        with open(path, "w") as f:
+            json.dump(spec, f)
+        return path
+
+    def test_defaults_apply_and_ids_are_assigned(self):
+        jobs = batch.load_jobs(self.write_job_file({
+            "defaults": {"region": "IN", "upload": False},
+            "jobs": [{"topic": "AI in Healthcare"}, {"trending": True, "region": "US"}],
+        }))
+        self.assertEqual([job["id"] for job in jobs], ["001-ai-in-healthcare", "002-trending-us"])
+        self.assertEqual(jobs[0]["region"], "IN")
+        self.assertFalse(jobs[1]["upload"])
+
+    def test_job_without_topic_is_rejected(self):
+        with self.assertRaises(ValueError):
+            batch.load_jobs(self.write_job_file({"jobs": [{"region": "US"}]}))
+
+    def test_selection_policies(self):
+        self.assertEqual(batch.pick("first", 5), 0)
+        self.assertEqual(batch.pick(3, 5), 3)
+        self.assertIn(batch.pick("random", 5), range(5))
+        with self.assertRaises(ValueError):
+            batch.pick(7, 5)
+
+    @mock.patch.object(batch, "build_video_job", FakePipeline)
+    def test_manifests_are_written_per_job(self):
+        jobs = batch.load_jobs(self.write_job_file({"jobs": [{"topic": "AI"}, {"topic": "Space"}]}))
+        manifests = batch.run_batch(jobs, workers=2, manifest_dir=self.workdir, workspace_root=self.workdir)
+        self.assertEqual([manifest["status"] for manifest in manifests], ["succeeded", "succeeded"])
+        with open(os.path.join(self.workdir, "002-space.json")) as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["outputs"], {"script": "About Space.", "video_id": "vid-Space"})
+        self.assertEqual(manifest["options"]["title_index"], 0)
+        self.assertIn("elapsed", manifest)
+        self.store.flush()
+        self.assertEqual(self.store.job("002-space")["status"], "succeeded")
+        self.assertEqual(self.store.query("SELECT job_id FROM uploads ORDER BY job_id"),
+                         [{"job_id": "001-ai"}, {"job_id": "002-space"}])
+
+    @mock.patch.object(batch, "get_trending_ideas", return_value={"trending_topics": []})
+    def test_failures_end_up_in_the_manifest(self, _):
+        manifest = batch.run_job({"id": "t", "region": "US", "trending": True}, manifest_dir=self.workdir,
+                                 workspace_root=self.workdir)
+        self.assertEqual(manifest["status"], "failed")
+        self.assertIn("No trending topics", manifest["error"])
+
+    @mock.patch.object(batch, "build_video_job", FakePipeline)
+    def test_each_run_of_a_job_is_recorded(self):
+        job = {"id": "001-ai", "region": "US", "topic": "AI"}
+        first = batch.run_job(job, manifest_dir=self.workdir, workspace_root=self.workdir)
+        second = batch.run_job(job, manifest_dir=self.workdir, workspace_root=self.workdir)
+        self.store.flush()
+        runs = self.store.job_runs("001-ai")
+        self.assertEqual([run["id"] for run in runs], [first["run_id"], second["run_id"]])
+        self.assertEqual(self.store.query("SELECT run_id, status FROM stages WHERE job_id = '001-ai' ORDER BY updated_at"),
+                         [{"run_id": first["run_id"], "status": "done"}, {"run_id": second["run_id"], "status": "done"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
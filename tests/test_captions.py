@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from agents import video_job
+from agents.video_upload import upload_video_with_thumbnail
+from agents.workspace import Workspace
+
+
+class FakeVideo:
+    duration = 4.0
+
+    def __init__(self, path, audio=True):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def fake_render(topic, audio_file, clips=None, output_video=None):
+    with open(output_video, "wb") as f:
+        f.write(b"video")
+    return output_video
+
+
+class TestSidecarCaptions(unittest.TestCase):
+    def render(self, captions_mode):
+        job = {"topic": "Black holes", "workspace": Workspace("job-1", tempfile.mkdtemp()),
+               "options": {**video_job.DEFAULT_OPTIONS, "captions_mode": captions_mode, "render_mode": "single"}}
+        inputs = {"script": {"script": "One. Two"}, "tts": {"audio": "voice.mp3", "timings": None},
+                  "footage": ["a.mp4"]}
+        return video_job.render_stage(job, inputs)
+
+    @mock.patch("agents.subtitle_generator.VideoFileClip", FakeVideo)
+    @mock.patch.object(video_job, "create_video_with_subtitles")
+    @mock.patch.object(video_job, "add_subtitles_to_video")
+    @mock.patch.object(video_job, "create_video", side_effect=fake_render)
+    def test_sidecar_mode_skips_burn_in_and_writes_the_srt(self, create_video, add_subtitles, burn_in):
+        result = self.render("sidecar")
+        create_video.assert_called_once()
+        add_subtitles.assert_not_called()
+        burn_in.assert_not_called()
+        self.assertEqual(result["captions"], os.path.splitext(result["video"])[0] + ".srt")
+        with open(result["captions"], encoding="utf-8") as f:
+            srt = f.read()
+        self.assertIn("00:00:00,000 --> 00:00:02,000\nOne", srt)
+        self.assertIn("00:00:02,000 --> 00:00:04,000\nTwo", srt)
+
+    @mock.patch.object(video_job, "create_video_with_subtitles")
+    def test_burn_mode_writes_no_sidecar(self, burn_in):
+        burn_in.side_effect = lambda topic, audio, script, output_path, timings, clips: fake_render(
+            topic, audio, output_video=output_path)
+        result = self.render("burn")
+        burn_in.assert_called_once()
+        self.assertIsNone(result["captions"])
+
+
+@mock.patch("agents.video_upload.MediaFileUpload")
+@mock.patch("agents.video_upload.authenticate_youtube")
+class TestCaptionUpload(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.video = os.path.join(self.dir, "video.mp4")
+        self.captions = os.path.join(self.dir, "video.srt")
+        for path in (self.video, self.captions):
+            open(path, "w").close()
+
+    def upload(self, **kwargs):
+        return upload_video_with_thumbnail(self.video, "Title", "Description", ["tag"], None, "22", "private",
+                                           **kwargs)
+
+    def test_captions_go_up_after_the_video(self, authenticate, media):
+        youtube = authenticate.return_value
+        youtube.videos().insert().execute.return_value = {"id": "vid123"}
+        self.assertEqual(self.upload(caption_path=self.captions, caption_language="de"), "vid123")
+
+        calls = [name for name, _, _ in youtube.mock_calls if name.endswith("insert().execute")]
+        self.assertEqual(calls, ["videos().insert().execute", "captions().insert().execute"])
+        insert = youtube.captions().insert
+        self.assertEqual(insert.call_args.kwargs["body"]["snippet"],
+                         {"videoId": "vid123", "language": "de", "name": "English", "isDraft": False})
+        self.assertEqual(media.call_args_list[-1], mock.call(self.captions, mimetype="application/octet-stream"))
+
+    def test_no_caption_path_means_no_caption_upload(self, authenticate, media):
+        youtube = authenticate.return_value
+        youtube.videos().insert().execute.return_value = {"id": "vid123"}
+        self.upload()
+        self.assertNotIn("captions", [name for name, _, _ in youtube.mock_calls])
+        self.upload(caption_path=os.path.join(self.dir, "missing.srt"))
+        self.assertNotIn("captions", [name for name, _, _ in youtube.mock_calls])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import tempfile
+import subprocess
+import unittest
+from unittest import mock
+from concurrent.futures.process import BrokenProcessPool
+from models.media_cache import MediaCache
+from agents import clip_normalizer, video_editor
+
+
+def fake_ffmpeg(cmd, check=True):
+    with open(cmd[-1], "wb") as f:  # The output path is the last argument
+        f.write(b"normalized")
+
+
+class TestClipNormalizer(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = MediaCache(os.path.join(self.dir, "normalized"), max_bytes=10 ** 6)
+        patcher = mock.patch.object(clip_normalizer, "normalized_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.clip = os.path.join(self.dir, "clip.mp4")
+        with open(self.clip, "wb") as f:
+            f.write(b"raw clip")
+
+    @mock.patch.object(clip_normalizer.subprocess, "run", side_effect=fake_ffmpeg)
+    def test_reused_clips_are_never_normalized_twice(self, run):
+        copy = shutil.copy(self.clip, os.path.join(self.dir, "same-clip-other-name.mp4"))
+        first = clip_normalizer.normalize_clip(self.clip)
+        self.assertEqual(clip_normalizer.normalize_clip(self.clip), first)
+        self.assertEqual(clip_normalizer.normalize_clip(copy), first)  # Keyed by content, not name
+        self.assertEqual(run.call_count, 1)
+        with open(first, "rb") as f:
+            self.assertEqual(f.read(), b"normalized")
+
+    @mock.patch.object(clip_normalizer.subprocess, "run", side_effect=subprocess.CalledProcessError(1, "ffmpeg"))
+    def test_failed_transcode_leaves_no_partial_file(self, _):
+        self.assertIsNone(clip_normalizer.normalize_clip(self.clip))
+        leftovers = [name for _, _, names in os.walk(self.cache.cache_dir) for name in names]
+        self.assertEqual(leftovers, [])
+
+    def test_crashed_worker_counts_as_a_failed_normalization(self):
+        with mock.patch.object(clip_normalizer.normalize_pool, "run", side_effect=BrokenProcessPool("died")):
+            self.assertIsNone(clip_normalizer.normalize_in_pool(self.clip))
+
+    @mock.patch.object(video_editor, "NORMALIZE_CLIPS", True)
+    def test_fetch_falls_back_to_the_raw_clip(self):
+        with mock.patch.object(video_editor, "stream_video", return_value=self.clip), \
+                mock.patch.object(video_editor, "normalize_in_pool", return_value=None):
+            self.assertEqual(video_editor.fetch_clip("https://example.com/clip.mp4"), self.clip)
+        with mock.patch.object(video_editor, "stream_video", return_value=self.clip), \
+                mock.patch.object(video_editor, "normalize_in_pool", return_value="normalized.mp4"):
+            self.assertEqual(video_editor.fetch_clip("https://example.com/clip.mp4"), "normalized.mp4")
+
+
+if __name__ == "__main__":
+    unittest.main()
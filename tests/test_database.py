@@ -0,0 +1,113 @@
+import os
+import time
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from backend.database import JobStore
+
+
+class TestJobStore(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.store = JobStore(os.path.join(self.workdir, "jobs.sqlite3"), flush_interval=0.05)
+
+    def record_job(self, job_id, topic, region, status, stages, run=1):
+        run_id = f"{job_id}-run{run}"
+        self.store.record_job(job_id, "running", topic=topic, region=region, started_at=time.time())
+        self.store.record_run(run_id, job_id, "running", started_at=time.time())
+        for stage, stage_status, seconds, provider in stages:
+            for transient in ("queued", "running"):
+                self.store.record_stage(job_id, run_id, {"stage": stage, "status": transient, "provider": provider})
+            self.store.record_stage(job_id, run_id, {"stage": stage, "status": stage_status, "seconds": seconds,
+                                                     "provider": provider})
+        self.store.record_job(job_id, status, finished_at=time.time(), elapsed=1.0)
+        self.store.record_run(run_id, job_id, status, finished_at=time.time(), elapsed=1.0)
+
+    def test_jobs_and_stage_history_queries(self):
+        self.record_job("a", "AI", "US", "succeeded", [("script", "done", 2.0, "groq"), ("render", "done", 30.0, None)])
+        self.record_job("b", "AI", "IN", "failed", [("script", "done", 4.0, "groq"), ("footage", "failed", 1.0, "pexels")])
+        self.record_job("c", "Space", "US", "succeeded", [("script", "reused", 0.0, "groq")])
+        self.assertTrue(self.store.flush())
+
+        job = self.store.job("b")
+        self.assertEqual((job["topic"], job["region"], job["status"]), ("AI", "IN", "failed"))  # Kept across upserts
+        self.assertEqual([row["topic"] for row in self.store.produced_topics(region="US")], ["Space", "AI"])
+        durations = {row["stage"]: row for row in self.store.stage_durations()}
+        self.assertEqual((durations["script"]["runs"], durations["script"]["avg_seconds"]), (2, 3.0))
+        self.assertEqual(self.store.failures_by_provider(), [{"provider": "pexels", "stage": "footage", "failures": 1}])
+
+    def test_resumed_runs_keep_earlier_failures_and_durations(self):
+        self.record_job("a", "AI", "US", "failed", [("script", "done", 2.0, "groq"), ("render", "done", 30.0, None),
+                                                    ("upload", "failed", 1.0, "youtube")])
+        self.record_job("a", "AI", "US", "succeeded", [("script", "reused", 0.0, "groq"),
+                                                       ("render", "reused", 0.0, None),
+                                                       ("upload", "done", 3.0, "youtube")], run=2)
+        self.store.flush()
+
+        self.assertEqual([(run["id"], run["status"]) for run in self.store.job_runs("a")],
+                         [("a-run1", "failed"), ("a-run2", "succeeded")])
+        self.assertEqual(self.store.job("a")["status"], "succeeded")
+        durations = {row["stage"]: (row["runs"], row["avg_seconds"]) for row in self.store.stage_durations()}
+        self.assertEqual(durations, {"script": (1, 2.0), "render": (1, 30.0), "upload": (1, 3.0)})
+        self.assertEqual(self.store.failures_by_provider(), [{"provider": "youtube", "stage": "upload", "failures": 1}])
+        self.assertEqual(self.store.query("SELECT COUNT(*) AS n FROM stages")[0]["n"], 6)  # No queued/running rows
+
+    def test_version_1_stage_table_is_set_aside(self):
+        path = os.path.join(self.workdir, "old.sqlite3")
+        conn = sqlite3.connect(path)
+        conn.executescript("CREATE TABLE stages (job_id TEXT, stage TEXT, status TEXT, PRIMARY KEY (job_id, stage));"
+                           "CREATE INDEX idx_stages_stage_status ON stages(stage, status);"
+                           "INSERT INTO stages VALUES ('a', 'script', 'done');")
+        conn.close()
+        store = JobStore(path)
+        self.assertEqual(store.query("SELECT * FROM stages_v1"), [{"job_id": "a", "stage": "script", "status": "done"}])
+        self.assertEqual(store.query("SELECT COUNT(*) AS n FROM stages")[0]["n"], 0)
+        plan = " ".join(row["detail"] for row in store.query(
+            "EXPLAIN QUERY PLAN SELECT * FROM stages WHERE stage = 's' AND status = 'done'"))
+        self.assertIn("idx_stages_stage_status", plan)
+
+    def test_artifacts_mark_shared_cache_assets(self):
+        workspace = os.path.join(self.workdir, "jobs", "a")
+        os.makedirs(workspace)
+        video, clip = os.path.join(workspace, "video.mp4"), os.path.join(self.workdir, "clip.mp4")
+        for path in (video, clip):
+            with open(path, "wb") as f:
+                f.write(b"x" * 10)
+        self.store.record_artifacts("a", {"footage": [clip], "render": {"video": video, "captions": None}}, workspace)
+        self.store.record_upload("vid123", "a", "Title", "public")
+        self.store.flush()
+
+        self.assertEqual(self.store.job_artifacts("a", shared_only=True), [
+            {"stage": "footage", "path": clip, "size": 10, "shared": 1}])
+        self.assertEqual(self.store.jobs_using(clip), [{"job_id": "a", "stage": "footage"}])
+        self.assertEqual(self.store.query("SELECT job_id FROM uploads WHERE video_id = 'vid123'"), [{"job_id": "a"}])
+
+    def test_artifact_evicted_while_recording_has_no_size(self):
+        clip = os.path.join(self.workdir, "clip.mp4")
+        open(clip, "wb").close()
+        with mock.patch("backend.database.os.path.getsize", side_effect=FileNotFoundError(clip)):
+            self.store.record_artifacts("a", {"footage": [clip]}, os.path.join(self.workdir, "jobs", "a"))
+        self.store.flush()
+        self.assertEqual(self.store.job_artifacts("a"), [{"stage": "footage", "path": clip, "size": None, "shared": 1}])
+
+    def test_queries_use_indexes(self):
+        self.store.flush()
+        for sql in ("SELECT * FROM jobs WHERE topic = 'AI'",
+                    "SELECT * FROM jobs WHERE region = 'US' AND created_at > 0",
+                    "SELECT * FROM jobs WHERE status = 'failed' AND created_at > 0",
+                    "SELECT * FROM stages WHERE provider = 'groq' AND status = 'failed'"):
+            plan = " ".join(row["detail"] for row in self.store.query("EXPLAIN QUERY PLAN " + sql))
+            self.assertIn("USING INDEX", plan, sql)
+
+    def test_recording_is_cheap_on_the_hot_path(self):
+        started = time.perf_counter()
+        for i in range(2000):
+            self.store.record_stage("a", "a-run1", {"stage": f"s{i}", "status": "done", "seconds": 0.1})
+        self.assertLess(time.perf_counter() - started, 0.5)  # Only enqueues; the writer commits in batches
+        self.store.flush()
+        self.assertEqual(self.store.query("SELECT COUNT(*) AS n FROM stages")[0]["n"], 2000)
+
+
+if __name__ == "__main__":
+    unittest.main()
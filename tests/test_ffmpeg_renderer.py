@@ -0,0 +1,25 @@
+import unittest
+from agents.timeline import plan_timeline
+from agents.ffmpeg_renderer import build_filtergraph
+
+
+class TestFfmpegRenderer(unittest.TestCase):
+    def test_timeline_loops_clips_to_cover_audio(self):
+        self.assertEqual(plan_timeline([3, 2], 9), [0, 1, 0, 1])
+
+    def test_repeated_clips_are_split_not_reopened(self):
+        graph = build_filtergraph([3, 2], [0, 1, 0, 1], captions=[], size=(1920, 1080))
+        self.assertIn("[0:v]trim=duration=3.000", graph)
+        self.assertIn("split=2[c0_0][c0_1]", graph)
+        self.assertIn("[c0_0][c1_0][c0_1][c1_1]concat=n=4:v=1:a=0[base]", graph)
+        self.assertTrue(graph.endswith("[base]null[vout]"))
+
+    def test_captions_overlay_in_their_time_window(self):
+        graph = build_filtergraph([3], [0], captions=[(0, 1.5), (1.5, 3)], first_caption_input=2)
+        self.assertIn("[base][2:v]overlay=x=(W-w)/2:y=H-h:enable='between(t,0.000,1.500)'[ov0]", graph)
+        self.assertIn("[ov0][3:v]overlay", graph)
+        self.assertTrue(graph.endswith("[ov1]null[vout]"))
+
+
+if __name__ == "__main__":
+    unittest.main()
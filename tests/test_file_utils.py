@@ -0,0 +1,37 @@
+import os
+import stat
+import tempfile
+import unittest
+from models.file_utils import atomic_output, write_atomic
+
+
+class TestAtomicOutput(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.umask = os.umask(0o022)
+        self.addCleanup(os.umask, self.umask)
+
+    def test_written_file_gets_normal_permissions(self):
+        path = write_atomic(os.path.join(self.dir, "ab", "thumb.jpg"), b"jpeg")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"jpeg")
+
+    def test_file_appears_only_when_complete(self):
+        path = os.path.join(self.dir, "clip.mp4")
+        with atomic_output(path) as temp_path:
+            with open(temp_path, "w") as f:
+                f.write("partial")
+            self.assertFalse(os.path.exists(path))
+        self.assertEqual(os.listdir(self.dir), ["clip.mp4"])
+
+    def test_failed_write_leaves_nothing_behind(self):
+        path = os.path.join(self.dir, "clip.mp4")
+        with self.assertRaises(OSError):
+            with atomic_output(path):
+                raise OSError("encode failed")
+        self.assertEqual(os.listdir(self.dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import time
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from models import http_client
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answers 429 (Retry-After: 0) to the first request and 200 afterwards."""
+    calls = 0
+
+    def do_GET(self):
+        FlakyHandler.calls += 1
+        if FlakyHandler.calls == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FlakyHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/flaky"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def test_retries_after_429(self):
+        response = http_client.get(self.url, max_retries=2)
+        self.assertEqual(response.status_code, 200)
+        endpoint = f"GET 127.0.0.1:{self.server.server_address[1]}/flaky"
+        self.assertEqual(http_client.stats()[endpoint]["retries"], 1)
+        self.assertIs(http_client.get_session(self.url), http_client.get_session(self.url + "?again"))
+
+    def test_token_bucket_spaces_requests(self):
+        bucket = http_client.TokenBucket(rate=20, capacity=1)
+        started = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+
+if __name__ == "__main__":
+    unittest.main()
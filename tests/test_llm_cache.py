@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from models.llm_cache import LLMCache, cache_key
+from models import llm_model
+from agents import seo_optimizer
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, content="One\nTwo\nThree\nFour\nFive"):
+        self.content = content
+
+    def json(self):
+        return {"choices": [{"message": {"content": self.content}}]}
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "llm.sqlite3")
+
+    def test_expired_entries_are_misses(self):
+        cache = LLMCache(self.path, ttl=-1, max_entries=10)
+        cache.set("k", "v")
+        self.assertIsNone(cache.get("k"))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = LLMCache(self.path, ttl=3600, max_entries=2)
+        for key in ("a", "b", "c"):
+            cache.set(key, key.upper())
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("c"), "C")
+
+    def test_key_depends_on_params(self):
+        messages = [{"role": "user", "content": "hi"}]
+        self.assertNotEqual(cache_key("m", messages, {"max_tokens": 1}), cache_key("m", messages, {"max_tokens": 2}))
+
+    @mock.patch("models.llm_model.http_client.post", return_value=FakeResponse())
+    def test_identical_prompt_is_not_sent_twice(self, post):
+        with mock.patch.object(llm_model, "llm_cache", LLMCache(self.path)):
+            first = llm_model.generate_titles("AI")
+            second = llm_model.generate_titles("AI")
+            llm_model.generate_titles("AI", use_cache=False)
+        self.assertEqual(first, second)
+        self.assertEqual(post.call_count, 2)
+
+    def test_unusable_answers_are_not_cached(self):
+        answers = {
+            llm_model.generate_titles: "Only one title\n\n\nand another",
+            llm_model.generate_script: "[Scene: a lab] {}",
+            seo_optimizer.optimize_seo: "Description: no title line here\nTags: a, b",
+        }
+        with mock.patch.object(llm_model, "llm_cache", LLMCache(self.path)):
+            for generate, content in answers.items():
+                with mock.patch("models.llm_model.http_client.post", return_value=FakeResponse(content)) as post:
+                    generate("AI")
+                    generate("AI")
+                self.assertEqual(post.call_count, 2, generate.__name__)
+
+            seo = "Optimized Title: AI explained\nDescription: All about AI\nTags: ai\nHashtags: #ai"
+            with mock.patch("models.llm_model.http_client.post", return_value=FakeResponse(seo)) as post:
+                self.assertEqual(seo_optimizer.optimize_seo("AI")["title"], "AI explained #ai")
+                seo_optimizer.optimize_seo("AI")
+            self.assertEqual(post.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
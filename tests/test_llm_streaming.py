@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from models import llm_model
+from models.llm_cache import LLMCache
+
+
+class FakeSSEHandler(BaseHTTPRequestHandler):
+    """Streams `chunks` as chunked OpenAI-style SSE events, pausing after the first sentence until `release` is set."""
+    protocol_version = "HTTP/1.1"
+    chunks = []
+    release = threading.Event()
+
+    def send_event(self, data):
+        payload = f"data: {data}\n\n".encode("utf-8")
+        self.wfile.write(f"{len(payload):x}\r\n".encode("ascii") + payload + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, chunk in enumerate(self.chunks):
+            self.send_event(json.dumps({"choices": [{"delta": {"content": chunk}}]}))
+            if i == 1:
+                self.release.wait(5)
+        self.send_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class TestStreamScriptSentences(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSSEHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/chat/completions"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        FakeSSEHandler.release.clear()
+        cache = LLMCache(os.path.join(tempfile.mkdtemp(), "llm.sqlite3"))
+        patches = [mock.patch.object(llm_model, "GROQ_API_URL", self.url), mock.patch.object(llm_model, "llm_cache", cache)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_first_sentence_arrives_before_stream_ends(self):
+        FakeSSEHandler.chunks = ["[Scene: a lab. Lights] Narrator: AI is ", "changing everything. ", "Here is how! ", "Stay tuned"]
+        sentences = llm_model.stream_script_sentences("AI")
+        self.assertEqual(next(sentences), "AI is changing everything.")  # Server is still holding the rest
+        FakeSSEHandler.release.set()
+        self.assertEqual(list(sentences), ["Here is how!", "Stay tuned"])
+
+    def test_word_limit_applies_across_stream(self):
+        FakeSSEHandler.release.set()
+        FakeSSEHandler.chunks = [" ".join(["word"] * 40) + ". ", " ".join(["more"] * 40) + ". ", "Never spoken."]
+        sentences = list(llm_model.stream_script_sentences("AI"))
+        self.assertEqual(len(sentences), 2)
+        self.assertEqual(sum(len(s.split()) for s in sentences), 75)
+        self.assertTrue(sentences[-1].endswith("..."))
+
+    def test_finished_stream_is_replayed_from_cache(self):
+        FakeSSEHandler.release.set()
+        FakeSSEHandler.chunks = ["One. ", "Two."]
+        first = list(llm_model.stream_script_sentences("Cached"))
+        with mock.patch.object(llm_model, "stream_chat_completion") as stream:
+            second = list(llm_model.stream_script_sentences("Cached"))
+        stream.assert_not_called()
+        self.assertEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+from models.media_cache import MediaCache, pexels_key_from_url
+
+PEXELS_LINK = "https://videos.pexels.com/video-files/{id}/{id}-hd_1280_720_25fps.mp4"
+
+
+def fake_download(url, dest_path):
+    with open(dest_path, "wb") as f:
+        f.write(b"x" * 100)
+    return dest_path
+
+
+class TestMediaCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = MediaCache(tempfile.mkdtemp(), max_bytes=250, min_age=0)
+
+    def test_key_from_pexels_link(self):
+        self.assertEqual(pexels_key_from_url(PEXELS_LINK.format(id=857195)), ("857195", "857195-hd_1280_720_25fps"))
+
+    @mock.patch("models.media_cache.download_file", side_effect=fake_download)
+    def test_second_fetch_is_a_hit(self, download):
+        first = self.cache.fetch_url(PEXELS_LINK.format(id=1))
+        second = self.cache.fetch_url(PEXELS_LINK.format(id=1))
+        self.assertEqual(first, second)
+        self.assertEqual(download.call_count, 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    @mock.patch("models.media_cache.download_file", side_effect=fake_download)
+    def test_evicts_least_recently_used(self, _):
+        paths = []
+        for video_id in range(3):
+            paths.append(self.cache.fetch_url(PEXELS_LINK.format(id=video_id)))
+            time.sleep(0.01)
+        self.assertFalse(os.path.exists(paths[0]), "Oldest clip should be evicted past the byte budget.")
+        self.assertTrue(os.path.exists(paths[1]) and os.path.exists(paths[2]))
+
+    @mock.patch("models.media_cache.download_file", side_effect=fake_download)
+    def test_new_clip_is_never_evicted(self, _):
+        cache = MediaCache(tempfile.mkdtemp(), max_bytes=50, min_age=0)
+        first = cache.fetch_url(PEXELS_LINK.format(id=1))
+        self.assertTrue(os.path.exists(first))
+        second = cache.fetch_url(PEXELS_LINK.format(id=2))
+        self.assertEqual((os.path.exists(first), os.path.exists(second)), (False, True))
+
+    @mock.patch("models.media_cache.download_file", side_effect=fake_download)
+    def test_recently_used_clips_survive_eviction(self, _):
+        cache = MediaCache(tempfile.mkdtemp(), max_bytes=250, min_age=300)
+        old = time.time() - 3600
+        paths = [cache.fetch_url(PEXELS_LINK.format(id=video_id)) for video_id in range(2)]
+        for path in paths:
+            os.utime(path, (old, old))
+        self.assertEqual(cache.get(*pexels_key_from_url(PEXELS_LINK.format(id=0))), paths[0])  # Handed to a job
+
+        newest = cache.fetch_url(PEXELS_LINK.format(id=2))
+        self.assertEqual([os.path.exists(path) for path in paths + [newest]], [True, False, True])
+
+        cache.fetch_url(PEXELS_LINK.format(id=3))  # Over budget, but every clip is in use
+        self.assertEqual(len(cache._entries()), 3)
+
+    @mock.patch("models.media_cache.download_file", side_effect=fake_download)
+    def test_cache_is_walked_only_when_over_budget(self, _):
+        cache = MediaCache(tempfile.mkdtemp(), max_bytes=250, min_age=0)
+        with mock.patch("models.media_cache.os.walk", wraps=os.walk) as walk:
+            cache.fetch_url(PEXELS_LINK.format(id=0))
+            cache.fetch_url(PEXELS_LINK.format(id=1))
+            self.assertEqual(walk.call_count, 1)  # Initial count only
+            cache.fetch_url(PEXELS_LINK.format(id=2))
+            self.assertEqual(walk.call_count, 2)
+        self.assertEqual(cache._size, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
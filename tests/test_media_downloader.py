@@ -0,0 +1,104 @@
+import os
+import re
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from models.media_downloader import download_file
+
+BODY = bytes(range(256)) * 40  # 10 KB
+
+
+class ClipHandler(BaseHTTPRequestHandler):
+    """
+    /clip honours Range (206, or 416 past the end), /ignores-range always answers 200 with the full body,
+    /short promises the full body but sends half, /wrong-total claims a larger file than it serves.
+    """
+    ranges = []
+
+    def send_body(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        ClipHandler.ranges.append(self.headers.get("Range"))
+        match = re.fullmatch(r"bytes=(\d+)-", self.headers.get("Range") or "")
+        start = int(match.group(1)) if match else 0
+        if self.path == "/clip" and match:
+            if start >= len(BODY):
+                self.send_body(416, b"", [("Content-Range", f"bytes */{len(BODY)}"), ("Content-Length", "0")])
+                return
+            self.send_body(206, BODY[start:], [("Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"),
+                                               ("Content-Length", str(len(BODY) - start))])
+        elif self.path in ("/clip", "/ignores-range"):
+            self.send_body(200, BODY, [("Content-Length", str(len(BODY)))])
+        elif self.path == "/short":
+            self.send_body(200, BODY[:len(BODY) // 2], [("Content-Length", str(len(BODY))), ("Connection", "close")])
+            self.close_connection = True
+        elif self.path == "/wrong-total":
+            self.send_body(206, BODY[start:], [("Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY) * 2}"),
+                                               ("Content-Length", str(len(BODY) - start))])
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloadFile(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ClipHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        ClipHandler.ranges = []
+        self.dest = os.path.join(tempfile.mkdtemp(), "clip.mp4")
+
+    def write_part(self, data):
+        with open(self.dest + ".part", "wb") as f:
+            f.write(data)
+
+    def read_dest(self):
+        with open(self.dest, "rb") as f:
+            return f.read()
+
+    def test_resumes_from_a_partial_file(self):
+        self.write_part(BODY[:3000])
+        self.assertEqual(download_file(f"{self.base}/clip", self.dest), self.dest)
+        self.assertEqual(ClipHandler.ranges, ["bytes=3000-"])
+        self.assertEqual(self.read_dest(), BODY)
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+
+    def test_stale_partial_restarts_after_416(self):
+        self.write_part(b"x" * (len(BODY) + 10))
+        self.assertEqual(download_file(f"{self.base}/clip", self.dest, retries=1), self.dest)
+        self.assertEqual(ClipHandler.ranges, [f"bytes={len(BODY) + 10}-", None])
+        self.assertEqual(self.read_dest(), BODY)
+
+    def test_server_ignoring_range_replaces_the_partial(self):
+        self.write_part(b"stale bytes")
+        self.assertEqual(download_file(f"{self.base}/ignores-range", self.dest), self.dest)
+        self.assertEqual(ClipHandler.ranges, ["bytes=11-"])
+        self.assertEqual(self.read_dest(), BODY)
+
+    def test_short_body_is_rejected(self):
+        self.assertIsNone(download_file(f"{self.base}/short", self.dest, retries=1))
+        self.assertEqual(len(ClipHandler.ranges), 2)
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), [])
+
+    def test_size_is_checked_against_content_range(self):
+        self.write_part(BODY[:100])
+        self.assertIsNone(download_file(f"{self.base}/wrong-total", self.dest, retries=0))
+        self.assertEqual(ClipHandler.ranges, ["bytes=100-"])
+        self.assertFalse(os.path.exists(self.dest) or os.path.exists(self.dest + ".part"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import os
+import time
+import tempfile
+import unittest
+import numpy as np
+from backend.database import JobStore
+from agents.performance_analytics import (PerformanceStore, QuotaTracker, QuotaExceeded, refresh_performance,
+                                          uploaded_videos, MAX_IDS_PER_REQUEST)
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+class FakeYouTube:
+    """Answers videos().list like the Data API, from an in-memory catalogue."""
+
+    def __init__(self, catalogue, fail_on_call=None):
+        self.catalogue = catalogue
+        self.fail_on_call = fail_on_call
+        self.calls = []
+
+    def videos(self):
+        return self
+
+    def list(self, part, id, **kwargs):
+        ids = id.split(",")
+        assert len(ids) <= MAX_IDS_PER_REQUEST
+        assert "maxResults" not in kwargs  # Not supported together with id
+        self.calls.append(ids)
+        if len(self.calls) == self.fail_on_call:
+            raise ConnectionResetError("connection reset by peer")
+        return FakeRequest({"items": [{"id": video_id, **self.catalogue[video_id]}
+                                      for video_id in ids if video_id in self.catalogue]})
+
+
+class FakeAnalytics:
+    def __init__(self, fail=False, omit=()):
+        self.fail = fail
+        self.omit = omit
+
+    def reports(self):
+        return self
+
+    def query(self, filters, **kwargs):
+        if self.fail:
+            raise ConnectionResetError("analytics unavailable")
+        ids = [video_id for video_id in filters.split("==", 1)[1].split(",") if video_id not in self.omit]
+        return FakeRequest({"columnHeaders": [{"name": "video"}, {"name": "averageViewDuration"},
+                                              {"name": "averageViewPercentage"}],
+                            "rows": [[video_id, 30.0, 50.0] for video_id in ids]})
+
+
+def item(views, likes=None, comments=0, hour=12):
+    statistics = {"viewCount": str(views), "commentCount": str(comments)}
+    if likes is not None:
+        statistics["likeCount"] = str(likes)
+    return {"snippet": {"publishedAt": f"2025-03-01T{hour:02d}:30:00Z"}, "statistics": statistics}
+
+
+class TestPerformanceAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.store = PerformanceStore(os.path.join(self.workdir, "performance.npz"))
+        self.quota = QuotaTracker(daily_units=100, path=os.path.join(self.workdir, "quota.json"))
+        self.videos = [{"video_id": f"vid{i:03d}", "topic": "AI" if i % 2 else "Space", "region": "US"}
+                       for i in range(120)]
+        self.youtube = FakeYouTube({f"vid{i:03d}": item(views=i * 10, likes=i, hour=i % 24) for i in range(120)})
+
+    def refresh(self, **kwargs):
+        return refresh_performance(self.youtube, self.videos, self.store, self.quota, **kwargs)
+
+    def test_ids_are_batched_fifty_per_request(self):
+        summary = self.refresh(now=1000.0)
+        self.assertEqual([len(ids) for ids in self.youtube.calls], [50, 50, 20])
+        self.assertEqual((summary["fetched"], summary["requests"], self.quota.used), (120, 3, 3))
+        row = self.store.get("vid007")
+        self.assertEqual((row["views"], row["likes"], row["upload_hour"], row["topic"]), (70.0, 7.0, 7, "AI"))
+
+    def test_refresh_only_fetches_stale_videos(self):
+        self.refresh(now=1000.0)
+        self.youtube.calls.clear()
+        self.videos.append({"video_id": "new", "topic": "AI", "region": "IN"})
+        self.youtube.catalogue["new"] = item(views=5)
+
+        summary = self.refresh(now=1000.0 + 60, max_age=3600)
+        self.assertEqual(self.youtube.calls, [["new"]])
+        self.assertEqual((summary["due"], summary["fresh"]), (1, 120))
+
+        self.youtube.calls.clear()
+        self.refresh(now=1000.0 + 7200, max_age=3600)
+        self.assertEqual(sum(len(ids) for ids in self.youtube.calls), 121)
+
+    def test_quota_stops_the_refresh_and_keeps_partial_results(self):
+        self.quota = QuotaTracker(daily_units=2, path=os.path.join(self.workdir, "small.json"))
+        summary = self.refresh(now=1000.0)
+        self.assertTrue(summary["quota_exhausted"])
+        self.assertEqual((len(self.youtube.calls), len(self.store)), (2, 100))
+        self.assertEqual(QuotaTracker(daily_units=2, path=os.path.join(self.workdir, "small.json")).remaining, 0)
+        with self.assertRaises(QuotaExceeded):
+            self.quota.spend(1)
+
+    def test_failed_request_stops_the_refresh_and_keeps_earlier_batches(self):
+        self.youtube.fail_on_call = 2
+        summary = self.refresh(now=1000.0)
+        self.assertEqual(summary["error"], "connection reset by peer")
+        self.assertEqual((len(self.youtube.calls), summary["fetched"]), (2, 50))
+        self.assertEqual(len(PerformanceStore(self.store.path)), 50)
+
+        self.youtube.fail_on_call = None
+        self.youtube.calls.clear()
+        self.assertIsNone(self.refresh(now=1000.0 + 60, max_age=3600)["error"])
+        self.assertEqual(sum(len(ids) for ids in self.youtube.calls), 70)
+
+    def test_missing_videos_and_hidden_likes(self):
+        del self.youtube.catalogue["vid001"]
+        self.youtube.catalogue["vid003"] = item(views=100, likes=None)
+        self.refresh(now=1000.0)
+        self.assertFalse(self.store.get("vid001")["available"])
+        self.assertTrue(np.isnan(self.store.get("vid003")["likes"]))
+        self.assertEqual(self.store.aggregate("topic", "views", "count"), {"AI": 59, "Space": 60})
+        self.assertEqual(self.store.aggregate("topic", "likes", "count"), {"AI": 58, "Space": 60})
+
+    def test_retention_is_kept_across_stats_only_refreshes(self):
+        self.refresh(now=1000.0, analytics=FakeAnalytics())
+        self.assertEqual(self.store.get("vid005")["avg_view_percentage"], 50.0)
+        self.refresh(now=1000.0 + 7200, max_age=3600)
+        self.assertEqual(self.store.get("vid005")["avg_view_percentage"], 50.0)
+
+    def test_failed_or_partial_retention_keeps_stored_numbers(self):
+        self.refresh(now=1000.0, analytics=FakeAnalytics())
+        self.youtube.catalogue["vid005"] = item(views=999)
+        self.refresh(now=1000.0 + 7200, max_age=3600, analytics=FakeAnalytics(fail=True))
+        row = self.store.get("vid005")
+        self.assertEqual((row["views"], row["avg_view_duration"], row["avg_view_percentage"]), (999.0, 30.0, 50.0))
+
+        self.videos.append({"video_id": "new", "topic": "AI", "region": "US"})
+        self.youtube.catalogue["new"] = item(views=5)
+        self.refresh(now=1000.0 + 14400, max_age=3600, analytics=FakeAnalytics(omit=("vid005", "new")))
+        self.assertEqual(self.store.get("vid005")["avg_view_duration"], 30.0)
+        self.assertTrue(np.isnan(self.store.get("new")["avg_view_duration"]))
+        self.assertEqual(self.store.get("new")["views"], 5.0)
+
+    def test_aggregates_and_persistence(self):
+        self.refresh(now=1000.0)
+        views_by_topic = self.store.aggregate("topic", "views", "sum")
+        self.assertEqual(views_by_topic, {"AI": sum(i * 10 for i in range(1, 120, 2)),
+                                          "Space": sum(i * 10 for i in range(0, 120, 2))})
+        by_hour = self.store.aggregate("upload_hour", "views", "count")
+        self.assertEqual(by_hour[0], 5)
+        self.assertAlmostEqual(self.store.aggregate("region", "engagement_rate")["US"], 0.1)
+
+        reloaded = PerformanceStore(self.store.path)
+        self.assertEqual(len(reloaded), 120)
+        self.assertEqual(reloaded.aggregate("topic", "views", "sum"), views_by_topic)
+
+    def test_uploads_come_from_the_job_store(self):
+        jobs = JobStore(os.path.join(self.workdir, "jobs.sqlite3"), flush_interval=0.05)
+        jobs.record_job("a", "succeeded", topic="AI", region="IN")
+        jobs.record_upload("vid010", "a", "Title", "public")
+        jobs.flush()
+        self.assertEqual(uploaded_videos(jobs), [{"video_id": "vid010", "topic": "AI", "region": "IN"}])
+
+        refresh_performance(self.youtube, uploaded_videos(jobs), self.store, self.quota)
+        self.assertEqual(self.store.aggregate("region", "views", "sum"), {"IN": 100.0})
+
+    def test_aggregates_over_many_videos_are_fast(self):
+        count = 20000
+        rng = np.random.default_rng(0)
+        self.store.upsert([{"video_id": f"v{i}", "topic": f"topic{i % 50}", "region": "US",
+                            "upload_hour": int(rng.integers(24)), "views": float(rng.integers(1000)),
+                            "likes": 1.0, "comments": 1.0, "fetched_at": 0.0} for i in range(count)])
+        started = time.perf_counter()
+        for by in ("topic", "region", "upload_hour"):
+            self.store.aggregate(by, "views")
+            self.store.aggregate(by, "engagement_rate")
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
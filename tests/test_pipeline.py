@@ -0,0 +1,140 @@
+import os
+import time
+import tempfile
+import unittest
+from agents.pipeline import Pipeline, Stage
+from agents.checkpoints import StageStore
+
+
+def sleeper(seconds, value=None):
+    def run(inputs):
+        time.sleep(seconds)
+        return value
+    return run
+
+
+def failing(inputs):
+    raise RuntimeError("boom")
+
+
+class TestPipeline(unittest.TestCase):
+    def test_independent_stages_overlap(self):
+        pipeline = Pipeline([
+            Stage("render", sleeper(0.3), kind="cpu"),
+            Stage("seo", sleeper(0.3)),
+            Stage("thumbnail", sleeper(0.3)),
+        ])
+        outputs, report = pipeline.run()
+        self.assertTrue(report["ok"])
+        self.assertLess(report["elapsed"], 0.6)
+
+    def test_dependencies_receive_outputs_in_order(self):
+        pipeline = Pipeline([
+            Stage("script", lambda inputs: "hello"),
+            Stage("tts", lambda inputs: inputs["script"].upper(), deps=["script"]),
+        ])
+        outputs, report = pipeline.run()
+        self.assertEqual(outputs["tts"], "HELLO")
+        self.assertLessEqual(report["stages"]["script"]["finished"], report["stages"]["tts"]["started"])
+
+    def test_failure_skips_dependents_but_not_past_optional_stages(self):
+        pipeline = Pipeline([
+            Stage("render", failing),
+            Stage("upload", sleeper(0), deps=["render"]),
+            Stage("remote_thumbnail", failing, optional=True),
+            Stage("thumbnail", sleeper(0, "thumb.jpg"), deps=["remote_thumbnail"]),
+        ])
+        outputs, report = pipeline.run()
+        self.assertFalse(report["ok"])
+        self.assertEqual(report["stages"]["render"]["status"], "failed")
+        self.assertEqual(report["stages"]["upload"]["status"], "skipped")
+        self.assertEqual(outputs["thumbnail"], "thumb.jpg")
+
+    def test_critical_path_follows_the_slowest_chain(self):
+        pipeline = Pipeline([
+            Stage("script", sleeper(0.05)),
+            Stage("tts", sleeper(0.05), deps=["script"]),
+            Stage("footage", sleeper(0.3)),
+            Stage("seo", sleeper(0.01)),
+            Stage("render", sleeper(0.05), deps=["tts", "footage"], kind="cpu"),
+            Stage("upload", sleeper(0.01), deps=["render", "seo"]),
+        ])
+        _, report = pipeline.run()
+        self.assertEqual([step["stage"] for step in report["critical_path"]], ["footage", "render", "upload"])
+
+    def test_cycles_and_unknown_dependencies_are_rejected(self):
+        with self.assertRaises(ValueError):
+            Pipeline([Stage("a", failing, deps=["b"]), Stage("b", failing, deps=["a"])])
+        with self.assertRaises(ValueError):
+            Pipeline([Stage("a", failing, deps=["missing"])])
+
+
+
+class TestCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.store_path = os.path.join(self.workdir, "stages.json")
+        self.calls = []
+
+    def stage(self, name, deps=(), params=None, make_file=False):
+        def run(inputs):
+            self.calls.append(name)
+            if make_file:
+                path = os.path.join(self.workdir, f"{name}.bin")
+                with open(path, "w") as f:
+                    f.write(name)
+                return path
+            return {"from": name, "inputs": sorted(inputs)}
+        return Stage(name, run, deps=deps, params=params)
+
+    def pipeline(self, upload_params=None, fresh=False):
+        return Pipeline([
+            self.stage("script", params={"topic": "AI"}),
+            self.stage("render", deps=["script"], make_file=True),
+            self.stage("upload", deps=["render"], params=upload_params),
+        ], store=StageStore(self.store_path, reset=fresh))
+
+    def test_rerun_reuses_every_unchanged_stage(self):
+        self.pipeline().run()
+        self.calls.clear()
+        outputs, report = self.pipeline().run()
+        self.assertEqual(self.calls, [])
+        self.assertEqual(report["reused"], ["script", "render", "upload"])
+        self.assertTrue(report["ok"])
+        self.assertTrue(outputs["render"].endswith("render.bin"))
+
+    def test_changed_params_rerun_only_that_stage(self):
+        self.pipeline().run()
+        self.calls.clear()
+        _, report = self.pipeline(upload_params={"privacy_status": "private"}).run()
+        self.assertEqual(self.calls, ["upload"])
+        self.assertEqual(report["reused"], ["script", "render"])
+
+    def test_missing_artifact_reruns_the_stage_and_everything_after_it(self):
+        self.pipeline().run()
+        os.remove(os.path.join(self.workdir, "render.bin"))
+        self.calls.clear()
+        self.pipeline().run()
+        self.assertEqual(self.calls, ["render", "upload"])
+
+    def test_failed_stage_resumes_on_the_next_run(self):
+        failing_upload = Pipeline([
+            self.stage("script", params={"topic": "AI"}),
+            self.stage("render", deps=["script"], make_file=True),
+            Stage("upload", failing, deps=["render"]),
+        ], store=StageStore(self.store_path))
+        self.assertFalse(failing_upload.run()[1]["ok"])
+        self.calls.clear()
+        _, report = self.pipeline().run()
+        self.assertEqual(self.calls, ["upload"])
+        self.assertTrue(report["ok"])
+
+    def test_fresh_ignores_checkpoints(self):
+        self.pipeline().run()
+        self.calls.clear()
+        self.pipeline(fresh=True).run()
+        self.assertEqual(self.calls, ["script", "render", "upload"])
+
+
+if __name__ == "__main__":
+    unittest.main()
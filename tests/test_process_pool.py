@@ -0,0 +1,23 @@
+import os
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from models.process_pool import WorkerPool, WORKER_CONTEXT
+
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(1)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_workers_are_spawned_not_forked(self):
+        self.assertEqual(WORKER_CONTEXT.get_start_method(), "spawn")
+        self.assertNotEqual(self.pool.run(os.getpid), os.getpid())
+
+    def test_broken_pool_is_replaced(self):
+        with self.assertRaises(BrokenProcessPool):
+            self.pool.run(os._exit, 1)  # The worker dies mid-task
+        self.assertIsInstance(self.pool.run(os.getpid), int)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
-from agents.script_writer import script_generator
+from unittest import mock
+from agents.script_writer import script_generator, script_and_seo_generator
+
+TITLES = ["Title 1", "Title 2", "Title 3", "Title 4", "Title 5"]
 
 class TestScriptGenerator(unittest.TestCase):
     def test_generate_titles(self):
@@ -12,5 +15,27 @@ class TestScriptGenerator(unittest.TestCase):
         results = script_generator("US", "AI", return_json=False, selected_index=1)
         self.assertTrue(len(results["script"]) > 10, "Script generation failed.")
 
+class TestScriptAndSeoGenerator(unittest.TestCase):
+    @mock.patch("agents.script_writer.generate_titles", return_value=TITLES)
+    @mock.patch("agents.script_writer.generate_script_and_seo", return_value={
+        "script": "A short script.", "title": "Better Title", "description": "About it.",
+        "tags": ["ai"], "hashtags": ["#ai"]})
+    def test_single_structured_call(self, combined, _):
+        result = script_and_seo_generator("US", "AI", selected_index=1)
+        combined.assert_called_once_with("Title 2")
+        self.assertEqual(result["script"], "A short script.")
+        self.assertEqual(result["seo"]["title"], "Better Title #ai")
+        self.assertEqual(result["seo"]["tags"], ["ai", "#ai"])
+
+    @mock.patch("agents.script_writer.generate_titles", return_value=TITLES)
+    @mock.patch("agents.script_writer.generate_script_and_seo", return_value=None)
+    @mock.patch("agents.script_writer.generate_script", return_value="Fallback script.")
+    @mock.patch("agents.script_writer.optimize_seo", return_value={"title": "SEO"})
+    def test_falls_back_to_separate_calls(self, optimize, script, *_):
+        result = script_and_seo_generator("US", "AI", selected_index=0)
+        script.assert_called_once_with("Title 1")
+        optimize.assert_called_once_with("Title 1")
+        self.assertEqual(result["seo"], {"title": "SEO"})
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch
+from agents.segmented_renderer import plan_segments, render_segmented, _segment_captions
+
+DURATIONS = {"a.mp4": 2.51, "b.mp4": 10.0, "voice.mp3": 7.0, "short.mp3": 2.8}
+
+
+class InlineExecutor:
+    """Runs submitted work in the calling process, so patched functions are the ones that run."""
+
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@patch("agents.segmented_renderer.probe_duration", side_effect=DURATIONS.get)
+class TestSegmentedRenderer(unittest.TestCase):
+    def test_segments_cover_the_audio_in_whole_frames(self, probe):
+        segments = plan_segments(["a.mp4", "b.mp4", "missing.mp4"], "voice.mp3", fps=24)
+        self.assertEqual([path for path, _, _ in segments], ["a.mp4", "b.mp4", "a.mp4"])
+        self.assertEqual([duration for _, duration, _ in segments], [60 / 24, 3, 60 / 24])
+        for _, duration, _ in segments:
+            self.assertEqual(duration * 24, round(duration * 24))
+
+    def test_captions_are_sliced_per_segment(self, probe):
+        captions = [("one", 0, 2), ("two", 2, 4.5), ("three", 4.5, 8)]
+        self.assertEqual(_segment_captions(captions, 2.5, 5.5), (("two", 0, 2.0), ("three", 2.0, 3.0)))
+        self.assertEqual(_segment_captions(captions, 8, 9), ())
+
+        timings = [("Hello there", 0.0, 1.0), ("General Kenobi", 3.0, 6.0)]
+        segments = plan_segments(["a.mp4", "b.mp4"], "voice.mp3", "unused", fps=24, timings=timings)
+        self.assertEqual([captions for _, _, captions in segments],
+                         [(("Hello there", 0.0, 1.0),), (("General Kenobi", 0.5, 3.0),),
+                          (("General Kenobi", 0.0, 0.5),)])
+
+    @patch("agents.segmented_renderer.subprocess.run")
+    @patch("agents.segmented_renderer._encode_segment", side_effect=lambda *args, **kwargs: args[5])
+    @patch("agents.segmented_renderer.ProcessPoolExecutor", side_effect=InlineExecutor)
+    def test_identical_segments_are_encoded_once(self, executor, encode, run, probe):
+        concat_lists = []
+        run.side_effect = lambda cmd, **kwargs: concat_lists.append(open(cmd[cmd.index("-i") + 1]).read())
+
+        self.assertEqual(render_segmented(["a.mp4", "b.mp4"], "voice.mp3", "out.mp4", workers=2), "out.mp4")
+        self.assertEqual([call.args[0] for call in encode.call_args_list], ["a.mp4", "b.mp4"])
+        self.assertEqual(executor.call_args.kwargs["mp_context"].get_start_method(), "spawn")
+        cmd = run.call_args.args[0]
+        self.assertIn("-shortest", cmd)
+        self.assertEqual(cmd[-1], "out.mp4")
+        files = [line.split("/")[-1] for line in concat_lists[0].splitlines()]
+        self.assertEqual(files, ["segment_0000.mp4'", "segment_0001.mp4'", "segment_0000.mp4'"])
+
+    @patch("agents.segmented_renderer.subprocess.run")
+    @patch("agents.segmented_renderer._encode_segment")
+    def test_single_segment_encodes_straight_to_the_output(self, encode, run, probe):
+        self.assertEqual(render_segmented(["b.mp4"], "short.mp3", "out.mp4", script_text="Hi. Bye", fps=24),
+                         "out.mp4")
+        encode.assert_called_once()
+        self.assertEqual(encode.call_args.args[:2], ("b.mp4", 3.0))
+        self.assertEqual(encode.call_args.args[5], "out.mp4")
+        self.assertEqual(encode.call_args.kwargs, {"audio_file": "short.mp3"})
+        run.assert_not_called()
+
+    @patch("agents.segmented_renderer.subprocess.run")
+    @patch("agents.segmented_renderer._encode_segment", side_effect=OSError("ffmpeg exited with 1"))
+    @patch("agents.segmented_renderer.ProcessPoolExecutor", side_effect=InlineExecutor)
+    def test_failed_segment_encode_returns_none(self, executor, encode, run, probe):
+        self.assertIsNone(render_segmented(["a.mp4", "b.mp4"], "voice.mp3", "out.mp4"))
+        run.assert_not_called()
+        self.assertIsNone(render_segmented(["b.mp4"], "short.mp3", "out.mp4"))
+
+    def test_no_usable_clips(self, probe):
+        self.assertIsNone(render_segmented(["missing.mp4"], "voice.mp3", "out.mp4"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from fastapi.testclient import TestClient
+import batch
+from agents.pipeline import Pipeline, Stage
+from backend.database import JobStore
+from backend.server import JobManager, create_app
+
+
+def fake_video_job(gate):
+    """Stands in for build_video_job: script -> render, where render waits on `gate`."""
+    def build(topic, region, options, workspace=None, fresh=False):
+        return Pipeline([
+            Stage("script", lambda inputs: {"script": f"About {topic}."}),
+            Stage("render", lambda inputs: gate.wait(5) and {"video": "video.mp4", "captions": None},
+                  deps=["script"], kind="cpu"),
+            Stage("upload", lambda inputs: "vid123", deps=["render"]),
+        ])
+    return build
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out")
+        time.sleep(0.02)
+
+
+class TestJobServer(unittest.TestCase):
+    def setUp(self):
+        self.gate = threading.Event()
+        workdir = tempfile.mkdtemp()
+        runner = lambda job, **kwargs: batch.run_job(job, manifest_dir=workdir, workspace_root=workdir, **kwargs)
+        for patcher in (mock.patch.object(batch, "build_video_job", fake_video_job(self.gate)),
+                        mock.patch.object(batch, "job_store", JobStore(os.path.join(workdir, "jobs.sqlite3")))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.manager = JobManager(workers=1, max_queued=1, runner=runner)
+        self.addCleanup(self.manager.pool.shutdown, wait=True)  # Jobs finish before the patches are undone
+        self.addCleanup(self.gate.set)
+        self.client = TestClient(create_app(self.manager))
+
+    def submit(self, **body):
+        response = self.client.post("/jobs", json={"topic": "AI", "upload": True, **body})
+        self.assertEqual(response.status_code, 202, response.text)
+        return response.json()["id"]
+
+    def test_job_runs_and_streams_stage_progress(self):
+        job_id = self.submit()
+        self.gate.set()
+        with self.client.stream("GET", f"/jobs/{job_id}/events") as response:
+            events = [json.loads(line[len("data: "):]) for line in response.iter_lines() if line.startswith("data: ")]
+        stages = [(event["stage"], event["status"]) for event in events if "stage" in event]
+        self.assertIn(("render", "running"), stages)
+        self.assertEqual(stages[-1], ("upload", "done"))
+        self.assertEqual(events[-1]["status"], "succeeded")
+
+        status = self.client.get(f"/jobs/{job_id}").json()
+        self.assertEqual(status["status"], "succeeded")
+        self.assertEqual(status["manifest"]["outputs"]["video_id"], "vid123")
+
+    def test_cancel_running_and_queued_jobs(self):
+        running = self.submit()
+        wait_for(lambda: self.manager.get(running).stages.get("render") == "running")
+        queued = self.submit(topic="Space")
+        self.assertEqual(self.client.post(f"/jobs/{queued}/cancel").json()["status"], "cancelled")
+
+        self.client.post(f"/jobs/{running}/cancel")
+        self.gate.set()
+        wait_for(lambda: self.manager.get(running).status == "cancelled")
+        self.assertEqual(self.manager.get(running).stages["upload"], "cancelled")
+
+    def test_queue_limit_and_validation(self):
+        self.submit()
+        wait_for(lambda: self.manager.get(next(iter(self.manager.jobs))).status == "running")
+        self.submit(topic="Queued")
+        self.assertEqual(self.client.post("/jobs", json={"topic": "Overflow"}).status_code, 429)
+        self.assertEqual(self.client.post("/jobs", json={"region": "US"}).status_code, 422)
+        self.assertEqual(self.client.get("/jobs/missing").status_code, 404)
+        for job_id in ("../../x", "/tmp/x", "a/b", "..", "A" * 65):
+            self.assertEqual(self.client.post("/jobs", json={"topic": "AI", "id": job_id}).status_code, 422, job_id)
+        self.gate.set()
+
+    def test_finished_jobs_are_evicted(self):
+        manager = JobManager(workers=1, runner=lambda job, **kwargs: {"status": "succeeded"}, max_finished=2)
+        self.addCleanup(manager.pool.shutdown, wait=True)
+        ids = []
+        for topic in ("A", "B", "C"):
+            state = manager.submit({"topic": topic})
+            state.future.result(5)
+            ids.append(state.id)
+        self.assertEqual({state.id for state in manager.list()}, set(ids[1:]))
+        self.assertIsNone(manager.get(ids[0]))
+
+        manager.finished_ttl = 0
+        manager.submit({"topic": "D"}).future.result(5)
+        self.assertEqual(manager.list(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+from agents.subtitle_renderer import BOX_COLOR, get_font, render_caption, wrap_text
+from agents.subtitle_generator import build_subtitle_clips, caption_clip
+
+TEXT = "The quick brown fox jumps over the lazy dog while the narrator keeps talking"
+
+
+class TestSubtitleRenderer(unittest.TestCase):
+    def test_wrap_text_breaks_at_max_width(self):
+        font = get_font(40)
+        max_width = font.getlength("The quick brown fox") + 1
+        lines = wrap_text(TEXT, font, max_width)
+        self.assertGreater(len(lines), 1)
+        self.assertEqual(" ".join(lines), TEXT)
+        for line in lines:
+            self.assertLessEqual(font.getlength(line), max_width)
+        for line, following in zip(lines, lines[1:]):  # Greedy: the next word would not have fitted
+            self.assertGreater(font.getlength(f"{line} {following.split()[0]}"), max_width)
+
+    def test_overlong_word_gets_its_own_line(self):
+        self.assertEqual(wrap_text("a supercalifragilistic b", get_font(40), 10),
+                         ["a", "supercalifragilistic", "b"])
+
+    def test_render_caption_returns_an_opaque_box_of_the_requested_width(self):
+        frame = render_caption(TEXT, 40, 500)
+        height, width, channels = frame.shape
+        self.assertEqual((width, channels), (500, 4))
+        self.assertEqual(frame.dtype.name, "uint8")
+        lines = len(wrap_text(TEXT, get_font(40), 500))
+        self.assertEqual(height, int(40 * 1.2) * lines + 2 * int(40 * 0.25))
+        self.assertTrue((frame[:, :, 3] == 255).all())
+        self.assertEqual(tuple(frame[0, 0]), BOX_COLOR)
+        self.assertGreater(frame[:, :, :3].max(), 200)  # Some text was drawn
+        self.assertFalse(frame.flags.writeable)
+
+    def test_repeated_captions_are_served_from_the_cache(self):
+        render_caption.cache_clear()
+        first = render_caption("Cached caption", 48, 640)
+        self.assertIs(render_caption("Cached caption", 48, 640), first)
+        self.assertIsNot(render_caption("Cached caption", 48, 600), first)
+        info = render_caption.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 2))
+
+    @patch("agents.subtitle_generator.TextClip", side_effect=AssertionError("ImageMagick should not be used"))
+    def test_caption_clip_is_masked_without_imagemagick(self, text_clip):
+        clip = caption_clip("Hello world", 40, 300)
+        frame = render_caption("Hello world", 40, 300)
+        self.assertEqual(clip.size, (300, frame.shape[0]))
+        self.assertTrue(clip.mask.ismask)
+        self.assertEqual(clip.mask.get_frame(0).max(), 1.0)
+        self.assertEqual(clip.get_frame(0).shape, frame.shape[:2] + (3,))
+
+        with patch("agents.subtitle_generator.SUBTITLE_BACKEND", "pillow"):
+            clips = build_subtitle_clips("One. Two", (640, 360), 4.0)
+        self.assertEqual([(c.start, c.end) for c in clips], [(0, 2.0), (2.0, 4.0)])
+        self.assertTrue(all(c.mask is not None for c in clips))
+        text_clip.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
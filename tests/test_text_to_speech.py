@@ -0,0 +1,78 @@
+import io
+import tempfile
+import unittest
+from unittest import mock
+from pydub import AudioSegment
+from models.tts_engines import get_engine_pool, benchmark_engines
+from models.tts_model import TTSModel, split_sentences
+from models.process_pool import WorkerPool
+import fake_tts_engine  # noqa: F401 -- registers the "fake-local" engine
+
+
+def silent_mp3(milliseconds):
+    buffer = io.BytesIO()
+    AudioSegment.silent(duration=milliseconds).export(buffer, format="mp3")
+    return buffer.getvalue()
+
+
+class FakeGTTS:
+    """Stands in for gTTS: 'speaks' 100 ms of silence per word."""
+    calls = 0
+
+    def __init__(self, text, lang):
+        self.text = text
+        FakeGTTS.calls += 1
+
+    def write_to_fp(self, fp):
+        fp.write(silent_mp3(100 * len(self.text.split())))
+
+
+@mock.patch("models.tts_engines.gTTS", FakeGTTS)
+class TestSentenceTTS(unittest.TestCase):
+    def setUp(self):
+        FakeGTTS.calls = 0
+        self.workdir = tempfile.mkdtemp()
+        self.model = TTSModel(cache_dir=self.workdir)
+
+    def test_split_sentences(self):
+        self.assertEqual(split_sentences("AI is here. Is it? Yes!"), ["AI is here.", "Is it?", "Yes!"])
+
+    def test_timings_follow_each_sentence(self):
+        audio_file = self.model.convert_sentences_to_speech(
+            ["One two three four five.", "Six seven."], audio_file=f"{self.workdir}/out.mp3")
+        self.assertIsNotNone(audio_file)
+        (first, start1, end1), (second, start2, end2) = self.model.timings
+        self.assertEqual(start1, 0)
+        self.assertEqual(end1, start2)
+        self.assertGreater(end1 - start1, end2 - start2)  # Five words take longer than two
+
+    def test_repeated_sentences_hit_the_cache(self):
+        for _ in range(2):
+            self.model.convert_sentences_to_speech(["Same sentence."], audio_file=f"{self.workdir}/out.mp3")
+        self.assertEqual(FakeGTTS.calls, 1)
+
+
+class TestLocalEngines(unittest.TestCase):
+    def test_local_engine_runs_in_a_shared_warm_pool(self):
+        workdir = tempfile.mkdtemp()
+        first = TTSModel(cache_dir=workdir, engine="fake-local", max_workers=2)
+        first.convert_sentences_to_speech(["One two three.", "Four."], audio_file=f"{workdir}/out.mp3")
+        self.assertAlmostEqual(first.timings[-1][2], 0.4, places=2)
+        TTSModel(cache_dir=workdir, engine="fake-local", max_workers=2)
+        pool = get_engine_pool("fake-local", None, 2)
+        self.assertIs(pool, get_engine_pool("fake-local", None, 2))
+        self.assertIsInstance(pool, WorkerPool)  # Spawned workers, which import the engine's module themselves
+
+    def test_unknown_engine_is_rejected(self):
+        with self.assertRaises(ValueError):
+            TTSModel(engine="nope")
+
+    def test_benchmark_reports_real_time_factor(self):
+        results = benchmark_engines("One two three four five.", engines=["fake-local", "nope"], runs=1)
+        self.assertAlmostEqual(results["fake-local"]["audio_s"], 0.5, places=2)
+        self.assertIn("rtf", results["fake-local"])
+        self.assertIn("error", results["nope"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from PIL import Image
+from moviepy.editor import ImageSequenceClip
+from agents import thumbnail_generator
+from agents.thumbnail_composer import compose_thumbnail, encode_under_limit, MAX_THUMBNAIL_BYTES
+
+
+class TestThumbnail(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = tempfile.mkdtemp()
+        cls.video = os.path.join(cls.workdir, "video.mp4")
+        rng = np.random.default_rng(0)
+        frames = [np.full((180, 320, 3), 40 * i, dtype=np.uint8) for i in range(5)]
+        frames[3] = rng.integers(0, 255, (180, 320, 3), dtype=np.uint8)  # The only detailed frame
+        ImageSequenceClip(frames, fps=1).write_videofile(cls.video, codec="libx264", audio=False, logger=None)
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def test_noisy_image_is_compressed_under_limit(self):
+        noise = np.random.default_rng(1).integers(0, 255, (2160, 3840, 3), dtype=np.uint8)
+        data = encode_under_limit(Image.fromarray(noise))
+        self.assertLessEqual(len(data), MAX_THUMBNAIL_BYTES)
+
+    def test_composed_thumbnail_is_a_1280x720_jpeg(self):
+        image = Image.open(io.BytesIO(compose_thumbnail(self.video, "The Future of AI")))
+        self.assertEqual((image.format, image.size), ("JPEG", (1280, 720)))
+
+    def test_local_result_wins_over_slow_remote_and_is_cached(self):
+        def slow_remote(topic):
+            time.sleep(2)
+            return None
+
+        with mock.patch.object(thumbnail_generator, "generate_remote_thumbnail", slow_remote):
+            started = time.monotonic()
+            path = thumbnail_generator.generate_thumbnail("AI", video_path=self.video, title="AI Title",
+                                                          deadline=5, cache_dir=self.cache_dir)
+            self.assertLess(time.monotonic() - started, 2)
+            self.assertTrue(os.path.exists(path))
+
+            with mock.patch.object(thumbnail_generator, "generate_local_thumbnail") as local:
+                again = thumbnail_generator.generate_thumbnail("AI", video_path=self.video, title="AI Title",
+                                                               cache_dir=self.cache_dir)
+                local.assert_not_called()
+            self.assertEqual(path, again)
+
+    def test_deadline_gives_up_without_a_result(self):
+        with mock.patch.object(thumbnail_generator, "generate_remote_thumbnail", lambda topic: time.sleep(1)):
+            self.assertIsNone(thumbnail_generator.generate_thumbnail("AI", deadline=0.1, cache_dir=self.cache_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from agents import timeline as timeline_module
+from agents.timeline import StreamingTimeline
+from agents.video_editor import create_video_with_subtitles
+
+
+class FakeReader:
+    """Stands in for FFMPEG_VideoReader and records which readers are open."""
+    opened = []
+
+    def __init__(self, path, target_resolution):
+        self.path = path
+        self.size = target_resolution[::-1]
+        self.fps = 24
+        self.closed = False
+        FakeReader.opened.append(self)
+
+    def get_frame(self, t):
+        return np.zeros((self.size[1], self.size[0], 3), dtype=np.uint8)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAudio:
+    duration = 7.5
+
+    def close(self):
+        pass
+
+
+@patch("agents.timeline.FFMPEG_VideoReader", FakeReader)
+class TestStreamingTimeline(unittest.TestCase):
+    def setUp(self):
+        FakeReader.opened = []
+
+    def open_paths(self, timeline):
+        return sorted(reader.path for reader in timeline.readers.values())
+
+    def test_only_current_and_lookahead_clips_hold_readers(self):
+        timeline = StreamingTimeline(["a", "b", "c"], [3, 2, 1], [0, 1, 2, 0], (64, 36), lookahead=1)
+        self.assertEqual(timeline.duration, 9)
+
+        frame = timeline.make_frame(0.5)
+        self.assertEqual(frame.shape, (36, 64, 3))
+        self.assertEqual(self.open_paths(timeline), ["a", "b"])
+
+        timeline.make_frame(5.5)  # Third position: clip "c", with the looped "a" after it
+        self.assertEqual(self.open_paths(timeline), ["a", "c"])
+        self.assertEqual(sorted(timeline.readers), [2, 3])
+
+        timeline.make_frame(8.9)  # Last position: nothing left to look ahead to
+        self.assertEqual(sorted(timeline.readers), [3])
+        self.assertEqual(timeline.peak_open_readers, 2)
+
+    def test_readers_behind_the_playhead_are_closed(self):
+        timeline = StreamingTimeline(["a", "b", "c"], [3, 2, 1], [0, 1, 2], (64, 36), lookahead=0)
+        for t in np.arange(0, 6, 0.25):
+            timeline.make_frame(t)
+            self.assertEqual(len(timeline.readers), 1)
+        self.assertEqual([reader.closed for reader in FakeReader.opened], [True, True, False])
+        timeline.close()
+        self.assertTrue(all(reader.closed for reader in FakeReader.opened))
+        self.assertEqual(timeline.readers, {})
+
+    def test_stats_report_peak_readers_and_memory(self):
+        timeline = StreamingTimeline(["a", "b"], [3, 3], [0, 1], (64, 36), lookahead=1)
+        timeline.make_frame(1)
+        stats = timeline.stats()
+        self.assertEqual(stats["peak_open_readers"], 2)
+        if timeline_module.resource:
+            self.assertGreater(stats["peak_rss_mb"], 0)
+            self.assertIn("peak_child_rss_mb", stats)
+
+    @patch("agents.video_editor.RENDER_ENGINE", "moviepy")
+    @patch("agents.video_editor.AudioFileClip", return_value=FakeAudio())
+    @patch("agents.video_editor.probe_duration", return_value=4.0)
+    def test_cleanup_closes_every_reader_when_rendering_fails(self, probe, audio):
+        def failing_composite(clips):
+            clips[0].get_frame(2.9)  # The render had started and opened readers
+            raise RuntimeError("encoder crashed")
+
+        output = os.path.join(tempfile.mkdtemp(), "video.mp4")
+        with patch("agents.video_editor.CompositeVideoClip", side_effect=failing_composite):
+            with self.assertRaises(RuntimeError):
+                create_video_with_subtitles("topic", "voice.mp3", "One. Two", output, clips=["a.mp4", "b.mp4"])
+        self.assertEqual(len(FakeReader.opened), 2)
+        self.assertTrue(all(reader.closed for reader in FakeReader.opened))
+
+
+if __name__ == "__main__":
+    unittest.main()
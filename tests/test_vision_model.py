@@ -0,0 +1,54 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from cachetools import TTLCache
+from models import vision_model
+from models.vision_model import select_rendition, search_pexels_videos
+
+
+def rendition(width, height, fps=25):
+    return {"width": width, "height": height, "fps": fps, "quality": "hd", "link": f"{width}x{height}@{fps}"}
+
+
+class TestSelectRendition(unittest.TestCase):
+    def test_smallest_covering_rendition(self):
+        renditions = [rendition(3840, 2160), rendition(1920, 1080, 50), rendition(1920, 1080), rendition(1280, 720)]
+        self.assertEqual(select_rendition(renditions, (1920, 1080))["link"], "1920x1080@25")
+
+    def test_prefers_target_aspect(self):
+        renditions = [rendition(2160, 3840), rendition(2560, 1440)]
+        self.assertEqual(select_rendition(renditions, (1920, 1080))["link"], "2560x1440@25")
+
+    def test_falls_back_to_largest(self):
+        renditions = [rendition(960, 540), rendition(1280, 720)]
+        self.assertEqual(select_rendition(renditions, (1920, 1080))["link"], "1280x720@25")
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, query):
+        self.query = query
+
+    def json(self):
+        return {"videos": [{"id": self.query, "duration": 5, "video_files": [{"link": f"{self.query}.mp4"}]}]}
+
+
+class TestSearchCache(unittest.TestCase):
+    @mock.patch("models.vision_model.http_client.get",
+                side_effect=lambda url, params, **kwargs: FakeResponse(params["query"]))
+    def test_cache_is_shared_safely_between_threads(self, get):
+        # A tiny, fast-expiring cache keeps expiry and LRU eviction busy while threads read and write it
+        with mock.patch.object(vision_model, "search_cache", TTLCache(maxsize=4, ttl=0.001)):
+            queries = [f"q{i % 16}" for i in range(4000)]
+            with ThreadPoolExecutor(8) as pool:
+                results = list(pool.map(search_pexels_videos, queries))
+        self.assertEqual([result[0]["id"] for result in results], queries)
+
+        get.reset_mock()
+        self.assertEqual(search_pexels_videos("cached"), search_pexels_videos("cached"))
+        self.assertEqual(get.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
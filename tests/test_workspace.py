@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+from agents.workspace import Workspace, slugify
+
+
+class TestWorkspace(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def test_artifact_and_companions_are_renamed_on_success(self):
+        workspace = Workspace("job-1", self.root)
+        with workspace.artifact("video.mp4") as temp_path:
+            self.assertTrue(temp_path.endswith(".mp4"))
+            for path in (temp_path, os.path.splitext(temp_path)[0] + ".srt"):
+                with open(path, "w") as f:
+                    f.write("data")
+            self.assertFalse(os.path.exists(workspace.path("video.mp4")))
+        self.assertEqual(sorted(os.listdir(workspace.root)), ["video.mp4", "video.srt"])
+
+    def test_partial_files_are_removed_on_error(self):
+        workspace = Workspace("job-1", self.root)
+        with self.assertRaises(RuntimeError):
+            with workspace.artifact("narration.mp3") as temp_path:
+                open(temp_path, "w").close()
+                raise RuntimeError("encode failed")
+        self.assertEqual(os.listdir(workspace.root), [])
+
+    def test_created_workspaces_are_unique(self):
+        first, second = Workspace.create("AI in Healthcare!", self.root), Workspace.create("AI in Healthcare!", self.root)
+        self.assertNotEqual(first.root, second.root)
+        self.assertIn("ai-in-healthcare", first.job_id)
+        self.assertEqual(slugify("  ***  "), "job")
+
+    def test_job_ids_cannot_leave_the_root(self):
+        for job_id in ("../x", "..", "/tmp/x", "a/b", ""):
+            with self.assertRaises(ValueError, msg=job_id):
+                Workspace(job_id, self.root)
+        self.assertEqual(os.listdir(self.root), [])
+
+
+if __name__ == "__main__":
+    unittest.main()